@@ -0,0 +1,41 @@
+"""Ingestion job queue for async webhook processing
+
+Revision ID: 002
+Revises: 001
+Create Date: 2025-02-01 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'ingestion_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('task_id', sa.String(100)),
+        sa.Column('task_name', sa.String(100)),
+        sa.Column('data_count', sa.Integer, default=0),
+        sa.Column('payload', postgresql.JSONB, nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('attempts', sa.Integer, default=0),
+        sa.Column('result', postgresql.JSONB),
+        sa.Column('error_message', sa.Text),
+        sa.Column('created_at', sa.DateTime, default=sa.func.now()),
+        sa.Column('started_at', sa.DateTime),
+        sa.Column('completed_at', sa.DateTime),
+    )
+    op.create_index('idx_ingestion_jobs_status', 'ingestion_jobs', ['status', 'created_at'])
+
+
+def downgrade() -> None:
+    op.drop_table('ingestion_jobs')
@@ -0,0 +1,34 @@
+"""Classification cache for LLM results
+
+Revision ID: 003
+Revises: 002
+Create Date: 2025-02-03 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'classification_cache',
+        sa.Column('key', sa.String(64), primary_key=True),
+        sa.Column('kind', sa.String(20), nullable=False),
+        sa.Column('model', sa.String(100), nullable=False),
+        sa.Column('prompt_version', sa.String(20), nullable=False),
+        sa.Column('result', postgresql.JSONB, nullable=False),
+        sa.Column('created_at', sa.DateTime, default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('classification_cache')
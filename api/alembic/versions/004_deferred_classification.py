@@ -0,0 +1,38 @@
+"""Classification status for deferred review/release classification
+
+Revision ID: 004
+Revises: 003
+Create Date: 2025-02-05 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows were classified at ingestion time
+    for table in ('reviews', 'releases'):
+        op.add_column(
+            table,
+            sa.Column('classification_status', sa.String(20), nullable=False, server_default='DONE'),
+        )
+        op.create_index(
+            f'idx_{table}_pending',
+            table,
+            ['collected_at', 'id'],
+            postgresql_where=sa.text("classification_status = 'PENDING'"),
+        )
+
+
+def downgrade() -> None:
+    for table in ('reviews', 'releases'):
+        op.drop_index(f'idx_{table}_pending', table_name=table)
+        op.drop_column(table, 'classification_status')
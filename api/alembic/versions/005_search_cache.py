@@ -0,0 +1,37 @@
+"""Search result cache
+
+Revision ID: 005
+Revises: 004
+Create Date: 2025-02-07 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'search_cache',
+        sa.Column('key', sa.String(64), primary_key=True),
+        sa.Column('provider', sa.String(100), nullable=False),
+        sa.Column('query', sa.Text, nullable=False),
+        sa.Column('max_results', sa.Integer, nullable=False),
+        sa.Column('results', postgresql.JSONB, nullable=False),
+        sa.Column('created_at', sa.DateTime, default=sa.func.now()),
+        sa.Column('expires_at', sa.DateTime, nullable=False),
+    )
+    op.create_index('idx_search_cache_expires', 'search_cache', ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_search_cache_expires', table_name='search_cache')
+    op.drop_table('search_cache')
@@ -0,0 +1,52 @@
+"""Hashed source URL for news item deduplication
+
+Revision ID: 006
+Revises: 005
+Create Date: 2025-02-08 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('news_items', sa.Column('url_hash', sa.String(32)))
+
+    # Same normalization as NewsScraperService._generate_unique_id
+    op.execute("""
+        UPDATE news_items
+        SET url_hash = md5(rtrim(lower(source_url), '/'))
+        WHERE source_url IS NOT NULL AND source_url <> ''
+    """)
+
+    # Keep the hash on the oldest copy of each URL; later copies stay but
+    # no longer take part in deduplication
+    op.execute("""
+        UPDATE news_items
+        SET url_hash = NULL
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY url_hash ORDER BY collected_at, id
+                ) AS copy
+                FROM news_items
+                WHERE url_hash IS NOT NULL
+            ) ranked
+            WHERE copy > 1
+        )
+    """)
+
+    op.create_index('uq_news_items_url_hash', 'news_items', ['url_hash'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_news_items_url_hash', table_name='news_items')
+    op.drop_column('news_items', 'url_hash')
@@ -0,0 +1,239 @@
+"""Canonical URLs, MinHash signatures and story clusters for news items
+
+Revision ID: 007
+Revises: 006
+Create Date: 2025-02-09 00:00:00.000000
+
+"""
+import hashlib
+import random
+import string
+import unicodedata
+from collections import deque
+from datetime import timedelta
+from typing import Optional, Sequence, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copy of app.services.news_dedup as of this revision, so the
+# backfill keeps producing the same values when the app code changes
+
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "ref_url", "cmpid", "ncid", "ocid", "_ga", "_gl", "spm",
+    "amp", "outputtype",
+}
+TRACKING_PREFIXES = ("utm_", "hsa_", "pk_", "ga_")
+HOST_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+SEPARATORS = string.punctuation + "¿¡«»“”‘’…–—"
+
+MINHASH_PERMUTATIONS = 32
+MINHASH_ROWS = 2
+MINHASH_BANDS = MINHASH_PERMUTATIONS // MINHASH_ROWS
+MINHASH_MIN_WORDS = 5
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_random = random.Random(0x5EED)
+_PERMUTATIONS = [
+    (_random.randrange(1, _MERSENNE_PRIME), _random.randrange(0, _MERSENNE_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+
+# NEWS_CLUSTER_WINDOW_DAYS and NEWS_DUPLICATE_SIMILARITY defaults
+CLUSTER_WINDOW = timedelta(days=7)
+DUPLICATE_SIMILARITY = 0.7
+
+BATCH_SIZE = 1000
+
+
+def _canonicalize_url(url: Optional[str]) -> Optional[str]:
+    if not url or not url.strip():
+        return None
+    
+    parts = urlsplit(url.strip())
+    if not parts.netloc:
+        return url.strip().lower().rstrip("/")
+    
+    host = (parts.hostname or "").lower()
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix):]
+            break
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    
+    path = parts.path or "/"
+    for suffix in ("/amp", "/amp/", ".amp", ".amp.html"):
+        if path.lower().endswith(suffix):
+            path = path[:-len(suffix)] + (".html" if suffix == ".amp.html" else "")
+            break
+    path = path.rstrip("/") or "/"
+    
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def _to_int32(value: int) -> int:
+    value &= 0xFFFFFFFF
+    return value - (1 << 32) if value >= 1 << 31 else value
+
+
+def _minhash(text: str) -> Optional[list[int]]:
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char)).lower()
+    for char in SEPARATORS:
+        text = text.replace(char, " ")
+    words = {word for word in text.split() if len(word) > 2}
+    if len(words) < MINHASH_MIN_WORDS:
+        return None
+    
+    hashes = [
+        int.from_bytes(hashlib.blake2b(word.encode(), digest_size=8).digest(), "big")
+        for word in words
+    ]
+    return [
+        _to_int32(min((a * value + b) % _MERSENNE_PRIME for value in hashes))
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def _minhash_bands(signature: list[int]) -> list[int]:
+    return [
+        _to_int32(int.from_bytes(hashlib.blake2b(
+            repr((band, signature[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS])).encode(),
+            digest_size=4,
+        ).digest(), "big"))
+        for band in range(MINHASH_BANDS)
+    ]
+
+
+def _similarity(a: list[int], b: list[int]) -> float:
+    return sum(x == y for x, y in zip(a, b)) / MINHASH_PERMUTATIONS
+
+
+def upgrade() -> None:
+    op.add_column('news_items', sa.Column('canonical_url', sa.String(1000)))
+    op.add_column('news_items', sa.Column('minhash', postgresql.ARRAY(sa.Integer)))
+    op.add_column('news_items', sa.Column('minhash_bands', postgresql.ARRAY(sa.Integer)))
+    op.add_column('news_items', sa.Column('story_cluster_id', postgresql.UUID(as_uuid=True)))
+    
+    # Hashes change with canonicalization, so rebuild them without the unique index
+    op.drop_index('uq_news_items_url_hash', table_name='news_items')
+    
+    bind = op.get_bind()
+    select_batch = sa.text("""
+        SELECT id, source_url, title, summary, collected_at,
+               coalesce(collected_at, 'infinity'::timestamp)::text AS sort_key
+        FROM news_items
+        WHERE (coalesce(collected_at, 'infinity'::timestamp), id) > (CAST(:sort_key AS timestamp), :id)
+        ORDER BY coalesce(collected_at, 'infinity'::timestamp), id
+        LIMIT :limit
+    """).bindparams(sa.bindparam('id', type_=postgresql.UUID(as_uuid=True)))
+    update_batch = sa.text("""
+        UPDATE news_items
+        SET canonical_url = :canonical_url,
+            url_hash = :url_hash,
+            minhash = :minhash,
+            minhash_bands = :minhash_bands,
+            story_cluster_id = :story_cluster_id
+        WHERE id = :id
+    """).bindparams(
+        sa.bindparam('minhash', type_=postgresql.ARRAY(sa.Integer)),
+        sa.bindparam('minhash_bands', type_=postgresql.ARRAY(sa.Integer)),
+        sa.bindparam('story_cluster_id', type_=postgresql.UUID(as_uuid=True)),
+        sa.bindparam('id', type_=postgresql.UUID(as_uuid=True)),
+    )
+    
+    # Signatures of the last CLUSTER_WINDOW, oldest first, indexed by band
+    recent: deque[tuple] = deque()
+    by_band: dict[int, dict] = {}
+    cursor = {"sort_key": "-infinity", "id": "00000000-0000-0000-0000-000000000000"}
+    
+    while True:
+        rows = bind.execute(select_batch, {**cursor, "limit": BATCH_SIZE}).all()
+        if not rows:
+            break
+        cursor = {"sort_key": rows[-1].sort_key, "id": rows[-1].id}
+        
+        updates = []
+        for row in rows:
+            if row.collected_at:
+                while recent and row.collected_at - recent[0][0] > CLUSTER_WINDOW:
+                    _, item_id, old_bands = recent.popleft()
+                    for band in old_bands:
+                        by_band[band].pop(item_id, None)
+            
+            canonical_url = _canonicalize_url(row.source_url)
+            signature = _minhash(f"{row.title or ''} {row.summary or ''}")
+            bands = _minhash_bands(signature) if signature is not None else None
+            cluster_id = row.id
+            
+            if signature is not None:
+                best = None
+                for band in bands:
+                    for other, other_cluster in by_band.get(band, {}).values():
+                        score = _similarity(signature, other)
+                        if score >= DUPLICATE_SIMILARITY and (best is None or score > best[0]):
+                            best = (score, other_cluster)
+                if best:
+                    cluster_id = best[1]
+                for band in bands:
+                    by_band.setdefault(band, {})[row.id] = (signature, cluster_id)
+                if row.collected_at:
+                    recent.append((row.collected_at, row.id, bands))
+            
+            updates.append({
+                "id": row.id,
+                "canonical_url": canonical_url,
+                "url_hash": hashlib.md5((canonical_url or "").encode()).hexdigest() if row.source_url else None,
+                "minhash": signature,
+                "minhash_bands": bands,
+                "story_cluster_id": cluster_id,
+            })
+        
+        bind.execute(update_batch, updates)
+    
+    # The oldest copy of a canonical URL keeps the hash
+    bind.execute(sa.text("""
+        UPDATE news_items
+        SET url_hash = NULL
+        FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY url_hash
+                ORDER BY coalesce(collected_at, 'infinity'::timestamp), id
+            ) AS copy
+            FROM news_items
+            WHERE url_hash IS NOT NULL
+        ) AS copies
+        WHERE news_items.id = copies.id AND copies.copy > 1
+    """))
+    
+    op.create_index('uq_news_items_url_hash', 'news_items', ['url_hash'], unique=True)
+    op.create_index(
+        'idx_news_items_minhash_bands', 'news_items', ['minhash_bands'], postgresql_using='gin'
+    )
+    op.create_index('idx_news_items_story', 'news_items', ['story_cluster_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_news_items_story', table_name='news_items')
+    op.drop_index('idx_news_items_minhash_bands', table_name='news_items')
+    op.drop_column('news_items', 'story_cluster_id')
+    op.drop_column('news_items', 'minhash_bands')
+    op.drop_column('news_items', 'minhash')
+    op.drop_column('news_items', 'canonical_url')
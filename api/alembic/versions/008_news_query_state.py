@@ -0,0 +1,43 @@
+"""Per-query state for incremental news collection
+
+Revision ID: 008
+Revises: 007
+Create Date: 2025-02-10 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'news_query_state',
+        sa.Column('key', sa.String(64), primary_key=True),
+        sa.Column('query', sa.Text, nullable=False),
+        sa.Column('last_run_at', sa.DateTime),
+        sa.Column('next_run_at', sa.DateTime),
+        sa.Column('refresh_interval', sa.Integer, nullable=False),
+        sa.Column('newest_published_date', sa.Date),
+        sa.Column('runs', sa.Integer, default=0),
+        sa.Column('api_calls', sa.Integer, default=0),
+        sa.Column('results_found', sa.Integer, default=0),
+        sa.Column('new_items', sa.Integer, default=0),
+        sa.Column('last_results', sa.Integer, default=0),
+        sa.Column('last_new_items', sa.Integer, default=0),
+        sa.Column('last_error', sa.Text),
+        sa.Column('updated_at', sa.DateTime, default=sa.func.now()),
+    )
+    op.create_index('idx_news_query_state_next_run', 'news_query_state', ['next_run_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_news_query_state_next_run', table_name='news_query_state')
+    op.drop_table('news_query_state')
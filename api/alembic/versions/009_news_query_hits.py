@@ -0,0 +1,34 @@
+"""URLs returned per news search query
+
+Revision ID: 009
+Revises: 008
+Create Date: 2025-02-11 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'news_query_hits',
+        sa.Column('query_key', sa.String(64), primary_key=True),
+        sa.Column('url_hash', sa.String(32), primary_key=True),
+        sa.Column('hits', sa.Integer, default=1),
+        sa.Column('first_seen_at', sa.DateTime, default=sa.func.now()),
+        sa.Column('last_seen_at', sa.DateTime, default=sa.func.now()),
+    )
+    op.create_index('idx_news_query_hits_last_seen', 'news_query_hits', ['last_seen_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_news_query_hits_last_seen', table_name='news_query_hits')
+    op.drop_table('news_query_hits')
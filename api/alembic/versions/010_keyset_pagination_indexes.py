@@ -0,0 +1,38 @@
+"""Composite indexes for keyset pagination
+
+Revision ID: 010
+Revises: 009
+Create Date: 2025-02-12 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# name, table, indexed expressions; must match app.api.pagination sort keys
+INDEXES = [
+    ('idx_reviews_page', 'reviews', "coalesce(review_date, '-infinity'::date) DESC, id DESC"),
+    ('idx_reviews_competitor_page', 'reviews', "competitor_id, coalesce(review_date, '-infinity'::date) DESC, id DESC"),
+    ('idx_releases_page', 'releases', "coalesce(release_date, '-infinity'::date) DESC, id DESC"),
+    ('idx_news_items_page', 'news_items', "coalesce(published_date, '-infinity'::date) DESC, id DESC"),
+    ('idx_collection_logs_page', 'collection_logs', "completed_at DESC, id DESC"),
+]
+
+
+def upgrade() -> None:
+    # Built concurrently so large tables stay writable during the migration
+    with op.get_context().autocommit_block():
+        for name, table, expressions in INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({expressions})")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _, _ in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,59 @@
+"""Daily review rollup
+
+Revision ID: 011
+Revises: 010
+Create Date: 2025-02-13 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'review_daily_rollup',
+        sa.Column('id', sa.BigInteger, primary_key=True, autoincrement=True),
+        sa.Column('competitor_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('competitors.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('platform', sa.String(20), nullable=False),
+        sa.Column('day', sa.Date, nullable=False),
+        sa.Column('role', sa.String(20)),
+        sa.Column('sentiment', sa.String(20)),
+        sa.Column('reviews', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('rating_sum', sa.BigInteger, nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime, default=sa.func.now()),
+    )
+    # NULL role/sentiment are coalesced, so pending reviews share one row per key
+    op.execute("""
+        CREATE UNIQUE INDEX idx_review_daily_rollup_key ON review_daily_rollup
+            (competitor_id, platform, day, coalesce(role::text, ''), coalesce(sentiment::text, ''))
+    """)
+    op.create_index('idx_review_daily_rollup_day', 'review_daily_rollup', ['day'])
+    # Partial days at the edges of a range are still counted from reviews
+    op.create_index('idx_reviews_collected', 'reviews', ['collected_at'])
+    
+    # Backfill
+    op.execute("""
+        INSERT INTO review_daily_rollup
+            (competitor_id, platform, day, role, sentiment, reviews, rating_sum, updated_at)
+        SELECT competitor_id, platform, date(collected_at), role, sentiment,
+               count(*), sum(rating), now()
+        FROM reviews
+        WHERE collected_at IS NOT NULL
+        GROUP BY competitor_id, platform, date(collected_at), role, sentiment
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_reviews_collected', table_name='reviews')
+    op.drop_index('idx_review_daily_rollup_day', table_name='review_daily_rollup')
+    op.drop_index('idx_review_daily_rollup_key', table_name='review_daily_rollup')
+    op.drop_table('review_daily_rollup')
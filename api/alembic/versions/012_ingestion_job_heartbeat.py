@@ -0,0 +1,25 @@
+"""Heartbeat of running ingestion jobs
+
+Revision ID: 012
+Revises: 011
+Create Date: 2025-02-14 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '012'
+down_revision: Union[str, None] = '011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('ingestion_jobs', sa.Column('heartbeat_at', sa.DateTime))
+
+
+def downgrade() -> None:
+    op.drop_column('ingestion_jobs', 'heartbeat_at')
@@ -0,0 +1,27 @@
+"""Claims of pending rows by classification workers
+
+Revision ID: 013
+Revises: 012
+Create Date: 2025-02-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '013'
+down_revision: Union[str, None] = '012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ('reviews', 'releases'):
+        op.add_column(table, sa.Column('classification_claimed_at', sa.DateTime))
+
+
+def downgrade() -> None:
+    for table in ('reviews', 'releases'):
+        op.drop_column(table, 'classification_claimed_at')
@@ -0,0 +1,28 @@
+"""Failed runs of news search queries
+
+Revision ID: 014
+Revises: 013
+Create Date: 2025-02-16 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '014'
+down_revision: Union[str, None] = '013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'news_query_state',
+        sa.Column('failed_runs', sa.Integer, nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('news_query_state', 'failed_runs')
@@ -9,6 +9,7 @@ import structlog
 
 from app.config import settings
 from app.db.session import get_db
+from app.services.clerk_auth import jwks_cache, token_cache
 
 logger = structlog.get_logger()
 
@@ -35,22 +36,16 @@ async def verify_clerk_token(
     
     token = credentials.credentials
     
+    # Tokens verified recently skip signature checks until they expire
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    
     try:
-        # Fetch JWKS from Clerk
-        async with httpx.AsyncClient() as client:
-            response = await client.get(settings.CLERK_JWKS_URL)
-            jwks = response.json()
-        
-        # Decode and verify the token
-        # Note: In production, you'd cache the JWKS
         unverified_header = jwt.get_unverified_header(token)
         
-        # Find the key
-        rsa_key = None
-        for key in jwks.get("keys", []):
-            if key.get("kid") == unverified_header.get("kid"):
-                rsa_key = key
-                break
+        # Find the key (cached JWKS, refetched on rotation)
+        rsa_key = await jwks_cache.get_key(unverified_header.get("kid"))
         
         if not rsa_key:
             raise HTTPException(
@@ -65,6 +60,7 @@ async def verify_clerk_token(
             issuer=settings.CLERK_ISSUER,
         )
         
+        token_cache.set(token, payload)
         return payload
         
     except JWTError as e:
@@ -0,0 +1,118 @@
+"""
+Keyset (cursor) pagination for list endpoints
+
+OFFSET pagination reads and discards every row before the page, so deep
+pages get linearly slower. A cursor encodes the sort key of the last row
+served; the next page continues with a row comparison
+`(sort_key, id) < (cursor values)` that a matching composite index
+answers directly, whatever the depth.
+"""
+import base64
+import json
+import uuid
+from datetime import date, datetime
+from typing import Any, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import Select, literal, literal_column, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+
+def nulls_last_date(column) -> ColumnElement:
+    """
+    Sort key for a nullable date column in `DESC NULLS LAST` order.
+
+    NULLs become -infinity so the key has no NULLs and row comparisons
+    work; must match the expression of the composite index exactly.
+    """
+    return func.coalesce(column, literal_column("'-infinity'::date"))
+
+
+def _encode_value(value: Any):
+    if isinstance(value, uuid.UUID):
+        return {"u": str(value)}
+    if isinstance(value, datetime):
+        return {"t": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any):
+    if isinstance(value, dict) and len(value) == 1:
+        kind, raw = next(iter(value.items()))
+        if kind == "u":
+            return uuid.UUID(raw)
+        if kind == "t":
+            return datetime.fromisoformat(raw)
+        if kind == "d":
+            return date.fromisoformat(raw)
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque, URL-safe cursor for the sort key values of a row"""
+    raw = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Sort key values of a cursor; 400 if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = [_decode_value(value) for value in json.loads(raw)]
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+async def fetch_page(
+    db: AsyncSession,
+    query: Select,
+    order: Sequence[ColumnElement],
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+) -> tuple[list, Optional[str]]:
+    """
+    Fetch one page of `query`, ordered by `order` descending.
+
+    Args:
+        query: Select without ORDER BY/LIMIT/OFFSET
+        order: Sort key columns, most significant first, ending with a
+            unique column (the primary key) as tie-breaker
+        limit: Page size
+        cursor: next_cursor of the previous page; continues after it
+        offset: Rows to skip (page mode, ignored with a cursor)
+
+    Returns:
+        (rows without the sort key columns, next_cursor or None on the
+        last page). Rows of a single-entity select are the entities.
+    """
+    keys = [column.label(f"_sort_{i}") for i, column in enumerate(order)]
+    query = query.add_columns(*keys)
+
+    if cursor:
+        values = decode_cursor(cursor, len(order))
+        query = query.where(
+            tuple_(*order) < tuple_(*(literal(value, column.type) for value, column in zip(values, order)))
+        )
+    elif offset:
+        query = query.offset(offset)
+
+    query = query.order_by(*(column.desc() for column in order)).limit(limit + 1)
+    result = await db.execute(query)
+    rows = result.unique().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][-len(order):])
+
+    width = len(rows[0]) - len(order) if rows else 0
+    items = [row[0] if width == 1 else tuple(row[:width]) for row in rows]
+    return items, next_cursor
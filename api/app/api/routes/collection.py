@@ -6,8 +6,10 @@ from typing import Optional
 from datetime import datetime, timedelta
 
 from app.api.deps import get_database, verify_clerk_token
+from app.api.pagination import fetch_page
 from app.models import CollectionLog, Competitor
 from app.models.collection_log import CollectionStatus
+from app.services.count_cache import count_cache
 
 router = APIRouter()
 
@@ -68,10 +70,19 @@ async def get_collection_logs(
     days: int = Query(7, ge=1, le=90),
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (keyset pagination)"),
+    approximate: bool = Query(False, description="Allow a planner estimate as total for large results"),
     db: AsyncSession = Depends(get_database),
     user: dict = Depends(verify_clerk_token),
 ):
-    """Get collection logs with filters"""
+    """
+    Get collection logs with filters.
+    
+    Page mode (`page`) also returns the total; every response carries a
+    next_cursor, and passing it as `cursor` fetches the following page by
+    keyset, skipping the count. Totals are cached briefly; `approximate`
+    allows a planner estimate (total_approximate) for large results.
+    """
     
     since = datetime.utcnow() - timedelta(days=days)
     
@@ -88,17 +99,13 @@ async def get_collection_logs(
         query = query.where(f)
         count_query = count_query.where(f)
     
-    # Get total count
-    total = await db.scalar(count_query)
-    
-    # Apply pagination
-    offset = (page - 1) * limit
-    query = query.order_by(CollectionLog.completed_at.desc()).offset(offset).limit(limit)
-    
-    result = await db.execute(query)
-    logs = result.scalars().unique().all()
+    # Newest first, id as tie-breaker
+    order = [CollectionLog.completed_at, CollectionLog.id]
+    logs, next_cursor = await fetch_page(
+        db, query, order, limit, cursor=cursor, offset=(page - 1) * limit
+    )
     
-    return {
+    response = {
         "logs": [
             {
                 "id": str(log.id),
@@ -113,6 +120,19 @@ async def get_collection_logs(
             }
             for log in logs
         ],
-        "total": total or 0,
+        "next_cursor": next_cursor,
     }
+    
+    # Keyset pages skip the count
+    if not cursor:
+        total, estimated = await count_cache.total(
+            db,
+            CollectionLog.__tablename__,
+            count_query,
+            filters={"status": status, "days": days},
+            approximate=approximate,
+        )
+        response.update({"total": total, "total_approximate": estimated})
+    
+    return response
 
@@ -4,8 +4,9 @@ from sqlalchemy import select, func
 from datetime import datetime, timedelta
 
 from app.api.deps import get_database, verify_clerk_token
-from app.models import Release, Review, Promo, CollectionLog, DriverTariff
+from app.models import Release, Promo, CollectionLog, DriverTariff
 from app.models.collection_log import CollectionStatus
+from app.services.review_rollup import review_counts
 
 router = APIRouter()
 
@@ -25,10 +26,9 @@ async def get_dashboard_summary(
         select(func.count(Release.id)).where(Release.collected_at >= week_ago)
     )
     
-    # New reviews this week
-    reviews_count = await db.scalar(
-        select(func.count(Review.id)).where(Review.collected_at >= week_ago)
-    )
+    # New reviews this week (review rollup)
+    counts = review_counts(week_ago)
+    reviews_count = await db.scalar(select(func.sum(counts.c.reviews)))
     
     # Active promos by competitor
     active_promos_query = await db.execute(
@@ -68,7 +68,7 @@ async def get_dashboard_summary(
     return {
         "last_collection": last_log.completed_at.isoformat() if last_log else None,
         "new_releases_week": releases_count or 0,
-        "new_reviews_week": reviews_count or 0,
+        "new_reviews_week": int(reviews_count or 0),
         "active_promos": active_promos_count,
         "tariff_changes_week": tariff_changes or 0,
         "health_status": health_status,
@@ -5,6 +5,13 @@ from datetime import datetime
 
 from app.api.deps import get_database
 from app.config import settings
+from app.services.classification_cache import classification_cache
+from app.services.clerk_auth import jwks_cache, token_cache
+from app.services.count_cache import count_cache
+from app.services.http_clients import http_clients
+from app.services.rate_limiter import gemini_limiter, get_provider_limiter_stats
+from app.services.local_classifier import local_classifier
+from app.services.search_cache import search_cache
 
 router = APIRouter()
 
@@ -29,6 +36,25 @@ async def health_check(db: AsyncSession = Depends(get_database)):
     }
 
 
+@router.get("/health/metrics")
+async def health_metrics():
+    """In-process performance counters for monitoring"""
+    return {
+        "classification_cache": classification_cache.get_stats(),
+        "count_cache": count_cache.get_stats(),
+        "gemini_limiter": gemini_limiter.get_stats(),
+        "search_provider_limiters": get_provider_limiter_stats(),
+        "http_clients": http_clients.get_stats(),
+        "search_cache": search_cache.get_stats(),
+        "auth": {
+            "jwks": jwks_cache.get_stats(),
+            "verified_tokens": token_cache.get_stats(),
+        },
+        "local_classifier": local_classifier.get_stats(),
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+
+
 @router.get("/")
 async def root():
     """Root endpoint"""
@@ -1,16 +1,22 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Header, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from pydantic import BaseModel
 from typing import Optional, List
 from uuid import UUID
 from datetime import datetime, timedelta
-import asyncio
+import json
 import structlog
 
 from app.api.deps import get_database, verify_clerk_token
-from app.models import NewsItem
+from app.api.pagination import fetch_page, nulls_last_date
+from app.config import settings
+from app.models import NewsItem, NewsQueryState
+from app.services.count_cache import count_cache
 from app.services.news_scraper import NewsScraperService
+from app.services.news_collection_jobs import collection_jobs
+from app.services.news_query_state import query_stats
 from app.news_config.news_sources import get_predefined_queries
 
 router = APIRouter()
@@ -65,12 +71,26 @@ async def get_news_items(
     competitor: Optional[str] = None,
     days: int = Query(30, ge=1, le=365),
     relevant_only: bool = Query(True),
+    group_stories: bool = Query(False, description="Show one item per story cluster"),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (keyset pagination)"),
+    approximate: bool = Query(False, description="Allow a planner estimate as total for large results"),
     db: AsyncSession = Depends(get_database),
     # user: dict = Depends(verify_clerk_token),  # TODO: re-enable auth after testing
 ):
-    """Get previously scraped news items"""
+    """
+    Get previously scraped news items.
+    
+    With group_stories, syndicated copies of a story are collapsed into
+    its most recently published item, with story_size and
+    story_sources describing the rest of the cluster.
+    
+    Page mode (`page`) also returns the total; passing a response's
+    next_cursor as `cursor` fetches the following page by keyset instead,
+    skipping the count. Totals are cached briefly; `approximate` allows a
+    planner estimate (total_approximate) for large results.
+    """
     
     since = datetime.utcnow() - timedelta(days=days)
     
@@ -85,22 +105,65 @@ async def get_news_items(
     if relevant_only:
         filters.append(NewsItem.is_relevant == True)
     
-    # Count
-    count_query = select(func.count(NewsItem.id)).where(*filters)
-    total = await db.scalar(count_query)
-    
-    # Fetch
+    order = NewsItem.published_date.desc().nullslast()
+    # Page order: newest first (NULL dates last), id as tie-breaker
+    page_order = [nulls_last_date(NewsItem.published_date), NewsItem.id]
     offset = (page - 1) * limit
-    result = await db.execute(
-        select(NewsItem)
-        .where(*filters)
-        .order_by(NewsItem.published_date.desc().nullslast())
-        .offset(offset)
-        .limit(limit)
-    )
-    items = result.scalars().all()
+    count_query = None
+    story_sizes = {}
+    story_sources = {}
     
-    return {
+    if group_stories:
+        # Rank items within each story; items without a cluster are their own story
+        story = func.coalesce(NewsItem.story_cluster_id, NewsItem.id)
+        ranked = (
+            select(
+                NewsItem.id.label("id"),
+                story.label("story_id"),
+                func.row_number().over(
+                    partition_by=story,
+                    order_by=(order, NewsItem.collected_at.desc()),
+                ).label("story_rank"),
+                func.count().over(partition_by=story).label("story_size"),
+            )
+            .where(*filters)
+            .subquery()
+        )
+        
+        count_query = select(func.count()).select_from(ranked).where(ranked.c.story_rank == 1)
+        
+        rows, next_cursor = await fetch_page(
+            db,
+            select(NewsItem, ranked.c.story_id, ranked.c.story_size)
+            .join(ranked, ranked.c.id == NewsItem.id)
+            .where(ranked.c.story_rank == 1),
+            page_order,
+            limit,
+            cursor=cursor,
+            offset=offset,
+        )
+        items = [item for item, _, _ in rows]
+        story_sizes = {item.id: size for item, _, size in rows}
+        
+        # Other outlets that carried the multi-item stories on this page
+        multi = {story_id: item.id for item, story_id, size in rows if size > 1}
+        if multi:
+            sources = await db.execute(
+                select(story, NewsItem.source_name)
+                .where(*filters, story.in_(list(multi)))
+                .distinct()
+            )
+            for story_id, source_name in sources.all():
+                if source_name:
+                    story_sources.setdefault(multi[story_id], []).append(source_name)
+    else:
+        count_query = select(func.count(NewsItem.id)).where(*filters)
+        
+        items, next_cursor = await fetch_page(
+            db, select(NewsItem).where(*filters), page_order, limit, cursor=cursor, offset=offset
+        )
+    
+    response = {
         "items": [
             {
                 "id": str(item.id),
@@ -115,13 +178,38 @@ async def get_news_items(
                 "relevance_score": item.relevance_score,
                 "search_query": item.search_query,
                 "collected_at": item.collected_at.isoformat(),
+                "story_cluster_id": str(item.story_cluster_id or item.id),
+                "story_size": story_sizes.get(item.id, 1),
+                "story_sources": sorted(story_sources.get(item.id, [])),
             }
             for item in items
         ],
-        "total": total or 0,
-        "page": page,
-        "pages": (total or 0) // limit + (1 if (total or 0) % limit else 0),
+        "next_cursor": next_cursor,
     }
+    
+    # Keyset pages skip the count
+    if not cursor:
+        total, estimated = await count_cache.total(
+            db,
+            NewsItem.__tablename__,
+            count_query,
+            filters={
+                "query": query,
+                "competitor": competitor,
+                "days": days,
+                "relevant_only": relevant_only,
+                "group_stories": group_stories,
+            },
+            approximate=approximate,
+        )
+        response.update({
+            "total": total,
+            "total_approximate": estimated,
+            "page": page,
+            "pages": total // limit + (1 if total % limit else 0),
+        })
+    
+    return response
 
 
 @router.delete("/{item_id}")
@@ -142,6 +230,7 @@ async def mark_news_irrelevant(
     
     item.is_relevant = False
     await db.commit()
+    count_cache.invalidate(NewsItem.__tablename__)
     
     return {"status": "ok", "id": str(item_id)}
 
@@ -168,57 +257,121 @@ async def get_suggested_topics(
     return SuggestedTopics()
 
 
-@router.post("/collect")
+@router.post("/collect", status_code=202)
 async def collect_news(
-    db: AsyncSession = Depends(get_database),
+    response: Response,
+    force: bool = Query(False, description="Search every query, ignoring refresh intervals, watermarks and the query plan"),
+    wait: bool = Query(False, description="Block until the collection finishes"),
     # user: dict = Depends(verify_clerk_token),  # TODO: re-enable auth after testing
 ):
     """
     Collect news using predefined search queries.
     
-    This endpoint triggers automatic news collection from all predefined
-    search queries. Used by the "Обновить данные" button in the UI.
+    Starts a background collection job over all predefined search queries
+    and returns its id right away; used by the "Обновить данные" button in
+    the UI. Progress is available from GET /collect/{job_id} and as a
+    Server-Sent Events stream from GET /collect/{job_id}/events. If a
+    collection is already running, that job is returned instead.
+    
+    Queries searched within their refresh interval (and, with
+    NEWS_QUERY_PLAN_ENABLED, queries left out of the optimized plan) are
+    skipped unless `force` is set.
     """
-    queries = get_predefined_queries()
-    scraper = NewsScraperService(db)
+    job = collection_jobs.start(
+        get_predefined_queries(),
+        force=force,
+        competitors=None,
+        language="es",
+    )
+    
+    if wait:
+        await collection_jobs.wait(job)
+        response.status_code = 200
     
-    total_results = []
-    errors = []
+    return job.to_dict()
+
+
+@router.get("/collect/{job_id}")
+async def get_collection_job(
+    job_id: UUID,
+    # user: dict = Depends(verify_clerk_token),  # TODO: re-enable auth after testing
+):
+    """Progress of a background collection job"""
+    job = collection_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Collection job not found")
+    return job.to_dict()
+
+
+@router.get("/collect/{job_id}/events")
+async def stream_collection_job(
+    job_id: UUID,
+    request: Request,
+    last_event_id: Optional[int] = Header(None),
+    # user: dict = Depends(verify_clerk_token),  # TODO: re-enable auth after testing
+):
+    """
+    Server-Sent Events stream of a collection job.
     
-    logger.info("Starting news collection", query_count=len(queries))
+    Events: `started` (queries_total, queries_skipped), `item` (a newly
+    saved news item), `query` (per-query completion with new_items and
+    progress counters), then `done` (collection summary) or `failed`.
+    Reconnecting clients resume after their Last-Event-ID.
+    """
+    job = collection_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Collection job not found")
     
-    for query in queries:
-        try:
-            logger.info("Searching", query=query)
-            results = await scraper.search(
-                query=query,
-                competitors=None,
-                language="es",
+    async def events():
+        async for event in job.stream(last_event_id or 0, heartbeat=settings.NEWS_COLLECTION_SSE_HEARTBEAT):
+            if await request.is_disconnected():
+                return
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield (
+                f"id: {event['id']}\n"
+                f"event: {event['event']}\n"
+                f"data: {json.dumps(event['data'], default=str)}\n\n"
             )
-            total_results.extend(results)
-            logger.info("Search complete", query=query, results_count=len(results))
-            
-            # Small delay between requests to avoid rate limiting
-            await asyncio.sleep(1)
-            
-        except Exception as e:
-            logger.error("Search failed", query=query, error=str(e))
-            errors.append({"query": query, "error": str(e)})
-    
-    # Remove duplicates by URL
-    unique_results = {r.get("source_url"): r for r in total_results}
-    
-    logger.info("Collection complete", 
-                total_found=len(total_results), 
-                unique=len(unique_results),
-                errors=len(errors))
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Disable proxy buffering
+        },
+    )
+
+
+@router.get("/query-stats")
+async def get_query_stats(
+    db: AsyncSession = Depends(get_database),
+    # user: dict = Depends(verify_clerk_token),  # TODO: re-enable auth after testing
+):
+    """
+    Collection efficiency per search query.
+    
+    new_items_per_call shows how many previously unseen items each paid
+    search call produced; queries are listed least efficient first.
+    """
+    result = await db.execute(select(NewsQueryState))
+    now = datetime.utcnow()
+    queries = sorted(
+        (query_stats(state, now) for state in result.scalars().all()),
+        key=lambda q: (q["new_items_per_call"] is None, q["new_items_per_call"] or 0, q["query"]),
+    )
+    
+    api_calls = sum(q["api_calls"] or 0 for q in queries)
+    new_items = sum(q["new_items"] or 0 for q in queries)
     
     return {
-        "status": "ok",
-        "queries_executed": len(queries),
-        "total_found": len(total_results),
-        "unique_items": len(unique_results),
-        "errors": errors,
-        "results": list(unique_results.values())[:20],  # Return first 20 for preview
+        "queries": queries,
+        "total_queries": len(queries),
+        "due_queries": sum(q["due"] for q in queries),
+        "api_calls": api_calls,
+        "new_items": new_items,
+        "new_items_per_call": round(new_items / api_calls, 2) if api_calls else None,
     }
 
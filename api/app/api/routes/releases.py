@@ -7,8 +7,10 @@ from uuid import UUID
 from datetime import datetime, timedelta
 
 from app.api.deps import get_database, verify_clerk_token
+from app.api.pagination import fetch_page, nulls_last_date
 from app.models import Release, Competitor
 from app.models.release import Platform
+from app.services.count_cache import count_cache
 
 router = APIRouter()
 
@@ -21,10 +23,20 @@ async def get_releases(
     days: int = Query(30, ge=1, le=365),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (keyset pagination)"),
+    approximate: bool = Query(False, description="Allow a planner estimate as total for large results"),
     db: AsyncSession = Depends(get_database),
     user: dict = Depends(verify_clerk_token),
 ):
-    """Get releases with filters and pagination"""
+    """
+    Get releases with filters and pagination.
+    
+    Page mode (`page`) also returns the total; every response carries a
+    next_cursor, and passing it as `cursor` fetches the following page by
+    keyset, skipping the count, at the same cost for any depth. Totals
+    are cached briefly; `approximate` allows a planner estimate
+    (total_approximate) for large results.
+    """
     
     since = datetime.utcnow() - timedelta(days=days)
     
@@ -44,17 +56,13 @@ async def get_releases(
         query = query.where(f)
         count_query = count_query.where(f)
     
-    # Get total count
-    total = await db.scalar(count_query)
-    
-    # Apply pagination
-    offset = (page - 1) * limit
-    query = query.order_by(Release.release_date.desc().nullslast()).offset(offset).limit(limit)
-    
-    result = await db.execute(query)
-    releases = result.scalars().unique().all()
+    # Newest first (NULL dates last), id as tie-breaker
+    order = [nulls_last_date(Release.release_date), Release.id]
+    releases, next_cursor = await fetch_page(
+        db, query, order, limit, cursor=cursor, offset=(page - 1) * limit
+    )
     
-    return {
+    response = {
         "releases": [
             {
                 "id": str(r.id),
@@ -76,10 +84,26 @@ async def get_releases(
             }
             for r in releases
         ],
-        "total": total or 0,
-        "page": page,
-        "pages": (total or 0) // limit + (1 if (total or 0) % limit else 0),
+        "next_cursor": next_cursor,
     }
+    
+    # Keyset pages skip the count
+    if not cursor:
+        total, estimated = await count_cache.total(
+            db,
+            Release.__tablename__,
+            count_query,
+            filters={"competitor_id": competitor_id, "platform": platform, "days": days},
+            approximate=approximate,
+        )
+        response.update({
+            "total": total,
+            "total_approximate": estimated,
+            "page": page,
+            "pages": total // limit + (1 if total % limit else 0),
+        })
+    
+    return response
 
 
 @router.get("/timeline")
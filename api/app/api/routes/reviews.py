@@ -1,15 +1,18 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import Date, select, func, literal_column
 from sqlalchemy.orm import joinedload
 from typing import Optional
 from uuid import UUID
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 from app.api.deps import get_database, verify_clerk_token
-from app.models import Review, Competitor
+from app.api.pagination import fetch_page, nulls_last_date
+from app.models import Review, Competitor, ReviewDailyRollup
 from app.models.release import Platform
 from app.models.review import Sentiment, UserRole
+from app.services.count_cache import count_cache
+from app.services.review_rollup import review_counts
 
 router = APIRouter()
 
@@ -24,10 +27,20 @@ async def get_reviews(
     days: int = Query(30, ge=1, le=365),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (keyset pagination)"),
+    approximate: bool = Query(False, description="Allow a planner estimate as total for large results"),
     db: AsyncSession = Depends(get_database),
     user: dict = Depends(verify_clerk_token),
 ):
-    """Get reviews with filters and pagination"""
+    """
+    Get reviews with filters and pagination.
+    
+    Page mode (`page`) also returns the total; every response carries a
+    next_cursor, and passing it as `cursor` fetches the following page by
+    keyset, skipping the count, at the same cost for any depth. Totals
+    are cached briefly; `approximate` allows a planner estimate
+    (total_approximate) for large results.
+    """
     
     since = datetime.utcnow() - timedelta(days=days)
     
@@ -53,17 +66,13 @@ async def get_reviews(
         query = query.where(f)
         count_query = count_query.where(f)
     
-    # Get total count
-    total = await db.scalar(count_query)
-    
-    # Apply pagination
-    offset = (page - 1) * limit
-    query = query.order_by(Review.review_date.desc().nullslast()).offset(offset).limit(limit)
-    
-    result = await db.execute(query)
-    reviews = result.scalars().unique().all()
+    # Newest first (NULL dates last), id as tie-breaker
+    order = [nulls_last_date(Review.review_date), Review.id]
+    reviews, next_cursor = await fetch_page(
+        db, query, order, limit, cursor=cursor, offset=(page - 1) * limit
+    )
     
-    return {
+    response = {
         "reviews": [
             {
                 "id": str(r.id),
@@ -87,10 +96,32 @@ async def get_reviews(
             }
             for r in reviews
         ],
-        "total": total or 0,
-        "page": page,
-        "pages": (total or 0) // limit + (1 if (total or 0) % limit else 0),
+        "next_cursor": next_cursor,
     }
+    
+    # Keyset pages skip the count
+    if not cursor:
+        total, estimated = await count_cache.total(
+            db,
+            Review.__tablename__,
+            count_query,
+            filters={
+                "competitor_id": competitor_id,
+                "platform": platform,
+                "role": role,
+                "sentiment": sentiment,
+                "days": days,
+            },
+            approximate=approximate,
+        )
+        response.update({
+            "total": total,
+            "total_approximate": estimated,
+            "page": page,
+            "pages": total // limit + (1 if total % limit else 0),
+        })
+    
+    return response
 
 
 @router.get("/stats")
@@ -104,62 +135,43 @@ async def get_review_stats(
     
     since = datetime.utcnow() - timedelta(days=days)
     
-    # Base filter
-    base_filter = [Review.collected_at >= since]
-    if competitor_id:
-        base_filter.append(Review.competitor_id == competitor_id)
-    
-    # Total reviews
-    total = await db.scalar(
-        select(func.count(Review.id)).where(*base_filter)
-    )
-    
-    # By sentiment
-    sentiment_stats = {}
-    for s in Sentiment:
-        count = await db.scalar(
-            select(func.count(Review.id)).where(*base_filter, Review.sentiment == s)
-        )
-        sentiment_stats[s.value] = count or 0
-    
-    # By competitor
+    # One grouped pass over the review rollup: per competitor totals,
+    # rating sums and sentiment counts
+    counts = review_counts(since)
     result = await db.execute(
         select(
             Competitor.name,
             Competitor.id,
-            func.count(Review.id).label("total"),
-            func.avg(Review.rating).label("avg_rating"),
+            func.sum(counts.c.reviews).label("total"),
+            func.sum(counts.c.rating_sum).label("rating_sum"),
+            *(func.sum(counts.c.reviews).filter(counts.c.sentiment == s).label(s.value) for s in Sentiment),
         )
-        .join(Review.competitor)
-        .where(Review.collected_at >= since)
+        .join(Competitor, Competitor.id == counts.c.competitor_id)
         .group_by(Competitor.id, Competitor.name)
+        .having(func.sum(counts.c.reviews) > 0)
     )
-    by_competitor = []
-    for row in result:
-        # Get sentiment breakdown for this competitor
-        comp_sentiments = {}
-        for s in Sentiment:
-            count = await db.scalar(
-                select(func.count(Review.id)).where(
-                    Review.collected_at >= since,
-                    Review.competitor_id == row.id,
-                    Review.sentiment == s,
-                )
-            )
-            comp_sentiments[s.value] = count or 0
-        
-        by_competitor.append({
+    rows = result.all()
+    
+    # Overall figures honour competitor_id; by_competitor lists every competitor
+    selected = [row for row in rows if not competitor_id or row.id == competitor_id]
+    total = sum(int(row.total) for row in selected)
+    sentiment_stats = {s.value: sum(int(getattr(row, s.value) or 0) for row in selected) for s in Sentiment}
+    
+    by_competitor = [
+        {
             "competitor": row.name,
             "competitor_id": str(row.id),
-            "total": row.total,
-            "positive": comp_sentiments.get("positive", 0),
-            "neutral": comp_sentiments.get("neutral", 0),
-            "negative": comp_sentiments.get("negative", 0),
-            "avg_rating": round(float(row.avg_rating), 2) if row.avg_rating else None,
-        })
+            "total": int(row.total),
+            "positive": int(row.positive or 0),
+            "neutral": int(row.neutral or 0),
+            "negative": int(row.negative or 0),
+            "avg_rating": round(float(row.rating_sum) / float(row.total), 2),
+        }
+        for row in rows
+    ]
     
     return {
-        "total": total or 0,
+        "total": total,
         "by_sentiment": sentiment_stats,
         "by_competitor": by_competitor,
         "trending_categories": [],  # TODO: Implement category trending
@@ -182,44 +194,159 @@ async def get_review_trends(
     prev_start = current_start - timedelta(days=days)
     prev_end = current_start
     
-    # Get competitors
-    competitors_result = await db.execute(
-        select(Competitor).where(Competitor.is_active == True)
+    # Negative reviews of both periods per active competitor, from the review rollup
+    periods = []
+    for counts in (review_counts(current_start), review_counts(prev_start, prev_end)):
+        periods.append(
+            select(counts.c.competitor_id, func.sum(counts.c.reviews).label("negative"))
+            .where(counts.c.sentiment == Sentiment.NEGATIVE)
+            .group_by(counts.c.competitor_id)
+            .subquery()
+        )
+    current, previous = periods
+    result = await db.execute(
+        select(
+            Competitor.name,
+            func.coalesce(current.c.negative, 0).label("current_negative"),
+            func.coalesce(previous.c.negative, 0).label("prev_negative"),
+        )
+        .outerjoin(current, current.c.competitor_id == Competitor.id)
+        .outerjoin(previous, previous.c.competitor_id == Competitor.id)
+        .where(Competitor.is_active == True)
     )
-    competitors = competitors_result.scalars().all()
     
     trends = []
-    for comp in competitors:
-        # Current period negative reviews
-        current_negative = await db.scalar(
-            select(func.count(Review.id)).where(
-                Review.competitor_id == comp.id,
-                Review.collected_at >= current_start,
-                Review.sentiment == Sentiment.NEGATIVE,
-            )
-        )
-        
-        # Previous period negative reviews
-        prev_negative = await db.scalar(
-            select(func.count(Review.id)).where(
-                Review.competitor_id == comp.id,
-                Review.collected_at >= prev_start,
-                Review.collected_at < prev_end,
-                Review.sentiment == Sentiment.NEGATIVE,
-            )
-        )
-        
+    for row in result:
         # Calculate change
-        if prev_negative and prev_negative > 0:
-            change = ((current_negative or 0) - prev_negative) / prev_negative * 100
+        if row.prev_negative > 0:
+            change = (int(row.current_negative) - int(row.prev_negative)) / int(row.prev_negative) * 100
         else:
             change = 0
         
         trends.append({
-            "competitor": comp.name,
+            "competitor": row.name,
             "sentiment_change": round(change, 1),
             "top_categories": [],  # TODO: Implement
         })
     
     return {"trends": trends}
 
+
+def _bucket_start(day: date, bucket: str) -> date:
+    """First day of the day/week (ISO, Monday)/month bucket containing `day`"""
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(start: date, bucket: str) -> date:
+    if bucket == "week":
+        return start + timedelta(days=7)
+    if bucket == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+@router.get("/timeseries")
+async def get_review_timeseries(
+    bucket: str = Query("day", regex="^(day|week|month)$"),
+    days: int = Query(90, ge=1, le=730),
+    competitor_id: Optional[UUID] = None,
+    platform: Optional[str] = Query(None, regex="^(ios|android)$"),
+    role: Optional[str] = Query(None, regex="^(driver|rider)$"),
+    db: AsyncSession = Depends(get_database),
+    user: dict = Depends(verify_clerk_token),
+):
+    """
+    Review volume, average rating and sentiment share per competitor over time.
+    
+    Reviews collected in the last `days` days (whole days) are grouped
+    into day, week (ISO, starting Monday) or month buckets from the
+    review rollup, so a year of data costs a few hundred rollup rows.
+    Every competitor series has a point for every bucket; buckets
+    without reviews have zero counts and null averages.
+    """
+    
+    today = datetime.utcnow().date()
+    start = today - timedelta(days=days - 1)
+    
+    filters = [ReviewDailyRollup.day >= start]
+    if competitor_id:
+        filters.append(ReviewDailyRollup.competitor_id == competitor_id)
+    if platform:
+        filters.append(ReviewDailyRollup.platform == Platform(platform))
+    if role:
+        filters.append(ReviewDailyRollup.role == UserRole(role))
+    
+    # Bucket inlined (validated above): a bound parameter would differ between SELECT and GROUP BY
+    period = func.date_trunc(literal_column(f"'{bucket}'"), ReviewDailyRollup.day).cast(Date).label("bucket")
+    result = await db.execute(
+        select(
+            ReviewDailyRollup.competitor_id,
+            period,
+            func.sum(ReviewDailyRollup.reviews).label("reviews"),
+            func.sum(ReviewDailyRollup.rating_sum).label("rating_sum"),
+            *(
+                func.sum(ReviewDailyRollup.reviews).filter(ReviewDailyRollup.sentiment == s).label(s.value)
+                for s in Sentiment
+            ),
+        )
+        .where(*filters)
+        .group_by(ReviewDailyRollup.competitor_id, period)
+        .having(func.sum(ReviewDailyRollup.reviews) > 0)
+    )
+    points = {(row.competitor_id, row.bucket): row for row in result.all()}
+    
+    competitor_ids = {competitor for competitor, _ in points}
+    if competitor_id:
+        competitor_ids.add(competitor_id)
+    competitors = []
+    if competitor_ids:
+        competitors_result = await db.execute(
+            select(Competitor.id, Competitor.name)
+            .where(Competitor.id.in_(competitor_ids))
+            .order_by(Competitor.name)
+        )
+        competitors = competitors_result.all()
+    
+    # Gap-filled bucket starts; the first bucket may begin before `start`
+    buckets = []
+    current = _bucket_start(start, bucket)
+    while current <= today:
+        buckets.append(current)
+        current = _next_bucket(current, bucket)
+    
+    series = []
+    for comp in competitors:
+        comp_points = []
+        for bucket_start in buckets:
+            row = points.get((comp.id, bucket_start))
+            reviews = int(row.reviews) if row else 0
+            counts = {s.value: int(getattr(row, s.value) or 0) if row else 0 for s in Sentiment}
+            classified = sum(counts.values())
+            comp_points.append({
+                "bucket": bucket_start.isoformat(),
+                "reviews": reviews,
+                "avg_rating": round(float(row.rating_sum) / reviews, 2) if reviews else None,
+                **counts,
+                "sentiment_share": (
+                    {key: round(count / classified, 3) for key, count in counts.items()}
+                    if classified else None
+                ),
+            })
+        
+        series.append({
+            "competitor": comp.name,
+            "competitor_id": str(comp.id),
+            "points": comp_points,
+        })
+    
+    return {
+        "bucket": bucket,
+        "start": start.isoformat(),
+        "end": today.isoformat(),
+        "buckets": [bucket_start.isoformat() for bucket_start in buckets],
+        "series": series,
+    }
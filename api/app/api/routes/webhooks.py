@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
+from uuid import UUID
 import structlog
 
-from app.api.deps import get_database, verify_webhook_secret
+from app.api.deps import get_database, verify_clerk_token, verify_webhook_secret
+from app.config import settings
+from app.services.ingestion_queue import IngestionQueue
 from app.services.webhook_processor import WebhookProcessor
 
 router = APIRouter()
@@ -34,6 +38,11 @@ async def receive_octoparse_webhook(
     - {competitor}-rider-pe: Rider tariffs
     - appstore-{competitor}: App Store reviews + releases
     - playstore-{competitor}: Play Store reviews + releases
+    
+    With WEBHOOK_ASYNC_INGESTION enabled the payload is only persisted to
+    the ingestion queue and a 202 with the job id is returned; workers
+    process it in the background. A 429 is returned while the backlog is
+    at INGESTION_MAX_BACKLOG.
     """
     
     logger.info(
@@ -43,6 +52,9 @@ async def receive_octoparse_webhook(
         data_count=payload.dataCount,
     )
     
+    if settings.WEBHOOK_ASYNC_INGESTION:
+        return await _enqueue_webhook(payload, db)
+    
     try:
         processor = WebhookProcessor(db)
         result = await processor.process(payload)
@@ -72,6 +84,62 @@ async def receive_octoparse_webhook(
         )
 
 
+async def _enqueue_webhook(payload: OctoparseWebhookPayload, db: AsyncSession) -> JSONResponse:
+    """Persist the payload to the ingestion queue and answer 202"""
+    queue = IngestionQueue(db)
+    
+    backlog = await queue.backlog_size()
+    if backlog >= settings.INGESTION_MAX_BACKLOG:
+        logger.warning("Ingestion queue full", backlog=backlog, task_name=payload.taskName)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Ingestion queue is full, retry later",
+            headers={"Retry-After": "60"},
+        )
+    
+    job = await queue.enqueue(payload.model_dump())
+    logger.info("Webhook queued", job_id=str(job.id), task_name=payload.taskName, backlog=backlog + 1)
+    
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "status": "accepted",
+            "job_id": str(job.id),
+            "task_name": payload.taskName,
+        },
+    )
+
+
+@router.get("/jobs/{job_id}")
+async def get_ingestion_job(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_database),
+    user: dict = Depends(verify_clerk_token),
+):
+    """Get status of a queued webhook ingestion job"""
+    
+    job = await IngestionQueue(db).get(job_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    
+    return {
+        "id": str(job.id),
+        "task_id": job.task_id,
+        "task_name": job.task_name,
+        "status": job.status.value,
+        "data_count": job.data_count,
+        "processed": (job.result or {}).get("processed"),
+        "result": job.result,
+        "attempts": job.attempts,
+        "error_message": job.error_message,
+        "created_at": job.created_at.isoformat(),
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "heartbeat_at": job.heartbeat_at.isoformat() if job.heartbeat_at else None,
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+    }
+
+
 @router.post("/test")
 async def test_webhook(
     request: Request,
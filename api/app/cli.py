@@ -0,0 +1,158 @@
+"""
+Command line entry points for background jobs.
+
+Run from the api directory:
+    python -m app.cli ingest-worker --workers 4
+    python -m app.cli train-classifier
+    python -m app.cli classify-pending --once
+    python -m app.cli optimize-queries --coverage 0.95
+    python -m app.cli rebuild-review-rollup --since 2025-01-01
+"""
+import argparse
+import asyncio
+from datetime import date
+import structlog
+
+logger = structlog.get_logger()
+
+
+async def run_ingest_worker(args: argparse.Namespace):
+    """Drain the webhook ingestion queue until interrupted"""
+    from app.services.ingestion_queue import IngestionWorkerPool
+    
+    pool = IngestionWorkerPool(workers=args.workers, poll_interval=args.poll_interval)
+    await pool.run_forever()
+
+
+async def run_train_classifier(args: argparse.Namespace):
+    """Train the local review classifier from Gemini-labelled reviews"""
+    import random
+    from app.config import settings
+    from app.db.session import async_session_maker
+    from app.services.local_classifier import LocalReviewClassifier, load_training_samples, evaluate
+    
+    async with async_session_maker() as db:
+        samples = await load_training_samples(db, limit=args.limit)
+    
+    if len(samples) < settings.LOCAL_CLASSIFIER_MIN_SAMPLES:
+        logger.error(
+            "Not enough labelled reviews to train",
+            samples=len(samples),
+            required=settings.LOCAL_CLASSIFIER_MIN_SAMPLES,
+        )
+        return
+    
+    # Report quality on a holdout split, then train on everything
+    random.Random(42).shuffle(samples)
+    holdout_size = max(1, int(len(samples) * args.holdout))
+    holdout, train = samples[:holdout_size], samples[holdout_size:]
+    
+    model = LocalReviewClassifier().fit(train)
+    metrics = evaluate(model, holdout, settings.LOCAL_CLASSIFIER_THRESHOLD)
+    logger.info("Local classifier holdout", threshold=settings.LOCAL_CLASSIFIER_THRESHOLD, **metrics)
+    
+    model = LocalReviewClassifier().fit(samples)
+    output = args.output or settings.LOCAL_CLASSIFIER_PATH
+    model.save(output)
+    logger.info("Local classifier saved", path=output, samples=model.samples)
+
+
+async def run_classify_pending(args: argparse.Namespace):
+    """Classify reviews and releases ingested with DEFERRED_CLASSIFICATION"""
+    from app.services.classification_worker import DeferredClassificationWorker
+    
+    worker = DeferredClassificationWorker(batch_size=args.batch_size, poll_interval=args.poll_interval)
+    if args.once:
+        classified = await worker.drain()
+        logger.info("Pending rows drained", classified=classified)
+    else:
+        await worker.run_forever()
+
+
+async def run_optimize_queries(args: argparse.Namespace):
+    """Print the greedy set cover plan for the predefined news queries"""
+    from app.db.session import async_session_maker
+    from app.news_config.news_sources import generate_search_queries, get_predefined_queries
+    from app.services.news_query_optimizer import build_query_plan
+    
+    queries = generate_search_queries() if args.generated else get_predefined_queries()
+    async with async_session_maker() as db:
+        plan = await build_query_plan(db, queries, coverage_target=args.coverage, window_days=args.window_days)
+    
+    calls = plan["api_calls_per_run"]
+    print(f"Unique URLs in the last {plan['window_days']} days: {plan['total_urls']}")
+    print(
+        f"Plan covers {plan['covered_urls']} ({(plan['coverage'] or 0):.1%}, target {plan['coverage_target']:.0%}) "
+        f"with {calls['after']} of {calls['before']} queries per run"
+    )
+    
+    print("\nSelected (in greedy order):")
+    for entry in plan["selected"]:
+        print(f"  +{entry['marginal_urls']:>4}  {entry['coverage']:>6.1%}  {entry['query']}")
+    
+    if plan["dropped"]:
+        print("\nDropped (URLs only this query found / all URLs):")
+        for entry in plan["dropped"]:
+            print(f"  {entry['unique_urls']:>4} / {entry['urls']:<4}  {entry['query']}")
+    
+    if plan["untested"]:
+        print("\nNo history yet (kept in the plan):")
+        for query in plan["untested"]:
+            print(f"  {query}")
+
+
+async def run_rebuild_review_rollup(args: argparse.Namespace):
+    """Recompute review_daily_rollup from the reviews table"""
+    from app.db.session import async_session_maker
+    from app.services.review_rollup import rebuild_review_rollup
+    
+    since = date.fromisoformat(args.since) if args.since else None
+    async with async_session_maker() as db:
+        rows = await rebuild_review_rollup(db, since=since)
+    print(f"Rollup rows written: {rows}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    ingest = subparsers.add_parser("ingest-worker", help="Process queued Octoparse webhooks")
+    ingest.add_argument("--workers", type=int, default=None, help="Concurrent workers (default: INGESTION_WORKERS)")
+    ingest.add_argument("--poll-interval", type=float, default=None, help="Seconds between polls of an empty queue")
+    ingest.set_defaults(handler=run_ingest_worker)
+    
+    train = subparsers.add_parser("train-classifier", help="Train the local review classifier")
+    train.add_argument("--limit", type=int, default=None, help="Use only the newest N labelled reviews (default: LOCAL_CLASSIFIER_MAX_SAMPLES, 0 = all)")
+    train.add_argument("--holdout", type=float, default=0.1, help="Fraction of reviews held out for evaluation")
+    train.add_argument("--output", default=None, help="Model path (default: LOCAL_CLASSIFIER_PATH)")
+    train.set_defaults(handler=run_train_classifier)
+    
+    pending = subparsers.add_parser("classify-pending", help="Classify reviews/releases stored as pending")
+    pending.add_argument("--once", action="store_true", help="Exit once nothing is pending instead of polling")
+    pending.add_argument("--batch-size", type=int, default=None, help="Rows per batch (default: CLASSIFICATION_WORKER_BATCH_SIZE)")
+    pending.add_argument("--poll-interval", type=float, default=None, help="Seconds between scans when idle")
+    pending.set_defaults(handler=run_classify_pending)
+    
+    optimize = subparsers.add_parser("optimize-queries", help="Report a minimized news query plan")
+    optimize.add_argument("--coverage", type=float, default=None, help="Share of unique URLs to keep (default: NEWS_QUERY_PLAN_COVERAGE)")
+    optimize.add_argument("--window-days", type=int, default=None, help="Days of URL history (default: NEWS_QUERY_PLAN_WINDOW_DAYS)")
+    optimize.add_argument("--generated", action="store_true", help="Plan generate_search_queries() instead of PREDEFINED_QUERIES")
+    optimize.set_defaults(handler=run_optimize_queries)
+    
+    rollup = subparsers.add_parser("rebuild-review-rollup", help="Recompute the daily review rollup")
+    rollup.add_argument("--since", default=None, help="Only days from this date (YYYY-MM-DD); default: all")
+    rollup.set_defaults(handler=run_rebuild_review_rollup)
+    
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    try:
+        asyncio.run(args.handler(args))
+    except KeyboardInterrupt:
+        logger.info("Interrupted")
+
+
+if __name__ == "__main__":
+    main()
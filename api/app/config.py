@@ -15,19 +15,63 @@ class Settings(BaseSettings):
     DATABASE_URL: str = "postgresql+asyncpg://localhost/yango_intel"
     DATABASE_ECHO: bool = False
     
+    # List totals (page mode of the list endpoints)
+    COUNT_CACHE_TTL: int = 60  # Seconds an exact total is reused for the same filters
+    COUNT_CACHE_SIZE: int = 1000  # In-process LRU entries
+    COUNT_ESTIMATE_MIN_ROWS: int = 10000  # approximate=true: planner estimates below this are counted exactly
+    
     # Security
     WEBHOOK_SECRET: str = "change-me-in-production"
     ALLOWED_ORIGINS: str = "*"
     
+    # Webhook ingestion
+    WEBHOOK_BULK_INSERT: bool = True  # INSERT ... ON CONFLICT for app store reviews
+    WEBHOOK_INSERT_CHUNK_SIZE: int = 500  # Rows per multi-row INSERT
+    WEBHOOK_ASYNC_INGESTION: bool = False  # Queue payloads and return 202 instead of processing inline
+    INGESTION_WORKERS: int = 2  # In-process queue workers (0 = run `python -m app.cli ingest-worker` instead)
+    INGESTION_MAX_BACKLOG: int = 100  # Pending jobs before the webhook answers 429
+    INGESTION_POLL_INTERVAL: float = 2.0  # Seconds between polls of an empty queue
+    INGESTION_MAX_ATTEMPTS: int = 3
+    INGESTION_STALE_AFTER: int = 900  # Seconds without a heartbeat before a 'processing' job is reclaimed
+    INGESTION_HEARTBEAT_INTERVAL: float = 60.0  # Seconds between lease renewals of a running job
+    DEFERRED_CLASSIFICATION: bool = False  # Store reviews/releases as pending and classify in the background
+    CLASSIFICATION_WORKER_ENABLED: bool = True  # Run the pending-row worker in the API process
+    CLASSIFICATION_WORKER_BATCH_SIZE: int = 200  # Pending rows classified and updated per batch
+    CLASSIFICATION_WORKER_INTERVAL: float = 5.0  # Seconds between scans once nothing is pending
+    CLASSIFICATION_CLAIM_TIMEOUT: int = 600  # Seconds before rows claimed by a vanished worker are classified again
+    
     # Clerk Auth
     CLERK_JWKS_URL: Optional[str] = None
     CLERK_ISSUER: Optional[str] = None
+    CLERK_JWKS_TTL: int = 3600  # Seconds cached signing keys are trusted without a refetch
+    CLERK_JWKS_REFRESH_INTERVAL: int = 900  # Seconds between background JWKS refreshes
+    CLERK_JWKS_MIN_REFETCH_INTERVAL: float = 30.0  # Min seconds between refetches on unknown kid
+    CLERK_TOKEN_CACHE_SIZE: int = 10000  # Verified token payloads kept in memory
+    CLERK_TOKEN_CACHE_TTL: int = 300  # Max seconds a verified token is cached (also capped by exp)
     
     # AI Services
     # Google Gemini (primary)
     GOOGLE_API_KEY: Optional[str] = None
     GEMINI_MODEL: str = "gemini-2.0-flash"  # Fast & cheap, good for classification
     GEMINI_MODEL_PRO: str = "gemini-1.5-pro"  # For digest generation
+    CLASSIFIER_CONCURRENCY: int = 8  # Max in-flight classification calls per batch
+    CLASSIFIER_TIMEOUT: float = 30.0  # Seconds per Gemini classification attempt
+    CLASSIFIER_BATCH_SIZE: int = 20  # Reviews per multi-item prompt (1 = one call per review)
+    CLASSIFIER_BATCH_TOKEN_BUDGET: int = 4000  # Estimated input tokens per multi-item prompt
+    CLASSIFICATION_CACHE_SIZE: int = 10000  # In-process LRU entries
+    CLASSIFICATION_CACHE_PERSIST: bool = True  # Back the LRU with the classification_cache table
+    LOCAL_CLASSIFIER_ENABLED: bool = True  # Try the local model before Gemini
+    LOCAL_CLASSIFIER_PATH: str = "models/review_classifier.npz"  # Written by `python -m app.cli train-classifier`
+    LOCAL_CLASSIFIER_THRESHOLD: float = 0.9  # Min role and sentiment probability to skip Gemini
+    LOCAL_CLASSIFIER_FEATURES: int = 262144  # Hashed n-gram feature space
+    LOCAL_CLASSIFIER_MIN_SAMPLES: int = 200  # Labelled reviews required to train
+    LOCAL_CLASSIFIER_MAX_SAMPLES: int = 200000  # Newest labelled reviews trained on (0 = all)
+    LOCAL_CLASSIFIER_RELOAD_INTERVAL: float = 30.0  # Seconds between checks for a retrained model file
+    GEMINI_RPM: int = 60  # Requests per minute shared by all Gemini callers
+    GEMINI_TPM: int = 1000000  # Tokens per minute (0 = unlimited)
+    GEMINI_MAX_CONCURRENCY: int = 8  # Upper bound of the adaptive concurrency window
+    GEMINI_MAX_RETRIES: int = 3  # Retries of a throttled (429/5xx) call
+    GEMINI_RETRY_BACKOFF: float = 1.0  # Base seconds for exponential backoff
     
     # Anthropic (optional fallback)
     ANTHROPIC_API_KEY: Optional[str] = None
@@ -42,6 +86,47 @@ class Settings(BaseSettings):
     TAVILY_API_KEY: Optional[str] = None
     SERPAPI_KEY: Optional[str] = None
     
+    # News collection
+    NEWS_COLLECT_WORKERS: int = 4  # Predefined queries searched concurrently
+    NEWS_QUERY_TIMEOUT: float = 90.0  # Seconds before a query is reported as failed
+    NEWS_DUPLICATE_SIMILARITY: float = 0.7  # Min estimated title+summary word overlap (Jaccard) for the same story
+    NEWS_CLUSTER_WINDOW_DAYS: int = 7  # How far back stories are matched
+    NEWS_INCREMENTAL_COLLECTION: bool = True  # Skip fresh queries and only ask for news since the last seen
+    NEWS_QUERY_REFRESH_INTERVAL: int = 21600  # Seconds before a productive query is searched again
+    NEWS_QUERY_MAX_REFRESH_INTERVAL: int = 172800  # Cap for queries whose interval doubled after empty runs
+    NEWS_QUERY_OVERLAP_DAYS: int = 2  # Days before the newest seen item still searched (late indexing)
+    NEWS_QUERY_PLAN_ENABLED: bool = False  # Collect only the optimized (set cover) query plan
+    NEWS_QUERY_PLAN_COVERAGE: float = 0.95  # Share of historical unique URLs the plan must still find
+    NEWS_QUERY_PLAN_WINDOW_DAYS: int = 60  # URL history the plan is computed from
+    NEWS_QUERY_PLAN_EXPLORE_DAYS: int = 7  # Queries left out of the plan still run this often
+    NEWS_COLLECTION_JOB_HISTORY: int = 20  # Finished background collection jobs kept for status lookups
+    NEWS_COLLECTION_SSE_HEARTBEAT: float = 15.0  # Seconds between keep-alive comments on idle progress streams
+    SEARCH_PROVIDER_RPM: int = 30  # Requests per minute per search provider
+    SEARCH_PROVIDER_CONCURRENCY: int = 4  # Max in-flight requests per search provider
+    SEARCH_PROVIDER_MAX_RETRIES: int = 2  # Retries of a throttled (429/5xx) search
+    SEARCH_STRATEGY: str = "sequential"  # Multi-provider search: sequential, race, hedge or merge
+    SEARCH_RACE_FANOUT: int = 2  # Providers run at once by race and merge
+    SEARCH_HEDGE_PERCENTILE: float = 0.9  # Latency quantile after which hedge starts the next provider
+    SEARCH_HEDGE_DELAY: float = 10.0  # Hedge delay until a provider has latency history
+    SEARCH_HEDGE_MIN_SAMPLES: int = 5  # Calls before a provider's latency quantiles are used
+    SEARCH_MERGE_DEADLINE: float = 20.0  # Seconds merge waits for providers
+    SEARCH_ADAPTIVE_ORDER: bool = True  # Order providers by observed latency, failures and yield
+    SEARCH_EWMA_ALPHA: float = 0.2  # Weight of the latest call in provider averages
+    SEARCH_BREAKER_THRESHOLD: int = 3  # Consecutive failures before a provider is skipped
+    SEARCH_BREAKER_COOLDOWN: float = 120.0  # Seconds before a skipped provider gets a trial call
+    SEARCH_CACHE_ENABLED: bool = True  # Reuse results of identical searches
+    SEARCH_CACHE_TTL: int = 900  # Seconds a search result stays fresh
+    SEARCH_CACHE_SIZE: int = 1000  # In-process LRU entries
+    SEARCH_CACHE_PERSIST: bool = True  # Back the LRU with the search_cache table
+    
+    # Outbound HTTP (shared clients, one connection pool per upstream host)
+    HTTP_MAX_CONNECTIONS: int = 20  # Connections per upstream host
+    HTTP_MAX_KEEPALIVE: int = 10  # Idle connections kept open per upstream host
+    HTTP_KEEPALIVE_EXPIRY: float = 60.0  # Seconds an idle connection is kept
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_POOL_TIMEOUT: float = 10.0  # Seconds to wait for a free connection
+    HTTP2_ENABLED: bool = True  # Negotiate HTTP/2 where the server supports it (needs the h2 package)
+    
     # Telegram notifications (optional)
     TELEGRAM_BOT_TOKEN: Optional[str] = None
     TELEGRAM_CHAT_ID: Optional[str] = None
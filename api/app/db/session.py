@@ -37,6 +37,12 @@ async def init_db():
             collection_log,
             digest,
             news_item,
+            ingestion_job,
+            classification_cache,
+            search_cache,
+            news_query_state,
+            news_query_hit,
+            review_daily_rollup,
         )
         # Create tables
         await conn.run_sync(Base.metadata.create_all)
@@ -5,6 +5,11 @@ import structlog
 
 from app.config import settings
 from app.db.session import init_db
+from app.services.http_clients import http_clients
+from app.services.clerk_auth import jwks_cache
+from app.services.ingestion_queue import IngestionWorkerPool
+from app.services.news_collection_jobs import collection_jobs
+from app.services.classification_worker import DeferredClassificationWorker
 from app.api.routes import (
     health,
     webhooks,
@@ -44,9 +49,37 @@ async def lifespan(app: FastAPI):
     # Initialize database
     await init_db()
     
+    # Pooled outbound HTTP clients shared by search providers and auth
+    http_clients.open()
+    
+    # Keep Clerk signing keys warm so auth never waits on the JWKS endpoint
+    if settings.CLERK_JWKS_URL:
+        jwks_cache.start()
+    
+    # Background workers for queued webhook payloads
+    ingestion_workers = None
+    if settings.WEBHOOK_ASYNC_INGESTION and settings.INGESTION_WORKERS > 0:
+        ingestion_workers = IngestionWorkerPool()
+        ingestion_workers.start()
+    
+    # Background classification of rows stored as pending
+    classification_worker = None
+    if settings.DEFERRED_CLASSIFICATION and settings.CLASSIFICATION_WORKER_ENABLED:
+        classification_worker = DeferredClassificationWorker()
+        classification_worker.start()
+    
     yield
     
     logger.info("Shutting down application")
+    
+    await collection_jobs.shutdown()
+    if ingestion_workers:
+        await ingestion_workers.stop()
+    if classification_worker:
+        await classification_worker.stop()
+    if settings.CLERK_JWKS_URL:
+        await jwks_cache.stop()
+    await http_clients.close()
 
 
 app = FastAPI(
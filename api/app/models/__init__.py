@@ -6,6 +6,12 @@ from app.models.review import Review, ReviewCategory
 from app.models.collection_log import CollectionLog
 from app.models.digest import Digest
 from app.models.news_item import NewsItem
+from app.models.ingestion_job import IngestionJob
+from app.models.classification_cache import ClassificationCacheEntry
+from app.models.search_cache import SearchCacheEntry
+from app.models.news_query_state import NewsQueryState
+from app.models.news_query_hit import NewsQueryHit
+from app.models.review_daily_rollup import ReviewDailyRollup
 
 __all__ = [
     "Competitor",
@@ -20,5 +26,11 @@ __all__ = [
     "CollectionLog",
     "Digest",
     "NewsItem",
+    "IngestionJob",
+    "ClassificationCacheEntry",
+    "SearchCacheEntry",
+    "NewsQueryState",
+    "NewsQueryHit",
+    "ReviewDailyRollup",
 ]
 
@@ -0,0 +1,24 @@
+from datetime import datetime
+from sqlalchemy import String, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.db.base import Base
+
+
+class ClassificationCacheEntry(Base):
+    """Cached LLM classification keyed by a hash of prompt version, model and input"""
+    __tablename__ = "classification_cache"
+
+    # sha256(kind, prompt version, model, normalized text, rating)
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)  # review / release
+    model: Mapped[str] = mapped_column(String(100), nullable=False)
+    prompt_version: Mapped[str] = mapped_column(String(20), nullable=False)
+    
+    result: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<ClassificationCacheEntry {self.kind} {self.key[:12]}>"
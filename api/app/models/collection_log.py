@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import String, DateTime, ForeignKey, Text, Enum, Integer, Index
+from sqlalchemy import String, DateTime, ForeignKey, Text, Enum, Integer, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 import enum
@@ -50,6 +50,7 @@ class CollectionLog(Base):
     __table_args__ = (
         Index("idx_collection_logs_date", "completed_at"),
         Index("idx_collection_logs_status", "status"),
+        Index("idx_collection_logs_page", text("completed_at DESC"), text("id DESC")),  # Keyset pagination
     )
 
     def __repr__(self) -> str:
@@ -0,0 +1,50 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import String, DateTime, Text, Enum, Integer, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+import enum
+
+from app.db.base import Base
+
+
+class IngestionJobStatus(str, enum.Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class IngestionJob(Base):
+    """Queued Octoparse webhook payload awaiting background processing"""
+    __tablename__ = "ingestion_jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    
+    task_id: Mapped[str | None] = mapped_column(String(100))
+    task_name: Mapped[str | None] = mapped_column(String(100))
+    data_count: Mapped[int] = mapped_column(Integer, default=0)
+    
+    # Raw OctoparseWebhookPayload as received
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    
+    status: Mapped[IngestionJobStatus] = mapped_column(
+        Enum(IngestionJobStatus), default=IngestionJobStatus.PENDING, nullable=False
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    result: Mapped[dict | None] = mapped_column(JSONB)
+    error_message: Mapped[str | None] = mapped_column(Text)
+    
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime)  # Renewed while a worker runs the job
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime)
+
+    __table_args__ = (
+        Index("idx_ingestion_jobs_status", "status", "created_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<IngestionJob {self.task_name} status={self.status.value}>"
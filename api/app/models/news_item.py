@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime, date
-from sqlalchemy import String, DateTime, Date, Text, Enum, Boolean, Index
+from sqlalchemy import String, DateTime, Date, Text, Enum, Boolean, Index, Integer, text
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
 import enum
@@ -34,6 +34,8 @@ class NewsItem(Base):
     
     # Source information
     source_url: Mapped[str | None] = mapped_column(String(1000))
+    canonical_url: Mapped[str | None] = mapped_column(String(1000))  # Tracking params, AMP/mobile variants removed
+    url_hash: Mapped[str | None] = mapped_column(String(32))  # md5 of canonical_url, for dedup
     source_name: Mapped[str | None] = mapped_column(String(200))  # e.g., "El Comercio", "Gestión"
     source_type: Mapped[NewsSource] = mapped_column(Enum(NewsSource), nullable=False)
     
@@ -47,6 +49,12 @@ class NewsItem(Base):
     sentiment: Mapped[str | None] = mapped_column(String(20))  # positive/negative/neutral
     relevance_score: Mapped[float | None] = mapped_column()  # 0.0 - 1.0
     
+    # Near-duplicate detection: MinHash signature of title + summary, its
+    # band keys for indexed lookup, and the story the item belongs to
+    minhash: Mapped[list[int] | None] = mapped_column(ARRAY(Integer))
+    minhash_bands: Mapped[list[int] | None] = mapped_column(ARRAY(Integer))
+    story_cluster_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True))
+    
     # Raw AI response for debugging
     raw_response: Mapped[dict | None] = mapped_column(JSONB)
     
@@ -60,6 +68,14 @@ class NewsItem(Base):
         Index("idx_news_items_date", "published_date"),
         Index("idx_news_items_query", "search_query"),
         Index("idx_news_items_relevant", "is_relevant"),
+        Index("uq_news_items_url_hash", "url_hash", unique=True),
+        Index("idx_news_items_minhash_bands", "minhash_bands", postgresql_using="gin"),
+        Index("idx_news_items_story", "story_cluster_id"),
+        # Keyset pagination: (published_date DESC NULLS LAST, id DESC)
+        Index(
+            "idx_news_items_page",
+            text("coalesce(published_date, '-infinity'::date) DESC"), text("id DESC"),
+        ),
     )
 
     def __repr__(self) -> str:
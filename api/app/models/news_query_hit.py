@@ -0,0 +1,27 @@
+from datetime import datetime
+from sqlalchemy import String, Integer, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class NewsQueryHit(Base):
+    """
+    A URL returned by a news search query.
+    Used to measure how much each query adds over the others (query plan optimizer).
+    """
+    __tablename__ = "news_query_hits"
+
+    query_key: Mapped[str] = mapped_column(String(64), primary_key=True)  # news_query_state.key
+    url_hash: Mapped[str] = mapped_column(String(32), primary_key=True)  # news_items.url_hash
+    
+    hits: Mapped[int] = mapped_column(Integer, default=1)  # Runs that returned the URL
+    first_seen_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    last_seen_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("idx_news_query_hits_last_seen", "last_seen_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<NewsQueryHit {self.query_key[:8]} {self.url_hash[:8]}>"
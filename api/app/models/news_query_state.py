@@ -0,0 +1,45 @@
+from datetime import datetime, date
+from sqlalchemy import String, Text, Integer, DateTime, Date, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class NewsQueryState(Base):
+    """
+    Collection state of a news search query.
+    Used for incremental collection: fresh queries are skipped and the rest
+    only ask for news published since the newest item already seen.
+    """
+    __tablename__ = "news_query_state"
+
+    # sha256 of the normalized query
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    query: Mapped[str] = mapped_column(Text, nullable=False)
+    
+    # Scheduling
+    last_run_at: Mapped[datetime | None] = mapped_column(DateTime)
+    next_run_at: Mapped[datetime | None] = mapped_column(DateTime)
+    refresh_interval: Mapped[int] = mapped_column(Integer, nullable=False)  # seconds
+    
+    # Watermark: newest published_date among the query's results
+    newest_published_date: Mapped[date | None] = mapped_column(Date)
+    
+    # Yield, cumulative and of the last run
+    runs: Mapped[int] = mapped_column(Integer, default=0)
+    failed_runs: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    api_calls: Mapped[int] = mapped_column(Integer, default=0)
+    results_found: Mapped[int] = mapped_column(Integer, default=0)
+    new_items: Mapped[int] = mapped_column(Integer, default=0)
+    last_results: Mapped[int] = mapped_column(Integer, default=0)
+    last_new_items: Mapped[int] = mapped_column(Integer, default=0)
+    last_error: Mapped[str | None] = mapped_column(Text)
+    
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("idx_news_query_state_next_run", "next_run_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<NewsQueryState {self.query[:40]}>"
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, date
 from decimal import Decimal
-from sqlalchemy import String, DateTime, Date, ForeignKey, Numeric, Text, Enum, Integer, UniqueConstraint
+from sqlalchemy import String, DateTime, Date, ForeignKey, Numeric, Text, Enum, Integer, UniqueConstraint, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 import enum
@@ -20,6 +20,11 @@ class Significance(str, enum.Enum):
     BUGFIX = "bugfix"
 
 
+class ClassificationStatus(str, enum.Enum):
+    PENDING = "pending"  # Stored unclassified, waiting for the background worker
+    DONE = "done"
+
+
 class Category(Base):
     """Categories for releases and reviews"""
     __tablename__ = "categories"
@@ -55,6 +60,13 @@ class Release(Base):
     
     significance: Mapped[Significance | None] = mapped_column(Enum(Significance))
     summary_ru: Mapped[str | None] = mapped_column(Text)  # AI-generated summary
+    classification_status: Mapped[ClassificationStatus] = mapped_column(
+        Enum(ClassificationStatus),
+        default=ClassificationStatus.DONE,
+        server_default=ClassificationStatus.DONE.name,
+        nullable=False,
+    )
+    classification_claimed_at: Mapped[datetime | None] = mapped_column(DateTime)  # Set while a worker classifies the row
     
     collected_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
@@ -64,6 +76,15 @@ class Release(Base):
 
     __table_args__ = (
         UniqueConstraint("competitor_id", "platform", "version", name="uq_release_version"),
+        Index(
+            "idx_releases_pending", "collected_at", "id",
+            postgresql_where=text("classification_status = 'PENDING'"),
+        ),
+        # Keyset pagination: (release_date DESC NULLS LAST, id DESC)
+        Index(
+            "idx_releases_page",
+            text("coalesce(release_date, '-infinity'::date) DESC"), text("id DESC"),
+        ),
     )
 
     def __repr__(self) -> str:
@@ -1,12 +1,12 @@
 import uuid
 from datetime import datetime, date
-from sqlalchemy import String, DateTime, Date, ForeignKey, Text, Enum, Integer, SmallInteger, Index
+from sqlalchemy import String, DateTime, Date, ForeignKey, Text, Enum, Integer, SmallInteger, Index, text as sql_text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 import enum
 
 from app.db.base import Base
-from app.models.release import Platform
+from app.models.release import Platform, ClassificationStatus
 
 
 class UserRole(str, enum.Enum):
@@ -45,6 +45,13 @@ class Review(Base):
     role: Mapped[UserRole] = mapped_column(Enum(UserRole), default=UserRole.UNKNOWN)
     sentiment: Mapped[Sentiment | None] = mapped_column(Enum(Sentiment))
     key_topics: Mapped[str | None] = mapped_column(Text)  # JSON array as text
+    classification_status: Mapped[ClassificationStatus] = mapped_column(
+        Enum(ClassificationStatus),
+        default=ClassificationStatus.DONE,
+        server_default=ClassificationStatus.DONE.name,
+        nullable=False,
+    )
+    classification_claimed_at: Mapped[datetime | None] = mapped_column(DateTime)  # Set while a worker classifies the row
     
     collected_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
@@ -58,6 +65,20 @@ class Review(Base):
         Index("idx_reviews_sentiment", "sentiment"),
         Index("idx_reviews_role", "role"),
         Index("idx_reviews_platform", "platform"),
+        Index("idx_reviews_collected", "collected_at"),
+        Index(
+            "idx_reviews_pending", "collected_at", "id",
+            postgresql_where=sql_text("classification_status = 'PENDING'"),
+        ),
+        # Keyset pagination: (review_date DESC NULLS LAST, id DESC)
+        Index(
+            "idx_reviews_page",
+            sql_text("coalesce(review_date, '-infinity'::date) DESC"), sql_text("id DESC"),
+        ),
+        Index(
+            "idx_reviews_competitor_page", "competitor_id",
+            sql_text("coalesce(review_date, '-infinity'::date) DESC"), sql_text("id DESC"),
+        ),
     )
 
     def __repr__(self) -> str:
@@ -0,0 +1,44 @@
+import uuid
+from datetime import datetime, date
+from sqlalchemy import Integer, BigInteger, Date, DateTime, ForeignKey, Enum, Index, text
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base import Base
+from app.models.release import Platform
+from app.models.review import UserRole, Sentiment
+
+
+class ReviewDailyRollup(Base):
+    """
+    Review counts per competitor, platform, collection day, role and sentiment.
+    Maintained in the same transaction as the reviews it counts (review_rollup service).
+    """
+    __tablename__ = "review_daily_rollup"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    competitor_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("competitors.id", ondelete="CASCADE"), nullable=False
+    )
+    platform: Mapped[Platform] = mapped_column(Enum(Platform), nullable=False)
+    day: Mapped[date] = mapped_column(Date, nullable=False)  # Date of reviews.collected_at (UTC)
+    role: Mapped[UserRole | None] = mapped_column(Enum(UserRole))
+    sentiment: Mapped[Sentiment | None] = mapped_column(Enum(Sentiment))  # NULL while pending
+    
+    reviews: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # One row per key; NULL role/sentiment are a key value, not a wildcard
+        Index(
+            "idx_review_daily_rollup_key",
+            "competitor_id", "platform", "day",
+            text("coalesce(role::text, '')"), text("coalesce(sentiment::text, '')"),
+            unique=True,
+        ),
+        Index("idx_review_daily_rollup_day", "day"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<ReviewDailyRollup {self.competitor_id} {self.day} reviews={self.reviews}>"
@@ -0,0 +1,29 @@
+from datetime import datetime
+from sqlalchemy import String, Text, Integer, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.db.base import Base
+
+
+class SearchCacheEntry(Base):
+    """Cached search API results keyed by a hash of provider, max results and normalized query"""
+    __tablename__ = "search_cache"
+
+    # sha256(provider, max_results, normalized query)
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    provider: Mapped[str] = mapped_column(String(100), nullable=False)
+    query: Mapped[str] = mapped_column(Text, nullable=False)  # normalized
+    max_results: Mapped[int] = mapped_column(Integer, nullable=False)
+    
+    results: Mapped[list] = mapped_column(JSONB, nullable=False)
+    
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("idx_search_cache_expires", "expires_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<SearchCacheEntry {self.provider} {self.query[:40]}>"
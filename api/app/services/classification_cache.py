@@ -0,0 +1,148 @@
+"""Content-hash keyed cache for LLM classification results"""
+import hashlib
+from collections import OrderedDict
+from typing import Optional
+import structlog
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.config import settings
+from app.db.session import async_session_maker
+from app.models import ClassificationCacheEntry
+
+logger = structlog.get_logger()
+
+
+class ClassificationCache:
+    """
+    Two-level cache for classification results.
+    
+    An in-process LRU sits in front of the classification_cache table, so
+    identical texts (retried webhooks, re-scraped reviews, release notes
+    shared by iOS and Android) are classified by Gemini only once. Keys
+    include the prompt version and model, so changing either starts a
+    fresh cache instead of serving stale results.
+    
+    Cache failures are logged and treated as misses; they never fail a
+    classification.
+    """
+    
+    def __init__(self, max_size: Optional[int] = None, persist: Optional[bool] = None):
+        self.max_size = max_size or settings.CLASSIFICATION_CACHE_SIZE
+        self.persist = settings.CLASSIFICATION_CACHE_PERSIST if persist is None else persist
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.errors = 0
+    
+    @staticmethod
+    def make_key(
+        kind: str,
+        prompt_version: str,
+        model: str,
+        text: Optional[str],
+        rating: Optional[int] = None,
+    ) -> str:
+        """Build a cache key from the prompt version, model and normalized input"""
+        normalized = " ".join((text or "").lower().split())
+        raw = "\x1f".join([kind, prompt_version, model, str(rating), normalized])
+        return hashlib.sha256(raw.encode()).hexdigest()
+    
+    async def get(self, key: str) -> Optional[dict]:
+        """Look up a single key"""
+        found = await self.get_many([key])
+        return found.get(key)
+    
+    async def get_many(self, keys: list[str]) -> dict[str, dict]:
+        """Look up several keys with at most one database round-trip"""
+        found = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                found[key] = dict(self._entries[key])
+                self.memory_hits += 1
+            else:
+                missing.append(key)
+        
+        if missing and self.persist:
+            try:
+                async with async_session_maker() as db:
+                    result = await db.execute(
+                        select(ClassificationCacheEntry.key, ClassificationCacheEntry.result)
+                        .where(ClassificationCacheEntry.key.in_(missing))
+                    )
+                    for key, value in result.all():
+                        self._remember(key, value)
+                        found[key] = dict(value)
+                        self.db_hits += 1
+            except Exception as e:
+                self.errors += 1
+                logger.warning("Classification cache lookup failed", error=str(e))
+        
+        self.misses += sum(1 for key in missing if key not in found)
+        return found
+    
+    async def set(self, key: str, kind: str, prompt_version: str, model: str, result: dict):
+        """Store a single result"""
+        await self.set_many([(key, result)], kind, prompt_version, model)
+    
+    async def set_many(self, items: list[tuple[str, dict]], kind: str, prompt_version: str, model: str):
+        """Store several results of the same kind"""
+        if not items:
+            return
+        
+        for key, result in items:
+            self._remember(key, result)
+        self.stores += len(items)
+        
+        if not self.persist:
+            return
+        
+        try:
+            async with async_session_maker() as db:
+                await db.execute(
+                    pg_insert(ClassificationCacheEntry)
+                    .values([
+                        {
+                            "key": key,
+                            "kind": kind,
+                            "model": model,
+                            "prompt_version": prompt_version,
+                            "result": result,
+                        }
+                        for key, result in dict(items).items()
+                    ])
+                    .on_conflict_do_nothing(index_elements=[ClassificationCacheEntry.key])
+                )
+                await db.commit()
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Classification cache store failed", error=str(e))
+    
+    def _remember(self, key: str, result: dict):
+        self._entries[key] = dict(result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def get_stats(self) -> dict:
+        """Hit/miss counters for monitoring"""
+        lookups = self.memory_hits + self.db_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "persist": self.persist,
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "errors": self.errors,
+            "hit_rate": round((self.memory_hits + self.db_hits) / lookups, 3) if lookups else None,
+        }
+
+
+# Shared across ClassifierService instances (one is created per request)
+classification_cache = ClassificationCache()
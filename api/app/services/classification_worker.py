@@ -0,0 +1,226 @@
+"""Background classification of reviews and releases stored as pending"""
+import asyncio
+import enum
+from datetime import datetime, timedelta
+from typing import Optional
+import structlog
+from sqlalchemy import select, update, or_, tuple_
+
+from app.config import settings
+from app.db.session import async_session_maker
+from app.models import Release, Review
+from app.models.release import ClassificationStatus, Significance
+from app.models.review import UserRole, Sentiment
+from app.services.classifier import ClassifierService
+from app.services.count_cache import count_cache
+from app.services.review_rollup import ReviewRollupDeltas
+
+logger = structlog.get_logger()
+
+
+def _label(enum_type: type[enum.Enum], value, default: str):
+    """Enum member for a classifier label; `default` when it is not a valid label"""
+    try:
+        return enum_type(value)
+    except ValueError:
+        logger.warning("Invalid classification label", field=enum_type.__name__, value=value)
+        return enum_type(default)
+
+
+class DeferredClassificationWorker:
+    """
+    Drains rows ingested with DEFERRED_CLASSIFICATION.
+    
+    Each pass walks pending rows in (collected_at, id) order with a keyset
+    cursor, classifies a batch, and writes role/sentiment/key_topics (or
+    significance/summary_ru) back with one bulk UPDATE per batch. Batches
+    are claimed (classification_claimed_at) in a short FOR UPDATE SKIP
+    LOCKED transaction, so the in-process worker and
+    `python -m app.cli classify-pending` can run side by side without
+    holding row locks or a transaction open during classifier calls.
+    Claims older than CLASSIFICATION_CLAIM_TIMEOUT (worker crash) are
+    picked up again.
+    """
+    
+    def __init__(self, batch_size: Optional[int] = None, poll_interval: Optional[float] = None):
+        self.batch_size = batch_size or settings.CLASSIFICATION_WORKER_BATCH_SIZE
+        self.poll_interval = poll_interval or settings.CLASSIFICATION_WORKER_INTERVAL
+        self.classifier = ClassifierService()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+    
+    def start(self):
+        """Spawn the worker task on the running event loop"""
+        self._stopping.clear()
+        self._task = asyncio.create_task(self.run_forever())
+        logger.info("Classification worker started", batch_size=self.batch_size)
+    
+    async def stop(self):
+        """Signal the worker to stop after the current batch"""
+        self._stopping.set()
+        if self._task:
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        logger.info("Classification worker stopped")
+    
+    async def run_forever(self):
+        """Drain pending rows, then poll until stopped"""
+        while not self._stopping.is_set():
+            try:
+                classified = await self.drain()
+            except Exception as e:
+                logger.error("Classification worker error", error=str(e))
+                classified = 0
+            
+            if not classified:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+    
+    async def drain(self) -> int:
+        """
+        Classify everything currently pending.
+        
+        Returns:
+            Number of rows classified
+        """
+        reviews = await self._drain(
+            Review,
+            [Review.text, Review.rating, Review.competitor_id, Review.platform, Review.role, Review.sentiment],
+            self._classify_reviews,
+            on_updated=self._rollup_reviews,
+        )
+        releases = await self._drain(
+            Release, [Release.release_notes], self._classify_releases
+        )
+        if reviews or releases:
+            logger.info("Pending rows classified", reviews=reviews, releases=releases)
+        return reviews + releases
+    
+    async def _drain(self, model, columns: list, classify_batch, on_updated=None) -> int:
+        total = 0
+        cursor = None
+        
+        while not self._stopping.is_set():
+            claimed_at = datetime.utcnow()
+            async with async_session_maker() as db:
+                rows = await self._claim(db, model, columns, cursor, claimed_at)
+            if not rows:
+                break
+            
+            cursor = (rows[-1].collected_at, rows[-1].id)
+            updates = await classify_batch(rows)
+            
+            async with async_session_maker() as db:
+                written = await self._write(db, model, columns, claimed_at, updates, on_updated)
+            # Sentiment filters of the list totals changed
+            count_cache.invalidate(model.__tablename__)
+            total += written
+        
+        return total
+    
+    async def _claim(self, db, model, columns: list, cursor, claimed_at: datetime) -> list:
+        """Select the next pending batch and mark it claimed in one short transaction"""
+        stale_before = claimed_at - timedelta(seconds=settings.CLASSIFICATION_CLAIM_TIMEOUT)
+        query = (
+            select(model.id, model.collected_at, *columns)
+            .where(
+                model.classification_status == ClassificationStatus.PENDING,
+                or_(
+                    model.classification_claimed_at.is_(None),
+                    model.classification_claimed_at < stale_before,
+                ),
+            )
+            .order_by(model.collected_at, model.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        if cursor:
+            query = query.where(tuple_(model.collected_at, model.id) > cursor)
+        
+        rows = (await db.execute(query)).all()
+        if rows:
+            await db.execute(
+                update(model)
+                .where(model.id.in_([row.id for row in rows]))
+                .values(classification_claimed_at=claimed_at)
+            )
+        await db.commit()
+        return rows
+    
+    async def _write(self, db, model, columns: list, claimed_at: datetime, updates: list[dict], on_updated) -> int:
+        """
+        Store classifications of rows still pending under this worker's claim.
+        
+        Rows reclaimed by another worker after CLASSIFICATION_CLAIM_TIMEOUT
+        are skipped; on_updated sees the rows as they are now.
+        """
+        current = (await db.execute(
+            select(model.id, model.collected_at, *columns)
+            .where(
+                model.id.in_([values["id"] for values in updates]),
+                model.classification_status == ClassificationStatus.PENDING,
+                model.classification_claimed_at == claimed_at,
+            )
+            .with_for_update()
+        )).all()
+        
+        by_id = {values["id"]: values for values in updates}
+        updates = [
+            {**by_id[row.id], "classification_claimed_at": None}
+            for row in current
+        ]
+        if updates:
+            await db.execute(update(model), updates)
+            if on_updated is not None:
+                await on_updated(db, current, updates)
+        await db.commit()
+        return len(updates)
+    
+    async def _classify_reviews(self, reviews: list) -> list[dict]:
+        classifications = await self.classifier.batch_classify_reviews([
+            {
+                "external_id": str(review.id),
+                "text": review.text or "",
+                "rating": review.rating,
+            }
+            for review in reviews
+        ])
+        
+        return [
+            {
+                "id": review.id,
+                "role": _label(UserRole, classification.get("role"), "unknown"),
+                "sentiment": _label(Sentiment, classification.get("sentiment"), "neutral"),
+                "key_topics": str(classification.get("key_topics", [])),
+                "classification_status": ClassificationStatus.DONE,
+            }
+            for review, classification in zip(reviews, classifications)
+        ]
+    
+    async def _rollup_reviews(self, db, reviews: list, updates: list[dict]):
+        """Move classified reviews to their role/sentiment in review_daily_rollup"""
+        rollup = ReviewRollupDeltas()
+        for review, values in zip(reviews, updates):
+            rollup.move(
+                review.competitor_id, review.platform, review.collected_at, review.rating,
+                old=(review.role, review.sentiment),
+                new=(values["role"], values["sentiment"]),
+            )
+        await rollup.apply(db)
+    
+    async def _classify_releases(self, releases: list) -> list[dict]:
+        semaphore = asyncio.Semaphore(max(1, settings.CLASSIFIER_CONCURRENCY))
+        
+        async def classify(release) -> dict:
+            async with semaphore:
+                classification = await self.classifier.classify_release(release.release_notes or "")
+            return {
+                "id": release.id,
+                "significance": _label(Significance, classification.get("significance"), "minor"),
+                "summary_ru": classification.get("summary_ru"),
+                "classification_status": ClassificationStatus.DONE,
+            }
+        
+        return await asyncio.gather(*(classify(release) for release in releases))
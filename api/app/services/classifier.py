@@ -1,10 +1,16 @@
 """AI Classification Service using Google Gemini"""
+import asyncio
+import hashlib
 import json
 from typing import Optional
 import structlog
 import google.generativeai as genai
 
 from app.config import settings
+from app.services.classification_cache import classification_cache
+from app.services.keyword_matcher import KeywordMatcher
+from app.services.local_classifier import local_classifier
+from app.services.rate_limiter import gemini_limiter, estimate_tokens
 
 logger = structlog.get_logger()
 
@@ -29,6 +35,27 @@ Language: Spanish (Peru)
 Respond with JSON only, no markdown formatting, no explanation."""
 
 
+REVIEW_BATCH_CLASSIFICATION_PROMPT = """You are a classifier for ride-hailing app reviews in Peru.
+
+Classify EACH review in the JSON array below independently. Return ONLY a JSON array
+with exactly one object per review, with these fields:
+- id: the review "id" exactly as given
+- role: "driver" | "rider" | "unknown"
+- categories: array of applicable categories from: ["pricing", "ux_ui", "safety", "driver_exp", "rider_exp", "promo", "support", "wait_time", "payment", "other"]
+- sentiment: "positive" | "neutral" | "negative"
+- key_topics: array of 1-3 main topics mentioned (in English, lowercase)
+
+Role detection rules:
+- "driver" if mentions: conducir, conductor, ganancias, comisión, mis pasajeros, mi carro, viajes que hago
+- "rider" if mentions: pedir viaje, esperar carro, chofer (as customer perspective), mi conductor
+- "unknown" if unclear
+
+Reviews (Spanish, Peru; rating is 1-5):
+{reviews}
+
+Respond with JSON only, no markdown formatting, no explanation."""
+
+
 RELEASE_CLASSIFICATION_PROMPT = """Classify this app release notes for a ride-hailing app.
 
 Release notes: "{text}"
@@ -46,6 +73,26 @@ Guidelines:
 Respond with JSON only, no markdown."""
 
 
+# Prompt versions are part of the classification cache key, so editing a
+# prompt automatically stops serving results produced by the old one.
+# Single and batched review prompts share a version (and cache entries)
+# because they produce the same result shape.
+REVIEW_PROMPT_VERSION = hashlib.sha256(
+    (REVIEW_CLASSIFICATION_PROMPT + REVIEW_BATCH_CLASSIFICATION_PROMPT).encode()
+).hexdigest()[:12]
+RELEASE_PROMPT_VERSION = hashlib.sha256(RELEASE_CLASSIFICATION_PROMPT.encode()).hexdigest()[:12]
+
+REVIEW_ROLES = ("driver", "rider", "unknown")
+
+# Fallback role detection; driver wins when both match
+ROLE_MATCHER = KeywordMatcher({
+    "driver": ["conductor", "conducir", "ganancia", "comisión", "mis pasajeros"],
+    "rider": ["pasajero", "viaje", "espera", "llegó", "me cobr"],
+})
+REVIEW_SENTIMENTS = ("positive", "neutral", "negative")
+RELEASE_SIGNIFICANCES = ("major", "minor", "bugfix")
+
+
 class ClassifierService:
     """Service for AI-powered classification of reviews and releases using Google Gemini"""
     
@@ -68,11 +115,31 @@ class ClassifierService:
         """
         Classify a review to determine role, sentiment, and categories.
         
+        The local classifier answers first; Gemini is only called when its
+        confidence is below LOCAL_CLASSIFIER_THRESHOLD (or no local model
+        has been trained yet).
+        
         Returns:
             dict with: role, categories, sentiment, key_topics
         """
+        local = local_classifier.classify(text, rating)
+        if local and local["confident"]:
+            return self._local_result(local)
+        
+        return await self._classify_review_remote(text, rating, local)
+    
+    async def _classify_review_remote(self, text: str, rating: int, local: Optional[dict]) -> dict:
+        """Classify with Gemini; falls back to the local prediction, then to rules"""
         if not self.model:
-            return self._fallback_review_classification(text, rating)
+            return self._offline_review_classification(text, rating, local)
+        
+        cache_key = classification_cache.make_key(
+            "review", REVIEW_PROMPT_VERSION, settings.GEMINI_MODEL, text, rating
+        )
+        # Entries cached before results were validated may be invalid
+        cached = self._validate_review_classification(await classification_cache.get(cache_key))
+        if cached is not None:
+            return cached
         
         try:
             prompt = REVIEW_CLASSIFICATION_PROMPT.format(
@@ -80,18 +147,27 @@ class ClassifierService:
                 rating=rating,
             )
             
-            response = await self.model.generate_content_async(prompt)
-            result = json.loads(response.text)
+            response = await self._generate(prompt)
+            result = self._validate_review_classification(json.loads(response.text))
+            if result is None:
+                logger.error("Invalid Gemini review classification", response=response.text[:200])
+                return self._offline_review_classification(text, rating, local)
             
             logger.debug("Review classified", result=result)
+            await classification_cache.set(
+                cache_key, "review", REVIEW_PROMPT_VERSION, settings.GEMINI_MODEL, result
+            )
             return result
             
+        except asyncio.TimeoutError:
+            logger.error("Classification timed out", timeout=settings.CLASSIFIER_TIMEOUT)
+            return self._offline_review_classification(text, rating, local)
         except json.JSONDecodeError as e:
             logger.error("Failed to parse Gemini response", error=str(e))
-            return self._fallback_review_classification(text, rating)
+            return self._offline_review_classification(text, rating, local)
         except Exception as e:
             logger.error("Classification failed", error=str(e))
-            return self._fallback_review_classification(text, rating)
+            return self._offline_review_classification(text, rating, local)
     
     async def classify_release(self, text: str) -> dict:
         """
@@ -103,13 +179,26 @@ class ClassifierService:
         if not self.model:
             return self._fallback_release_classification(text)
         
+        cache_key = classification_cache.make_key(
+            "release", RELEASE_PROMPT_VERSION, settings.GEMINI_MODEL, text
+        )
+        cached = self._validate_release_classification(await classification_cache.get(cache_key))
+        if cached is not None:
+            return cached
+        
         try:
             prompt = RELEASE_CLASSIFICATION_PROMPT.format(text=text[:1000])
             
-            response = await self.model.generate_content_async(prompt)
-            result = json.loads(response.text)
+            response = await self._generate(prompt)
+            result = self._validate_release_classification(json.loads(response.text))
+            if result is None:
+                logger.error("Invalid Gemini release classification", response=response.text[:200])
+                return self._fallback_release_classification(text)
             
             logger.debug("Release classified", result=result)
+            await classification_cache.set(
+                cache_key, "release", RELEASE_PROMPT_VERSION, settings.GEMINI_MODEL, result
+            )
             return result
             
         except json.JSONDecodeError as e:
@@ -121,40 +210,266 @@ class ClassifierService:
     
     async def batch_classify_reviews(self, reviews: list[dict]) -> list[dict]:
         """
-        Classify multiple reviews.
+        Classify multiple reviews concurrently.
+        
+        Reviews the local classifier is confident about are answered
+        locally. With CLASSIFIER_BATCH_SIZE > 1, the remaining cache misses are packed into
+        multi-review prompts (bounded by CLASSIFIER_BATCH_TOKEN_BUDGET) that
+        return one JSON element per review; any element that is missing or
+        fails validation is re-classified on its own. At most
+        CLASSIFIER_CONCURRENCY calls are in flight at once, and each call is
+        bounded by CLASSIFIER_TIMEOUT; a timed out review gets the local
+        prediction (or the rule-based fallback), same as any other
+        classification error.
         
         Args:
             reviews: List of dicts with 'external_id', 'text', 'rating'
         
         Returns:
-            List of classification results with external_id
+            List of classification results with external_id, in input order
         """
-        results = []
+        semaphore = asyncio.Semaphore(max(1, settings.CLASSIFIER_CONCURRENCY))
+        results: list[Optional[dict]] = [None] * len(reviews)
         
-        for review in reviews:
-            classification = await self.classify_review(
-                review.get("text", ""),
-                review.get("rating", 3),
-            )
-            results.append({
+        # Confident local predictions never reach Gemini
+        local = [
+            local_classifier.classify(review.get("text", ""), review.get("rating", 3))
+            for review in reviews
+        ]
+        for index, prediction in enumerate(local):
+            if prediction and prediction["confident"]:
+                results[index] = self._local_result(prediction)
+        
+        if self.model and settings.CLASSIFIER_BATCH_SIZE > 1 and results.count(None) > 1:
+            await self._classify_reviews_batched(reviews, results, semaphore)
+        
+        async def classify(index: int):
+            review = reviews[index]
+            async with semaphore:
+                results[index] = await self._classify_review_remote(
+                    review.get("text", ""),
+                    review.get("rating", 3),
+                    local[index],
+                )
+        
+        await asyncio.gather(*(classify(i) for i, result in enumerate(results) if result is None))
+        
+        return [
+            {
                 "external_id": review.get("external_id"),
-                **classification,
-            })
+                **result,
+            }
+            for review, result in zip(reviews, results)
+        ]
+    
+    async def _classify_reviews_batched(
+        self, reviews: list[dict], results: list[Optional[dict]], semaphore: asyncio.Semaphore
+    ):
+        """Fill missing results from the cache and multi-review prompts; leaves failures as None"""
+        keys = {
+            index: classification_cache.make_key(
+                "review", REVIEW_PROMPT_VERSION, settings.GEMINI_MODEL,
+                review.get("text", ""), review.get("rating", 3),
+            )
+            for index, review in enumerate(reviews)
+            if results[index] is None
+        }
+        cached = await classification_cache.get_many(list(keys.values()))
+        
+        pending = []
+        used_ids = set()
+        for index, key in keys.items():
+            review = reviews[index]
+            # Entries cached before results were validated may be invalid; those are classified again
+            hit = self._validate_review_classification(cached.get(key))
+            if hit is not None:
+                results[index] = hit
+                continue
+            
+            # Prompt ids are external_ids where available, made unique within the call
+            item_id = str(review.get("external_id") or index)
+            if item_id in used_ids:
+                item_id = f"{item_id}#{index}"
+            used_ids.add(item_id)
+            pending.append((index, item_id))
+        
+        batches = self._pack_review_batches(reviews, pending)
+        batch_results = await asyncio.gather(
+            *(self._classify_review_batch(reviews, batch, semaphore) for batch in batches)
+        )
+        
+        to_cache = []
+        for batch, parsed in zip(batches, batch_results):
+            for index, item_id in batch:
+                if item_id in parsed:
+                    results[index] = parsed[item_id]
+                    to_cache.append((keys[index], parsed[item_id]))
         
-        return results
+        await classification_cache.set_many(
+            to_cache, "review", REVIEW_PROMPT_VERSION, settings.GEMINI_MODEL
+        )
+    
+    def _pack_review_batches(
+        self, reviews: list[dict], pending: list[tuple[int, str]]
+    ) -> list[list[tuple[int, str]]]:
+        """Split pending reviews into batches by item count and estimated tokens"""
+        batches = []
+        current = []
+        current_tokens = 0
+        
+        for index, item_id in pending:
+            text = reviews[index].get("text", "") or ""
+            # ~4 characters per token plus per-item JSON overhead
+            tokens = len(text[:1000]) // 4 + 20
+            
+            if current and (
+                len(current) >= settings.CLASSIFIER_BATCH_SIZE
+                or current_tokens + tokens > settings.CLASSIFIER_BATCH_TOKEN_BUDGET
+            ):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            
+            current.append((index, item_id))
+            current_tokens += tokens
+        
+        if current:
+            batches.append(current)
+        
+        return batches
+    
+    async def _classify_review_batch(
+        self, reviews: list[dict], batch: list[tuple[int, str]], semaphore: asyncio.Semaphore
+    ) -> dict[str, dict]:
+        """
+        Classify a batch of reviews with a single prompt.
+        
+        Returns:
+            dict of prompt id -> validated classification (invalid elements omitted)
+        """
+        items = [
+            {
+                "id": item_id,
+                "rating": reviews[index].get("rating", 3),
+                "text": (reviews[index].get("text", "") or "")[:1000],
+            }
+            for index, item_id in batch
+        ]
+        prompt = REVIEW_BATCH_CLASSIFICATION_PROMPT.format(
+            reviews=json.dumps(items, ensure_ascii=False),
+        )
+        
+        try:
+            async with semaphore:
+                response = await self._generate(prompt, output_tokens=60 * len(batch))
+            elements = json.loads(response.text)
+        except asyncio.TimeoutError:
+            logger.error("Batch classification timed out", size=len(batch))
+            return {}
+        except json.JSONDecodeError as e:
+            logger.error("Failed to parse Gemini batch response", error=str(e), size=len(batch))
+            return {}
+        except Exception as e:
+            logger.error("Batch classification failed", error=str(e), size=len(batch))
+            return {}
+        
+        if isinstance(elements, dict):
+            elements = elements.get("reviews") or elements.get("results") or []
+        if not isinstance(elements, list):
+            elements = []
+        
+        expected_ids = {item_id for _, item_id in batch}
+        parsed = {}
+        for element in elements:
+            if not isinstance(element, dict):
+                continue
+            item_id = str(element.get("id"))
+            result = self._validate_review_classification(element)
+            if item_id in expected_ids and result:
+                parsed[item_id] = result
+        
+        logger.debug("Review batch classified", size=len(batch), parsed=len(parsed))
+        return parsed
+    
+    def _validate_review_classification(self, element) -> Optional[dict]:
+        """Check a review result (or batch element) against the expected shape"""
+        if not isinstance(element, dict):
+            return None
+        
+        role = element.get("role")
+        sentiment = element.get("sentiment")
+        categories = element.get("categories", [])
+        key_topics = element.get("key_topics", [])
+        
+        if role not in REVIEW_ROLES or sentiment not in REVIEW_SENTIMENTS:
+            return None
+        if not isinstance(categories, list) or not isinstance(key_topics, list):
+            return None
+        
+        return {
+            "role": role,
+            "categories": categories,
+            "sentiment": sentiment,
+            "key_topics": key_topics,
+        }
+    
+    def _validate_release_classification(self, element) -> Optional[dict]:
+        """Check a release result against the expected shape"""
+        if not isinstance(element, dict):
+            return None
+        
+        significance = element.get("significance")
+        categories = element.get("categories", [])
+        summary_ru = element.get("summary_ru")
+        
+        if significance not in RELEASE_SIGNIFICANCES or not isinstance(categories, list):
+            return None
+        if summary_ru is not None and not isinstance(summary_ru, str):
+            return None
+        
+        return {
+            "categories": categories,
+            "summary_ru": summary_ru,
+            "significance": significance,
+        }
+    
+    async def _generate(self, prompt: str, output_tokens: int = 100):
+        """
+        Call Gemini through the shared rate limiter.
+        
+        Each attempt is bounded by CLASSIFIER_TIMEOUT; time spent waiting
+        for a rate limit slot does not count against it.
+        """
+        return await gemini_limiter.call(
+            lambda: asyncio.wait_for(
+                self.model.generate_content_async(prompt),
+                timeout=settings.CLASSIFIER_TIMEOUT,
+            ),
+            tokens=estimate_tokens(prompt) + output_tokens,
+        )
+    
+    def _local_result(self, local: dict) -> dict:
+        """Strip the confidence fields from a local prediction"""
+        return {
+            key: value for key, value in local.items()
+            if key not in ("confidence", "confident")
+        }
+    
+    def _offline_review_classification(self, text: str, rating: int, local: Optional[dict]) -> dict:
+        """Best classification available without Gemini"""
+        if local:
+            return self._local_result(local)
+        return self._fallback_review_classification(text, rating)
     
     def _fallback_review_classification(self, text: str, rating: int) -> dict:
         """Simple rule-based fallback when AI is unavailable"""
-        text_lower = text.lower() if text else ""
-        
         # Role detection
-        driver_keywords = ["conductor", "conducir", "ganancia", "comisión", "mis pasajeros"]
-        rider_keywords = ["pasajero", "viaje", "espera", "llegó", "me cobr"]
+        roles = ROLE_MATCHER.labels(text)
         
         role = "unknown"
-        if any(kw in text_lower for kw in driver_keywords):
+        if "driver" in roles:
             role = "driver"
-        elif any(kw in text_lower for kw in rider_keywords):
+        elif "rider" in roles:
             role = "rider"
         
         # Sentiment based on rating
@@ -0,0 +1,201 @@
+"""Caches for Clerk JWT verification: signing keys and verified tokens"""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional
+import structlog
+
+from app.config import settings
+from app.services.http_clients import http_clients
+
+logger = structlog.get_logger()
+
+
+class JWKSCache:
+    """
+    Clerk signing keys (JWKS) indexed by kid.
+    
+    Keys are fetched once and served from memory until CLERK_JWKS_TTL
+    expires; a background task refreshes them every
+    CLERK_JWKS_REFRESH_INTERVAL so requests normally never wait on Clerk.
+    A token signed with an unknown kid (key rotation) triggers a refetch,
+    at most once per CLERK_JWKS_MIN_REFETCH_INTERVAL so forged kids cannot
+    hammer the endpoint. Concurrent refetches share a single request. If
+    Clerk is unreachable, the last known keys keep being served.
+    """
+    
+    def __init__(self, url: Optional[str] = None):
+        self.url = url or settings.CLERK_JWKS_URL
+        self.ttl = settings.CLERK_JWKS_TTL
+        self.refresh_interval = settings.CLERK_JWKS_REFRESH_INTERVAL
+        self.min_refetch_interval = settings.CLERK_JWKS_MIN_REFETCH_INTERVAL
+        self._keys: dict[str, dict] = {}
+        self._fetched_at: Optional[float] = None
+        self._last_attempt: Optional[float] = None
+        self._inflight: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        self.hits = 0
+        self.fetches = 0
+        self.fetch_errors = 0
+    
+    def start(self):
+        """Spawn the background refresh task on the running event loop"""
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._refresh_forever())
+    
+    async def stop(self):
+        self._stopping.set()
+        if self._task:
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+    
+    async def _refresh_forever(self):
+        while not self._stopping.is_set():
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning("JWKS background refresh failed", error=str(e))
+            
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+    
+    def _fresh(self) -> bool:
+        return self._fetched_at is not None and time.monotonic() - self._fetched_at < self.ttl
+    
+    def _may_refetch(self) -> bool:
+        return self._last_attempt is None or time.monotonic() - self._last_attempt >= self.min_refetch_interval
+    
+    async def get_key(self, kid: Optional[str]) -> Optional[dict]:
+        """
+        Signing key for a kid, or None if Clerk does not publish it.
+        
+        Raises:
+            httpx.HTTPError if no keys are cached and Clerk is unreachable
+        """
+        key = self._keys.get(kid)
+        if key and self._fresh():
+            self.hits += 1
+            return key
+        
+        # Expired keys or an unknown kid; refetch unless we just did
+        if self._keys and not self._may_refetch():
+            return key
+        
+        try:
+            await self.refresh()
+        except Exception as e:
+            if not self._keys:
+                raise
+            logger.warning("JWKS refresh failed, using cached keys", error=str(e))
+        
+        return self._keys.get(kid)
+    
+    async def refresh(self):
+        """Fetch the key set; concurrent callers share one request"""
+        if self._inflight is None:
+            self._inflight = asyncio.create_task(self._fetch())
+        
+        task = self._inflight
+        try:
+            await asyncio.shield(task)
+        finally:
+            if task.done() and self._inflight is task:
+                self._inflight = None
+    
+    async def _fetch(self):
+        self._last_attempt = time.monotonic()
+        self.fetches += 1
+        try:
+            response = await http_clients.get("clerk").get(self.url)
+            response.raise_for_status()
+            keys = {key["kid"]: key for key in response.json().get("keys", []) if key.get("kid")}
+        except Exception:
+            self.fetch_errors += 1
+            raise
+        
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+        logger.info("JWKS refreshed", keys=len(keys))
+    
+    def get_stats(self) -> dict:
+        """Counters for monitoring"""
+        return {
+            "keys": len(self._keys),
+            "age_seconds": round(time.monotonic() - self._fetched_at, 1) if self._fetched_at else None,
+            "hits": self.hits,
+            "fetches": self.fetches,
+            "fetch_errors": self.fetch_errors,
+        }
+
+
+class VerifiedTokenCache:
+    """
+    LRU of token payloads that already passed signature verification.
+    
+    Keyed by the token's sha256 so raw tokens are not kept in memory.
+    Entries expire at the token's exp claim, and never later than
+    CLERK_TOKEN_CACHE_TTL after they were verified.
+    """
+    
+    def __init__(self, max_size: Optional[int] = None, ttl: Optional[float] = None):
+        self.max_size = max_size or settings.CLERK_TOKEN_CACHE_SIZE
+        self.ttl = settings.CLERK_TOKEN_CACHE_TTL if ttl is None else ttl
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+    
+    def get(self, token: str) -> Optional[dict]:
+        """Cached payload, or None if the token was not verified recently"""
+        key = self.make_key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        expires_at, payload = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(payload)
+    
+    def set(self, token: str, payload: dict):
+        now = time.time()
+        expires_at = now + self.ttl
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, exp)
+        if expires_at <= now:
+            return
+        
+        key = self.make_key(token)
+        self._entries[key] = (expires_at, dict(payload))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def get_stats(self) -> dict:
+        """Hit counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+
+jwks_cache = JWKSCache()
+token_cache = VerifiedTokenCache()
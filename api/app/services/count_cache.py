@@ -0,0 +1,159 @@
+"""Cached and planner-estimated totals for paginated list endpoints"""
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Optional
+import structlog
+from sqlalchemy import Select, literal_column, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.config import settings
+
+logger = structlog.get_logger()
+
+
+class ExplainJson(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a select, keeping its bound parameters"""
+    
+    inherit_cache = False
+    
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(ExplainJson)
+def _compile_explain_json(element: ExplainJson, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+class CountCache:
+    """
+    TTL cache for list totals.
+    
+    Page mode of the list endpoints ran an exact count(*) with the page's
+    filters on every request, often costing more than the page itself.
+    Totals are kept per table and normalized filter set for
+    COUNT_CACHE_TTL seconds; ingestion invalidates a table's totals, so
+    new rows show up immediately in this process (other processes see
+    them within the TTL).
+    
+    With approximate=True the planner's row estimate is used instead of
+    counting when it is at least COUNT_ESTIMATE_MIN_ROWS: pg_class.reltuples
+    for an unfiltered table, EXPLAIN for filtered queries. Smaller results
+    are cheap to count and are counted exactly.
+    """
+    
+    def __init__(self, max_size: Optional[int] = None, ttl: Optional[int] = None):
+        self.max_size = max_size or settings.COUNT_CACHE_SIZE
+        self.ttl = ttl or settings.COUNT_CACHE_TTL
+        self._entries: OrderedDict[str, tuple[str, float, int, bool]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.estimates = 0
+        self.invalidations = 0
+    
+    @staticmethod
+    def make_key(table: str, filters: dict, approximate: bool) -> str:
+        """Key of a filter set; None (unset) filters are dropped"""
+        normalized = {name: str(value) for name, value in filters.items() if value is not None}
+        raw = json.dumps([table, approximate, normalized], sort_keys=True)
+        return hashlib.sha256(raw.encode()).hexdigest()
+    
+    async def total(
+        self,
+        db: AsyncSession,
+        table: str,
+        count_query: Select,
+        filters: dict,
+        approximate: bool = False,
+    ) -> tuple[int, bool]:
+        """
+        Total rows for a list query.
+        
+        Args:
+            table: Table listed; the unit of invalidation
+            count_query: Single-value count query with the list filters
+            filters: Request parameters the filters were built from (e.g.
+                days rather than the derived timestamp), as the cache key
+            approximate: Allow a planner estimate for large results
+        
+        Returns:
+            (total, whether it is an estimate)
+        """
+        key = self.make_key(table, filters, approximate)
+        entry = self._entries.get(key)
+        if entry is not None:
+            _, expires_at, total, estimated = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return total, estimated
+            del self._entries[key]
+        
+        self.misses += 1
+        estimated = False
+        total = None
+        if approximate:
+            estimate = await self._estimate(db, table, count_query)
+            if estimate is not None and estimate >= settings.COUNT_ESTIMATE_MIN_ROWS:
+                total, estimated = estimate, True
+                self.estimates += 1
+        
+        if total is None:
+            total = await db.scalar(count_query) or 0
+        
+        self._entries[key] = (table, time.monotonic() + self.ttl, total, estimated)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        
+        return total, estimated
+    
+    async def _estimate(self, db: AsyncSession, table: str, count_query: Select) -> Optional[int]:
+        """Planner row estimate of the rows counted; None if unavailable"""
+        try:
+            if count_query.whereclause is None:
+                reltuples = await db.scalar(
+                    text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table)"),
+                    {"table": table},
+                )
+                # -1: never vacuumed or analyzed
+                return int(reltuples) if reltuples is not None and reltuples >= 0 else None
+            
+            rows = count_query.with_only_columns(literal_column("1"), maintain_column_froms=True)
+            # Filter values (search strings, dates, ids) stay bound parameters
+            plan = await db.scalar(ExplainJson(rows))
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except Exception as e:
+            logger.warning("Count estimate failed", table=table, error=str(e))
+            return None
+    
+    def invalidate(self, *tables: str):
+        """Drop cached totals of tables that received new or changed rows"""
+        stale = [key for key, entry in self._entries.items() if entry[0] in tables]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += 1
+    
+    def get_stats(self) -> dict:
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "estimates": self.estimates,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+
+# Shared by the list endpoints and the ingestion paths that invalidate it
+count_cache = CountCache()
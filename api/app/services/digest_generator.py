@@ -9,6 +9,7 @@ import google.generativeai as genai
 from app.config import settings
 from app.models import Release, Review, Promo, DriverTariff, Digest, Competitor
 from app.models.review import Sentiment
+from app.services.rate_limiter import gemini_limiter, estimate_tokens
 
 logger = structlog.get_logger()
 
@@ -173,27 +174,30 @@ class DigestGeneratorService:
         return result.scalars().all()
     
     async def _get_review_trends(self, start: date, end: date) -> dict:
-        """Analyze review trends for the period"""
+        """Analyze review trends for the period (reviews dated in it)"""
         competitors_result = await self.db.execute(
-            select(Competitor).where(Competitor.is_active == True)
+            select(Competitor.id, Competitor.name).where(Competitor.is_active == True)
         )
-        competitors = competitors_result.scalars().all()
+        competitors = competitors_result.all()
+        
+        # Count by sentiment, all competitors in one grouped query
+        result = await self.db.execute(
+            select(Review.competitor_id, Review.sentiment, func.count(Review.id))
+            .where(
+                Review.review_date >= start,
+                Review.review_date <= end,
+                Review.sentiment.is_not(None),
+            )
+            .group_by(Review.competitor_id, Review.sentiment)
+        )
+        counts = {(competitor_id, sentiment): int(count) for competitor_id, sentiment, count in result.all()}
         
         trends = {}
         for comp in competitors:
-            # Count by sentiment
-            for sentiment in Sentiment:
-                count = await self.db.scalar(
-                    select(func.count(Review.id)).where(
-                        Review.competitor_id == comp.id,
-                        Review.review_date >= start,
-                        Review.review_date <= end,
-                        Review.sentiment == sentiment,
-                    )
-                )
-                if comp.name not in trends:
-                    trends[comp.name] = {}
-                trends[comp.name][sentiment.value] = count or 0
+            trends[comp.name] = {
+                sentiment.value: counts.get((comp.id, sentiment), 0)
+                for sentiment in Sentiment
+            }
         
         return trends
     
@@ -268,7 +272,10 @@ class DigestGeneratorService:
         )
         
         try:
-            response = await self.model.generate_content_async(prompt)
+            response = await gemini_limiter.call(
+                lambda: self.model.generate_content_async(prompt),
+                tokens=estimate_tokens(prompt) + 2000,
+            )
             return response.text
             
         except Exception as e:
@@ -0,0 +1,89 @@
+"""Shared outbound HTTP clients with pooled keep-alive connections"""
+import importlib.util
+from typing import Optional
+import httpx
+import structlog
+
+from app.config import settings
+
+logger = structlog.get_logger()
+
+# Read timeouts per client; unknown names get DEFAULT_READ_TIMEOUT
+READ_TIMEOUTS = {
+    "parallel": 60.0,
+    "perplexity": 60.0,
+    "tavily": 60.0,
+    "serpapi": 30.0,
+    "clerk": 5.0,
+}
+DEFAULT_READ_TIMEOUT = 30.0
+
+
+class HttpClientRegistry:
+    """
+    One httpx.AsyncClient per upstream, shared by every caller.
+    
+    Each client keeps its own connection pool, so the HTTP_MAX_* limits
+    apply per upstream host and connections (and their TLS sessions) are
+    reused across requests instead of being set up for every call. The
+    FastAPI lifespan opens the registry and closes it at shutdown; code
+    running outside the API (the CLI) gets clients created on first use
+    and should call close() when done.
+    """
+    
+    def __init__(self):
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self.http2 = settings.HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+        if settings.HTTP2_ENABLED and not self.http2:
+            logger.warning("h2 package not installed, outbound HTTP/2 disabled")
+    
+    def create_client(self, name: str, **options) -> httpx.AsyncClient:
+        """New client with the registry's pool and timeout settings (not shared)"""
+        return httpx.AsyncClient(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                READ_TIMEOUTS.get(name, DEFAULT_READ_TIMEOUT),
+                connect=settings.HTTP_CONNECT_TIMEOUT,
+                pool=settings.HTTP_POOL_TIMEOUT,
+            ),
+            **options,
+        )
+    
+    def get(self, name: str) -> httpx.AsyncClient:
+        """Shared client for an upstream, created on first use"""
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._clients[name] = self.create_client(name)
+        return client
+    
+    def open(self):
+        """Create the clients for every known upstream"""
+        for name in READ_TIMEOUTS:
+            self.get(name)
+        logger.info("HTTP clients opened", clients=list(self._clients), http2=self.http2)
+    
+    async def close(self):
+        """Close every client and its pooled connections"""
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+        if clients:
+            logger.info("HTTP clients closed", clients=list(clients))
+    
+    def get_stats(self) -> dict:
+        """Client configuration for monitoring"""
+        return {
+            "clients": sorted(name for name, client in self._clients.items() if not client.is_closed),
+            "http2": self.http2,
+            "max_connections_per_host": settings.HTTP_MAX_CONNECTIONS,
+            "max_keepalive_per_host": settings.HTTP_MAX_KEEPALIVE,
+        }
+
+
+http_clients = HttpClientRegistry()
+
@@ -0,0 +1,237 @@
+"""Postgres-backed queue for asynchronous Octoparse webhook processing"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Optional
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func, or_, and_
+
+from app.config import settings
+from app.db.session import async_session_maker
+from app.models import IngestionJob
+from app.models.ingestion_job import IngestionJobStatus
+from app.services.webhook_processor import WebhookProcessor
+
+logger = structlog.get_logger()
+
+
+class IngestionQueue:
+    """
+    Durable job queue stored in the ingestion_jobs table.
+    
+    Jobs are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so any number
+    of in-process workers or separate worker processes can drain the same
+    queue without handing one payload to two workers. The worker running
+    a job renews its heartbeat every INGESTION_HEARTBEAT_INTERVAL seconds;
+    a 'processing' job without a heartbeat for INGESTION_STALE_AFTER
+    seconds (worker crash) becomes claimable again until
+    INGESTION_MAX_ATTEMPTS is reached.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def backlog_size(self) -> int:
+        """Number of jobs waiting or currently being processed"""
+        count = await self.db.scalar(
+            select(func.count(IngestionJob.id)).where(
+                IngestionJob.status.in_([IngestionJobStatus.PENDING, IngestionJobStatus.PROCESSING])
+            )
+        )
+        return count or 0
+    
+    async def enqueue(self, payload: dict) -> IngestionJob:
+        """Persist a raw webhook payload as a pending job"""
+        job = IngestionJob(
+            task_id=payload.get("taskId"),
+            task_name=payload.get("taskName"),
+            data_count=payload.get("dataCount", 0),
+            payload=payload,
+            status=IngestionJobStatus.PENDING,
+            attempts=0,
+        )
+        self.db.add(job)
+        await self.db.commit()
+        await self.db.refresh(job)
+        return job
+    
+    async def get(self, job_id: uuid.UUID) -> Optional[IngestionJob]:
+        """Get a job by ID"""
+        result = await self.db.execute(
+            select(IngestionJob).where(IngestionJob.id == job_id)
+        )
+        return result.scalar_one_or_none()
+    
+    async def claim(self) -> Optional[IngestionJob]:
+        """Lock the oldest claimable job, mark it processing and commit"""
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=settings.INGESTION_STALE_AFTER)
+        
+        result = await self.db.execute(
+            select(IngestionJob)
+            .where(
+                or_(
+                    IngestionJob.status == IngestionJobStatus.PENDING,
+                    and_(
+                        IngestionJob.status == IngestionJobStatus.PROCESSING,
+                        func.coalesce(IngestionJob.heartbeat_at, IngestionJob.started_at) < stale_before,
+                    ),
+                )
+            )
+            .order_by(IngestionJob.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job = result.scalar_one_or_none()
+        if not job:
+            await self.db.rollback()
+            return None
+        
+        if job.attempts >= settings.INGESTION_MAX_ATTEMPTS:
+            job.status = IngestionJobStatus.FAILED
+            job.error_message = job.error_message or "Worker did not finish the job"
+            job.completed_at = now
+            await self.db.commit()
+            logger.error("Ingestion job abandoned", job_id=str(job.id), attempts=job.attempts)
+            return None
+        
+        job.status = IngestionJobStatus.PROCESSING
+        job.started_at = now
+        job.heartbeat_at = now
+        job.attempts += 1
+        await self.db.commit()
+        return job
+    
+    async def heartbeat(self, job_id: uuid.UUID):
+        """Renew the lease of a job this worker is still processing"""
+        await self.db.execute(
+            update(IngestionJob)
+            .where(IngestionJob.id == job_id, IngestionJob.status == IngestionJobStatus.PROCESSING)
+            .values(heartbeat_at=datetime.utcnow())
+        )
+        await self.db.commit()
+    
+    async def complete(self, job_id: uuid.UUID, result: dict):
+        """Mark a job as done with the processor result"""
+        job = await self.get(job_id)
+        job.status = IngestionJobStatus.DONE
+        job.result = result
+        job.error_message = None
+        job.completed_at = datetime.utcnow()
+        await self.db.commit()
+    
+    async def fail(self, job_id: uuid.UUID, error: str):
+        """Return a job to the queue, or fail it once out of attempts"""
+        job = await self.get(job_id)
+        job.error_message = error
+        if job.attempts >= settings.INGESTION_MAX_ATTEMPTS:
+            job.status = IngestionJobStatus.FAILED
+            job.completed_at = datetime.utcnow()
+        else:
+            job.status = IngestionJobStatus.PENDING
+        await self.db.commit()
+
+
+class IngestionWorkerPool:
+    """
+    Pool of asyncio workers draining the ingestion queue.
+    
+    Started from the FastAPI lifespan when WEBHOOK_ASYNC_INGESTION is
+    enabled, or standalone via `python -m app.cli ingest-worker`.
+    """
+    
+    def __init__(self, workers: Optional[int] = None, poll_interval: Optional[float] = None):
+        self.workers = workers if workers is not None else settings.INGESTION_WORKERS
+        self.poll_interval = poll_interval or settings.INGESTION_POLL_INTERVAL
+        self._tasks: list[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+    
+    def start(self):
+        """Spawn worker tasks on the running event loop"""
+        self._stopping.clear()
+        for i in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._run(i)))
+        logger.info("Ingestion workers started", workers=self.workers)
+    
+    async def stop(self):
+        """Signal workers to stop and wait for in-flight jobs to finish"""
+        self._stopping.set()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Ingestion workers stopped")
+    
+    async def run_forever(self):
+        """Run the pool until cancelled (CLI entry point)"""
+        self.start()
+        try:
+            await asyncio.gather(*self._tasks)
+        finally:
+            await self.stop()
+    
+    async def _run(self, worker_id: int):
+        while not self._stopping.is_set():
+            try:
+                processed = await self.process_next()
+            except Exception as e:
+                logger.error("Ingestion worker error", worker_id=worker_id, error=str(e))
+                processed = False
+            
+            if not processed:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+    
+    async def process_next(self) -> bool:
+        """
+        Claim and process a single job.
+        
+        Returns:
+            True if a job was claimed, False if the queue was empty
+        """
+        async with async_session_maker() as db:
+            job = await IngestionQueue(db).claim()
+            if not job:
+                return False
+            job_id = job.id
+            payload = job.payload
+        
+        logger.info("Processing ingestion job", job_id=str(job_id), task_name=payload.get("taskName"))
+        
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            async with async_session_maker() as db:
+                queue = IngestionQueue(db)
+                try:
+                    # WebhookProcessor only reads attributes of the payload model
+                    result = await WebhookProcessor(db).process(SimpleNamespace(**payload))
+                except Exception as e:
+                    await db.rollback()
+                    result = {"status": "failed", "error": str(e)}
+                
+                # The processor logs its own errors and reports them in the result
+                if result.get("status") == "failed":
+                    error = result.get("error") or "Webhook processing failed"
+                    logger.error("Ingestion job failed", job_id=str(job_id), error=error)
+                    await queue.fail(job_id, error)
+                else:
+                    await queue.complete(job_id, result)
+                    logger.info("Ingestion job done", job_id=str(job_id), processed=result.get("processed", 0))
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+        
+        return True
+    
+    async def _heartbeat(self, job_id: uuid.UUID):
+        """Renew the job's lease until cancelled, so it is not reclaimed while running"""
+        while True:
+            await asyncio.sleep(settings.INGESTION_HEARTBEAT_INTERVAL)
+            try:
+                async with async_session_maker() as db:
+                    await IngestionQueue(db).heartbeat(job_id)
+            except Exception as e:
+                logger.warning("Ingestion job heartbeat failed", job_id=str(job_id), error=str(e))
@@ -0,0 +1,117 @@
+"""
+Multi-keyword matcher for rule-based detectors
+
+Detectors that used to run `kw in text.lower()` once per keyword (news
+competitors/topics/categories/sentiment, fallback review roles) build a
+KeywordMatcher once at import time and scan each text a single time.
+"""
+import re
+import string
+from typing import Hashable, Iterable, Mapping
+
+# Characters treated as word separators besides whitespace
+SEPARATORS = string.punctuation + "¿¡«»“”‘’…–—"
+
+
+def split_words(text: str) -> list[str]:
+    """Lower-case text and split it into words on whitespace and punctuation"""
+    text = text.lower()
+    for char in SEPARATORS:
+        if char in text:
+            text = text.replace(char, " ")
+    return text.split()
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """
+    Regular expression matching the longest of `keywords` at a position.
+    
+    Keywords are merged into a character trie, so the pattern is a
+    deterministic walk (one branch per next character) rather than an
+    alternation the regex engine tries keyword by keyword.
+    """
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = True
+    
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        # A keyword ending here: longer keywords are tried first (greedy)
+        return f"(?:{pattern})?" if "" in node else pattern
+    
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    Compiled matcher for a table of label -> keywords.
+    
+    All keywords are compiled into one trie-shaped regular expression, so
+    a text is lower-cased and scanned once whatever the number of
+    keywords, and a keyword listed under several labels (e.g. "comisión"
+    as a topic and a category keyword) is only looked for once.
+    
+    With word_start (the default) a keyword only matches at the start of
+    a word: "ley" no longer matches inside "oakley" or "uber" inside
+    "tubería", while inflections still match ("conductor" ->
+    "conductores", "me cobr" -> "me cobraron"). word_start=False keeps the
+    plain substring semantics of `kw in text.lower()`. Keywords are used
+    as given, so an upper-case keyword never matches the lower-cased text.
+    
+    Labels may be any hashable, so several tables can share one matcher
+    by namespacing labels, e.g. ("topic", "pricing").
+    """
+    
+    def __init__(self, table: Mapping[Hashable, Iterable[str]], word_start: bool = True):
+        labels: dict[str, list] = {}
+        for label, keywords in table.items():
+            for keyword in keywords:
+                if not keyword:
+                    continue
+                keyword_labels = labels.setdefault(keyword, [])
+                if label not in keyword_labels:
+                    keyword_labels.append(label)
+        
+        # The scan reports the longest keyword at each position; every
+        # shorter keyword starting there is one of its prefixes
+        self._matches = {
+            keyword: tuple(
+                (prefix, tuple(labels[prefix]))
+                for prefix in labels
+                if keyword.startswith(prefix)
+            )
+            for keyword in labels
+        }
+        
+        # Zero-width lookahead: overlapping keywords ("nueva función",
+        # "función") are all found in one pass
+        boundary = r"\b" if word_start else ""
+        self._pattern = re.compile(f"{boundary}(?=({_trie_pattern(labels)}))") if labels else None
+    
+    def find(self, text: str) -> dict[Hashable, set[str]]:
+        """
+        Scan text once.
+        
+        Returns:
+            dict of label -> distinct keywords found for it
+        """
+        found: dict[Hashable, set[str]] = {}
+        if not text or self._pattern is None:
+            return found
+        
+        for match in self._pattern.finditer(text.lower()):
+            for keyword, labels in self._matches[match.group(1)]:
+                for label in labels:
+                    found.setdefault(label, set()).add(keyword)
+        
+        return found
+    
+    def labels(self, text: str) -> set:
+        """Labels with at least one keyword in text"""
+        return set(self.find(text))
@@ -0,0 +1,329 @@
+"""
+Local review classifier
+
+Hashed word n-gram naive Bayes models for review role and sentiment,
+trained from reviews Gemini already labelled. ClassifierService asks this
+tier first and only escalates to Gemini when the prediction is not
+confident enough.
+"""
+import ast
+import json
+import os
+import re
+import time
+import zlib
+from datetime import datetime
+from typing import Optional
+import numpy as np
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.config import settings
+from app.models import Review
+
+logger = structlog.get_logger()
+
+WORD_RE = re.compile(r"\w+")
+
+# Heads predicted by the local tier, with their allowed labels
+HEADS = {
+    "role": ("driver", "rider", "unknown"),
+    "sentiment": ("positive", "neutral", "negative"),
+}
+
+
+def extract_features(text: Optional[str], rating: Optional[int], n_features: int) -> np.ndarray:
+    """
+    Hash word unigrams, bigrams and the star rating into feature indices.
+    
+    crc32 is used instead of hash() so indices are stable across processes.
+    """
+    words = WORD_RE.findall((text or "").lower())
+    tokens = [f"r:{rating}"]
+    tokens.extend(f"w:{word}" for word in words)
+    tokens.extend(f"b:{first} {second}" for first, second in zip(words, words[1:]))
+    
+    return np.fromiter(
+        (zlib.crc32(token.encode()) % n_features for token in tokens),
+        dtype=np.int64,
+        count=len(tokens),
+    )
+
+
+def parse_key_topics(value: Optional[str]) -> list:
+    """Read key_topics stored as JSON or as a Python list repr"""
+    if not value:
+        return []
+    for parse in (json.loads, ast.literal_eval):
+        try:
+            topics = parse(value)
+            return topics if isinstance(topics, list) else []
+        except (ValueError, SyntaxError):
+            continue
+    return []
+
+
+class LocalReviewClassifier:
+    """
+    Multinomial naive Bayes over hashed features, one model per head.
+    
+    Each head stores per-class log priors and a (classes x n_features)
+    matrix of smoothed log likelihoods; prediction sums the rows of the
+    text's feature indices, so it costs O(len(text)) regardless of the
+    vocabulary size.
+    """
+    
+    def __init__(self, n_features: Optional[int] = None, alpha: float = 0.1):
+        self.n_features = n_features or settings.LOCAL_CLASSIFIER_FEATURES
+        self.alpha = alpha
+        self.log_priors: dict[str, np.ndarray] = {}
+        self.log_likelihoods: dict[str, np.ndarray] = {}
+        self.trained_at: Optional[str] = None
+        self.samples = 0
+    
+    def fit(self, samples: list[dict]) -> "LocalReviewClassifier":
+        """
+        Train all heads.
+        
+        Args:
+            samples: dicts with 'text', 'rating', 'role', 'sentiment'
+        """
+        features = [extract_features(s.get("text"), s.get("rating"), self.n_features) for s in samples]
+        
+        for head, classes in HEADS.items():
+            counts = np.zeros((len(classes), self.n_features), dtype=np.float64)
+            class_totals = np.zeros(len(classes), dtype=np.float64)
+            
+            for sample, indices in zip(samples, features):
+                label = sample.get(head)
+                if label not in classes:
+                    continue
+                row = classes.index(label)
+                np.add.at(counts[row], indices, 1.0)
+                class_totals[row] += 1
+            
+            # Smoothed priors keep unseen classes predictable but unlikely
+            priors = (class_totals + 1) / (class_totals.sum() + len(classes))
+            smoothed = counts + self.alpha
+            likelihoods = np.log(smoothed) - np.log(smoothed.sum(axis=1, keepdims=True))
+            
+            self.log_priors[head] = np.log(priors).astype(np.float32)
+            self.log_likelihoods[head] = likelihoods.astype(np.float32)
+        
+        self.samples = len(samples)
+        self.trained_at = datetime.utcnow().isoformat()
+        return self
+    
+    def predict(self, text: Optional[str], rating: Optional[int]) -> dict:
+        """
+        Returns:
+            dict of head -> (label, probability)
+        """
+        indices = extract_features(text, rating, self.n_features)
+        predictions = {}
+        
+        for head, classes in HEADS.items():
+            scores = self.log_priors[head] + self.log_likelihoods[head][:, indices].sum(axis=1)
+            probabilities = np.exp(scores - scores.max())
+            probabilities /= probabilities.sum()
+            best = int(probabilities.argmax())
+            predictions[head] = (classes[best], float(probabilities[best]))
+        
+        return predictions
+    
+    def save(self, path: str):
+        """Persist the model as a single .npz file"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        arrays = {
+            "n_features": np.array(self.n_features),
+            "samples": np.array(self.samples),
+            "trained_at": np.array(self.trained_at or ""),
+        }
+        for head in HEADS:
+            arrays[f"{head}_log_priors"] = self.log_priors[head]
+            arrays[f"{head}_log_likelihoods"] = self.log_likelihoods[head]
+        
+        # Write then rename so a running API never loads a partial file
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path: str) -> "LocalReviewClassifier":
+        with np.load(path, allow_pickle=False) as data:
+            model = cls(n_features=int(data["n_features"]))
+            model.samples = int(data["samples"])
+            model.trained_at = str(data["trained_at"]) or None
+            for head in HEADS:
+                model.log_priors[head] = data[f"{head}_log_priors"]
+                model.log_likelihoods[head] = data[f"{head}_log_likelihoods"]
+        return model
+
+
+class LocalClassifierTier:
+    """
+    Loads the persisted model on demand and decides when to escalate.
+    
+    The model file's mtime is checked at most every
+    LOCAL_CLASSIFIER_RELOAD_INTERVAL seconds and the file re-read when it
+    changed, so retraining with `python -m app.cli train-classifier` takes
+    effect without a restart.
+    """
+    
+    def __init__(self, path: Optional[str] = None, threshold: Optional[float] = None):
+        self.path = path or settings.LOCAL_CLASSIFIER_PATH
+        self.threshold = settings.LOCAL_CLASSIFIER_THRESHOLD if threshold is None else threshold
+        self.model: Optional[LocalReviewClassifier] = None
+        self._mtime: Optional[float] = None
+        self._checked_at: Optional[float] = None
+        self.accepted = 0
+        self.escalated = 0
+    
+    def _current_model(self) -> Optional[LocalReviewClassifier]:
+        if not settings.LOCAL_CLASSIFIER_ENABLED:
+            return None
+        
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < settings.LOCAL_CLASSIFIER_RELOAD_INTERVAL:
+            return self.model
+        self._checked_at = now
+        
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            self.model = None
+            self._mtime = None
+            return None
+        
+        if mtime != self._mtime:
+            try:
+                self.model = LocalReviewClassifier.load(self.path)
+                logger.info(
+                    "Local classifier loaded",
+                    path=self.path,
+                    samples=self.model.samples,
+                    trained_at=self.model.trained_at,
+                )
+            except Exception as e:
+                logger.error("Failed to load local classifier", path=self.path, error=str(e))
+                self.model = None
+            self._mtime = mtime
+        
+        return self.model
+    
+    def classify(self, text: Optional[str], rating: int) -> Optional[dict]:
+        """
+        Classify a review locally.
+        
+        Returns:
+            Classification dict with 'confidence' and 'confident' flags,
+            or None when no model is available
+        """
+        model = self._current_model()
+        if model is None:
+            return None
+        
+        predictions = model.predict(text, rating)
+        confidence = min(probability for _, probability in predictions.values())
+        confident = confidence >= self.threshold
+        
+        if confident:
+            self.accepted += 1
+        else:
+            self.escalated += 1
+        
+        return {
+            "role": predictions["role"][0],
+            "categories": ["other"],
+            "sentiment": predictions["sentiment"][0],
+            "key_topics": [],
+            "confidence": round(confidence, 3),
+            "confident": confident,
+        }
+    
+    def get_stats(self) -> dict:
+        """Acceptance counters for monitoring"""
+        model = self._current_model()
+        decided = self.accepted + self.escalated
+        return {
+            "loaded": model is not None,
+            "path": self.path,
+            "threshold": self.threshold,
+            "samples": model.samples if model else None,
+            "trained_at": model.trained_at if model else None,
+            "accepted": self.accepted,
+            "escalated": self.escalated,
+            "accept_rate": round(self.accepted / decided, 3) if decided else None,
+        }
+
+
+async def load_training_samples(db: AsyncSession, limit: Optional[int] = None) -> list[dict]:
+    """
+    Reviews labelled by Gemini, newest first.
+    
+    At most `limit` reviews are read (default LOCAL_CLASSIFIER_MAX_SAMPLES,
+    0 for all). Rows are streamed, so only the kept samples are held in
+    memory.
+    
+    Gemini always returns key topics while the rule-based fallback and the
+    local tier store an empty list, so a non-empty key_topics marks a
+    review as LLM-labelled and keeps the model from training on its own
+    output.
+    """
+    query = (
+        select(Review.text, Review.rating, Review.role, Review.sentiment, Review.key_topics)
+        .where(
+            Review.text.isnot(None),
+            Review.sentiment.isnot(None),
+            Review.key_topics.isnot(None),
+        )
+        .order_by(Review.collected_at.desc())
+    )
+    if limit is None:
+        limit = settings.LOCAL_CLASSIFIER_MAX_SAMPLES
+    if limit:
+        query = query.limit(limit)
+    
+    samples = []
+    result = await db.stream(query.execution_options(yield_per=1000))
+    async for text, rating, role, sentiment, key_topics in result:
+        if parse_key_topics(key_topics):
+            samples.append({
+                "text": text,
+                "rating": rating,
+                "role": role.value if role else "unknown",
+                "sentiment": sentiment.value,
+            })
+    return samples
+
+
+def evaluate(model: LocalReviewClassifier, samples: list[dict], threshold: float) -> dict:
+    """Accuracy overall and on the predictions confident enough to skip Gemini"""
+    correct = {head: 0 for head in HEADS}
+    confident = 0
+    confident_correct = 0
+    
+    for sample in samples:
+        predictions = model.predict(sample["text"], sample["rating"])
+        hits = {head: predictions[head][0] == sample[head] for head in HEADS}
+        for head, hit in hits.items():
+            correct[head] += hit
+        if min(probability for _, probability in predictions.values()) >= threshold:
+            confident += 1
+            confident_correct += all(hits.values())
+    
+    total = len(samples) or 1
+    return {
+        "samples": len(samples),
+        **{f"{head}_accuracy": round(correct[head] / total, 3) for head in HEADS},
+        "local_coverage": round(confident / total, 3),
+        "local_accuracy": round(confident_correct / confident, 3) if confident else None,
+    }
+
+
+# Shared across ClassifierService instances (one is created per request)
+local_classifier = LocalClassifierTier()
@@ -0,0 +1,200 @@
+"""Background news collection jobs with streamed progress"""
+import asyncio
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+import structlog
+
+from app.config import settings
+from app.db.session import async_session_maker
+from app.services.news_collector import NewsCollector
+
+logger = structlog.get_logger()
+
+
+class CollectionJob:
+    """
+    State of one background collection.
+    
+    Progress is kept as an append-only list of events numbered from 1, so
+    a client can (re)subscribe and replay everything after the last event
+    it saw.
+    """
+    
+    def __init__(self, queries: List[str], force: bool = False):
+        self.id = uuid.uuid4()
+        self.queries = queries
+        self.force = force
+        self.status = "pending"  # pending, running, done, failed
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.completed_at: Optional[datetime] = None
+        self.queries_total = 0
+        self.queries_done = 0
+        self.queries_skipped = 0
+        self.new_items = 0
+        self.errors: List[dict] = []
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.events: List[dict] = []
+        self.task: Optional[asyncio.Task] = None
+        # Set and replaced on every event; subscribers wait on the current one
+        self._changed = asyncio.Event()
+    
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+    
+    def emit(self, kind: str, data: dict):
+        """Append an event and wake subscribers"""
+        self.events.append({"id": len(self.events) + 1, "event": kind, "data": data})
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+    
+    async def stream(self, after: int = 0, heartbeat: Optional[float] = None) -> AsyncIterator[Optional[dict]]:
+        """
+        Yield events after event id `after` until the job finishes.
+        
+        Yields None when no event arrived within `heartbeat` seconds, so
+        the caller can keep idle connections alive.
+        """
+        position = max(0, after)
+        while True:
+            while position < len(self.events):
+                position += 1
+                yield self.events[position - 1]
+            if self.finished:
+                return
+            
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield None
+    
+    def to_dict(self) -> dict:
+        """Progress snapshot for the status endpoint"""
+        return {
+            "job_id": str(self.id),
+            "status": self.status,
+            "force": self.force,
+            "queries_total": self.queries_total,
+            "queries_done": self.queries_done,
+            "queries_skipped": self.queries_skipped,
+            "new_items": self.new_items,
+            "errors": self.errors,
+            "error": self.error,
+            "events": len(self.events),
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "result": self.result,
+        }
+
+
+class CollectionJobManager:
+    """
+    Runs news collections as background tasks of this process.
+    
+    Only one collection runs at a time: starting another while one is in
+    progress returns the running job, so repeated clicks on the refresh
+    button do not pay for the same searches twice. The last
+    NEWS_COLLECTION_JOB_HISTORY jobs are kept for the status endpoints.
+    """
+    
+    def __init__(self, history: Optional[int] = None):
+        self.history = history or settings.NEWS_COLLECTION_JOB_HISTORY
+        self._jobs: OrderedDict[uuid.UUID, CollectionJob] = OrderedDict()
+        self._active: Optional[CollectionJob] = None
+    
+    def start(self, queries: List[str], force: bool = False, **search_kwargs) -> CollectionJob:
+        """Start a collection (or return the running one)"""
+        if self._active is not None and not self._active.finished:
+            return self._active
+        
+        job = CollectionJob(queries, force=force)
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.history:
+            self._jobs.popitem(last=False)
+        
+        self._active = job
+        job.task = asyncio.create_task(self._run(job, search_kwargs))
+        logger.info("News collection job started", job_id=str(job.id), queries=len(queries))
+        return job
+    
+    def get(self, job_id: uuid.UUID) -> Optional[CollectionJob]:
+        return self._jobs.get(job_id)
+    
+    def latest(self) -> Optional[CollectionJob]:
+        return next(reversed(self._jobs.values()), None)
+    
+    async def wait(self, job: CollectionJob) -> CollectionJob:
+        """Wait for a job to finish"""
+        if job.task is not None:
+            await asyncio.shield(job.task)
+        return job
+    
+    async def shutdown(self):
+        """Cancel a running collection (application shutdown)"""
+        job = self._active
+        if job is not None and job.task is not None and not job.task.done():
+            job.task.cancel()
+            await asyncio.gather(job.task, return_exceptions=True)
+    
+    async def _run(self, job: CollectionJob, search_kwargs: dict):
+        # Imported here: news_scraper imports news_collector at module level
+        from app.services.news_scraper import NewsScraperService
+        
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        
+        def on_event(kind: str, data: dict):
+            if kind == "started":
+                job.queries_total = data["queries_total"]
+                job.queries_skipped = data["queries_skipped"]
+                job.emit("started", data)
+            elif kind == "query":
+                job.queries_done += 1
+                job.new_items += data["new_items"]
+                if data["error"]:
+                    job.errors.append({"query": data["query"], "error": data["error"]})
+                for item in data["items"]:
+                    job.emit("item", item)
+                job.emit("query", {
+                    "query": data["query"],
+                    "since": data["since"],
+                    "new_items": data["new_items"],
+                    "error": data["error"],
+                    "queries_done": job.queries_done,
+                    "queries_total": job.queries_total,
+                })
+        
+        try:
+            async with async_session_maker() as db:
+                collection = await NewsCollector(NewsScraperService(db), on_event=on_event).collect(
+                    job.queries,
+                    incremental=False if job.force else None,
+                    use_plan=False if job.force else None,
+                    **search_kwargs,
+                )
+            job.result = {key: value for key, value in collection.items() if key != "results"}
+            job.status = "done"
+            job.completed_at = datetime.utcnow()
+            job.emit("done", job.result)
+            logger.info("News collection job done", job_id=str(job.id), new_items=job.new_items)
+        except asyncio.CancelledError:
+            job.status = "failed"
+            job.error = "Cancelled"
+            job.completed_at = datetime.utcnow()
+            job.emit("failed", {"error": job.error})
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            job.completed_at = datetime.utcnow()
+            job.emit("failed", {"error": job.error})
+            logger.error("News collection job failed", job_id=str(job.id), error=str(e))
+
+
+# Shared by the collect endpoints
+collection_jobs = CollectionJobManager()
@@ -0,0 +1,223 @@
+"""Concurrent collection of news for a list of search queries"""
+import asyncio
+import time
+from datetime import datetime, date
+from typing import TYPE_CHECKING, Callable, List, Optional
+import structlog
+
+from app.config import settings
+from app.models import NewsQueryState
+from app.services.news_query_optimizer import plan_queries
+from app.services.news_query_state import (
+    freshness_since,
+    is_due,
+    load_query_states,
+    query_key,
+    record_query_run,
+)
+
+if TYPE_CHECKING:
+    from app.services.news_scraper import NewsScraperService
+
+logger = structlog.get_logger()
+
+
+class NewsCollector:
+    """
+    Runs many NewsScraperService searches with a fixed pool of workers.
+    
+    Searches run concurrently and are paced by the per-provider rate
+    limiter, so there is no fixed delay between queries. Each query gets
+    its own timeout; a slow or failing query is reported in `errors`
+    without holding up the rest. Saving goes through the scraper's
+    session, which is not safe for concurrent use, so saves are
+    serialized while the next searches are already in flight.
+    
+    Collection is incremental: queries searched within their refresh
+    interval are skipped, the rest only ask for news published since the
+    newest item they found before, and every run updates the query's
+    state in news_query_state.
+    
+    `on_event(kind, data)` is called with a "started" event once the due
+    queries are known and a "query" event as each query finishes (with
+    its saved items or error), e.g. to stream progress of a background
+    collection.
+    """
+    
+    def __init__(
+        self,
+        scraper: "NewsScraperService",
+        workers: Optional[int] = None,
+        query_timeout: Optional[float] = None,
+        on_event: Optional[Callable[[str, dict], None]] = None,
+    ):
+        self.scraper = scraper
+        self.workers = max(1, workers or settings.NEWS_COLLECT_WORKERS)
+        self.query_timeout = query_timeout or settings.NEWS_QUERY_TIMEOUT
+        self.on_event = on_event
+        self._save_lock = asyncio.Lock()
+    
+    async def collect(
+        self,
+        queries: List[str],
+        incremental: Optional[bool] = None,
+        use_plan: Optional[bool] = None,
+        **search_kwargs,
+    ) -> dict:
+        """
+        Search and save every query that is due.
+        
+        Args:
+            queries: Search queries
+            incremental: Skip fresh queries and pass freshness constraints
+                (defaults to NEWS_INCREMENTAL_COLLECTION); False searches
+                every query over its full window
+            use_plan: Only search the queries of the optimized query plan
+                (defaults to NEWS_QUERY_PLAN_ENABLED)
+            **search_kwargs: Passed to NewsScraperService.fetch
+                (competitors, language, use_peru_sources)
+        
+        Returns:
+            dict with queries_executed, queries_skipped, queries_planned_out
+                (left out by the query plan), total_found,
+            unique_items, errors, results (saved items, unique by URL),
+            query_stats (per executed query) and duration_seconds
+        """
+        started = time.monotonic()
+        if incremental is None:
+            incremental = settings.NEWS_INCREMENTAL_COLLECTION
+        if use_plan is None:
+            use_plan = settings.NEWS_QUERY_PLAN_ENABLED
+        
+        unique_queries = list(dict.fromkeys(queries))
+        planned_out = 0
+        if use_plan:
+            planned = await plan_queries(self.scraper.db, unique_queries)
+            planned_out = len(unique_queries) - len(planned)
+            unique_queries = planned
+        
+        states = await load_query_states(self.scraper.db, unique_queries)
+        now = datetime.utcnow()
+        due = [
+            query for query in unique_queries
+            if not incremental or is_due(states.get(query_key(query)), now)
+        ]
+        skipped = len(unique_queries) - len(due)
+        
+        pending: asyncio.Queue = asyncio.Queue()
+        for query in due:
+            pending.put_nowait(query)
+        
+        saved: List[dict] = []
+        errors: List[dict] = []
+        stats: List[dict] = []
+        
+        async def worker():
+            while True:
+                try:
+                    query = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                
+                state = states.get(query_key(query))
+                since = freshness_since(state) if incremental else None
+                items: List[dict] = []
+                error = None
+                try:
+                    items = await self._collect_query(query, state, since, search_kwargs)
+                    saved.extend(items)
+                    stats.append({
+                        "query": query,
+                        "since": since.isoformat() if since else None,
+                        "new_items": len(items),
+                    })
+                except asyncio.TimeoutError:
+                    logger.error("Search timed out", query=query, timeout=self.query_timeout)
+                    error = f"Timed out after {self.query_timeout}s"
+                except Exception as e:
+                    logger.error("Search failed", query=query, error=str(e))
+                    error = str(e)
+                
+                if error:
+                    errors.append({"query": query, "error": error})
+                    await self._record(query, state, [], 0, error)
+                
+                self._emit("query", {
+                    "query": query,
+                    "since": since.isoformat() if since else None,
+                    "new_items": len(items),
+                    "items": items,
+                    "error": error,
+                })
+        
+        logger.info(
+            "Starting news collection",
+            query_count=len(due),
+            skipped=skipped,
+            workers=self.workers,
+        )
+        self._emit("started", {"queries_total": len(due), "queries_skipped": skipped})
+        await asyncio.gather(*(worker() for _ in range(min(self.workers, len(due)))))
+        
+        # Remove duplicates by URL
+        unique_results = {r.get("source_url"): r for r in saved}
+        duration = round(time.monotonic() - started, 2)
+        
+        logger.info("Collection complete",
+                    total_found=len(saved),
+                    unique=len(unique_results),
+                    errors=len(errors),
+                    duration=duration)
+        
+        return {
+            "queries_executed": len(due),
+            "queries_skipped": skipped,
+            "queries_planned_out": planned_out,
+            "total_found": len(saved),
+            "unique_items": len(unique_results),
+            "errors": errors,
+            "results": list(unique_results.values()),
+            "query_stats": stats,
+            "duration_seconds": duration,
+        }
+    
+    async def _collect_query(
+        self,
+        query: str,
+        state: Optional[NewsQueryState],
+        since: Optional[date],
+        search_kwargs: dict,
+    ) -> List[dict]:
+        logger.info("Searching", query=query, since=since)
+        results, api_called = await asyncio.wait_for(
+            self.scraper.fetch(query, since=since, **search_kwargs),
+            timeout=self.query_timeout,
+        )
+        
+        async with self._save_lock:
+            items = await self.scraper.save_results(query, results)
+            await record_query_run(
+                self.scraper.db, query, state, results, len(items), api_called=api_called
+            )
+        
+        logger.info("Search complete", query=query, results_count=len(items))
+        return items
+    
+    def _emit(self, kind: str, data: dict):
+        if self.on_event is None:
+            return
+        try:
+            self.on_event(kind, data)
+        except Exception as e:
+            logger.warning("Collection event handler failed", kind=kind, error=str(e))
+    
+    async def _record(
+        self,
+        query: str,
+        state: Optional[NewsQueryState],
+        results: List[dict],
+        new_items: int,
+        error: Optional[str] = None,
+    ):
+        async with self._save_lock:
+            await record_query_run(self.scraper.db, query, state, results, new_items, error)
@@ -0,0 +1,205 @@
+"""
+News deduplication helpers
+
+URL canonicalization collapses tracking parameters, AMP and mobile
+variants of the same article into one URL; MinHash signatures of the
+title and summary group the same story republished by different outlets
+into a story cluster.
+"""
+import hashlib
+import random
+import unicodedata
+import uuid
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import structlog
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import NewsItem
+from app.services.keyword_matcher import split_words
+
+logger = structlog.get_logger()
+
+# Query parameters that only track the visit
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "ref_url", "cmpid", "ncid", "ocid", "_ga", "_gl", "spm",
+    "amp", "outputtype",  # AMP variants, e.g. ?outputType=amp
+}
+TRACKING_PREFIXES = ("utm_", "hsa_", "pk_", "ga_")
+
+# Host prefixes of mobile and AMP mirrors
+HOST_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+
+# MinHash signature: MINHASH_PERMUTATIONS values, hashed in MINHASH_BANDS
+# bands of MINHASH_ROWS for locality-sensitive lookup
+MINHASH_PERMUTATIONS = 32
+MINHASH_ROWS = 2
+MINHASH_BANDS = MINHASH_PERMUTATIONS // MINHASH_ROWS
+# Texts with fewer distinct words are too short to fingerprint reliably
+MINHASH_MIN_WORDS = 5
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_random = random.Random(0x5EED)  # Fixed seed: signatures are stored and must stay comparable
+_PERMUTATIONS = [
+    (_random.randrange(1, _MERSENNE_PRIME), _random.randrange(0, _MERSENNE_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+
+
+def canonicalize_url(url: Optional[str]) -> Optional[str]:
+    """
+    Canonical form of an article URL.
+    
+    https scheme, lower-case host without www./m./amp. prefixes or default
+    port, no AMP path suffix, trailing slash or fragment, tracking
+    parameters removed and the remaining ones sorted.
+    """
+    if not url or not url.strip():
+        return None
+    
+    parts = urlsplit(url.strip())
+    if not parts.netloc:
+        # Not an absolute URL; fall back to the old normalization
+        return url.strip().lower().rstrip("/")
+    
+    host = (parts.hostname or "").lower()
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix):]
+            break
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    
+    path = parts.path or "/"
+    for suffix in ("/amp", "/amp/", ".amp", ".amp.html"):
+        if path.lower().endswith(suffix):
+            path = path[:-len(suffix)] + (".html" if suffix == ".amp.html" else "")
+            break
+    path = path.rstrip("/") or "/"
+    
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def hash_url(url: str) -> str:
+    """MD5 of the canonical URL; stored as news_items.url_hash"""
+    return hashlib.md5((canonicalize_url(url) or "").encode()).hexdigest()
+
+
+def _to_int32(value: int) -> int:
+    """Unsigned 32-bit value as a signed one, for INTEGER columns"""
+    value &= 0xFFFFFFFF
+    return value - (1 << 32) if value >= 1 << 31 else value
+
+
+def _shingles(text: str) -> set[str]:
+    # Accents are dropped so "Perú" and "Peru" match; short stop words carry no signal
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return {word for word in split_words(text) if len(word) > 2}
+
+
+def minhash(text: Optional[str]) -> Optional[list[int]]:
+    """
+    MinHash signature of the distinct words of a text, as signed 32-bit
+    integers, or None for texts too short to compare.
+    
+    The share of equal positions in two signatures estimates the Jaccard
+    similarity of their word sets.
+    """
+    words = _shingles(text or "")
+    if len(words) < MINHASH_MIN_WORDS:
+        return None
+    
+    hashes = [
+        int.from_bytes(hashlib.blake2b(word.encode(), digest_size=8).digest(), "big")
+        for word in words
+    ]
+    return [
+        _to_int32(min((a * value + b) % _MERSENNE_PRIME for value in hashes))
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def minhash_bands(signature: list[int]) -> list[int]:
+    """
+    Hash a signature into MINHASH_BANDS band keys.
+    
+    Two texts share a band key when all MINHASH_ROWS values of that band
+    agree, so an array overlap (&&) on the GIN-indexed keys finds texts
+    with a Jaccard similarity of 0.6 or more almost always (>99.9%),
+    while unrelated texts rarely come back as candidates.
+    """
+    return [
+        _to_int32(int.from_bytes(hashlib.blake2b(
+            repr((band, signature[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS])).encode(),
+            digest_size=4,
+        ).digest(), "big"))
+        for band in range(MINHASH_BANDS)
+    ]
+
+
+def similarity(a: list[int], b: list[int]) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(x == y for x, y in zip(a, b)) / MINHASH_PERMUTATIONS
+
+
+def fingerprint_text(title: Optional[str], summary: Optional[str]) -> str:
+    return f"{title or ''} {summary or ''}"
+
+
+async def assign_story_clusters(db: AsyncSession, rows: Iterable[dict]):
+    """
+    Set story_cluster_id on new news_items rows.
+    
+    Each row joins the cluster of the most similar earlier item (stored
+    within NEWS_CLUSTER_WINDOW_DAYS, or earlier in the same batch) with an
+    estimated similarity of at least NEWS_DUPLICATE_SIMILARITY; otherwise
+    it starts a cluster named after its own id. Candidates come from one
+    band-overlap query for the whole batch.
+    """
+    rows = list(rows)
+    threshold = settings.NEWS_DUPLICATE_SIMILARITY
+    
+    bands = sorted({band for row in rows if row["minhash"] is not None for band in row["minhash_bands"]})
+    candidates: list[tuple[list[int], uuid.UUID]] = []
+    if bands:
+        since = datetime.utcnow() - timedelta(days=settings.NEWS_CLUSTER_WINDOW_DAYS)
+        result = await db.execute(
+            select(NewsItem.minhash, NewsItem.story_cluster_id, NewsItem.id)
+            .where(
+                NewsItem.minhash_bands.overlap(bands),
+                NewsItem.collected_at >= since,
+            )
+        )
+        candidates = [
+            (signature, cluster_id or item_id)
+            for signature, cluster_id, item_id in result.all()
+        ]
+    
+    clustered = 0
+    for row in rows:
+        signature = row["minhash"]
+        best = None
+        if signature is not None:
+            for other, cluster_id in candidates:
+                score = similarity(signature, other)
+                if score >= threshold and (best is None or score > best[0]):
+                    best = (score, cluster_id)
+        
+        row["story_cluster_id"] = best[1] if best else row["id"]
+        clustered += best is not None
+        if signature is not None:
+            candidates.append((signature, row["story_cluster_id"]))
+    
+    if clustered:
+        logger.info("News items joined existing stories", count=clustered)
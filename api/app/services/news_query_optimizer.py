@@ -0,0 +1,187 @@
+"""
+Query plan optimizer for news collection
+
+Many predefined queries (per competitor and month wording variants)
+return the same URLs. From the URLs each query returned recently
+(news_query_hits), a greedy set cover picks the smallest set of queries
+that still finds NEWS_QUERY_PLAN_COVERAGE of all URLs seen.
+"""
+import heapq
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+import structlog
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import NewsQueryHit, NewsQueryState
+from app.services.news_query_state import query_key
+
+logger = structlog.get_logger()
+
+
+def greedy_cover(coverage: dict[str, set[str]], target: float) -> List[tuple[str, int]]:
+    """
+    Greedy set cover.
+    
+    Repeatedly takes the query adding the most not yet covered URLs until
+    `target` (0-1) of the union is covered or no query adds anything.
+    Lazy evaluation: a query's gain only shrinks as more is covered, so
+    its stale gain is an upper bound and is rechecked only when it tops
+    the list.
+    
+    Returns:
+        (key, marginal URLs) in selection order
+    """
+    universe = set().union(*coverage.values()) if coverage else set()
+    needed = target * len(universe)
+    covered: set[str] = set()
+    selected: List[tuple[str, int]] = []
+    
+    # Max-heap of possibly stale gains; ties broken by key for a stable plan
+    heap = [(-len(urls), key) for key, urls in coverage.items()]
+    heapq.heapify(heap)
+    while heap and len(covered) < needed:
+        _, key = heapq.heappop(heap)
+        gain = len(coverage[key] - covered)
+        if gain == 0:
+            continue
+        if heap and gain < -heap[0][0]:
+            heapq.heappush(heap, (-gain, key))
+            continue
+        covered |= coverage[key]
+        selected.append((key, gain))
+    
+    return selected
+
+
+async def build_query_plan(
+    db: AsyncSession,
+    queries: Iterable[str],
+    coverage_target: Optional[float] = None,
+    window_days: Optional[int] = None,
+) -> dict:
+    """
+    Minimized query plan for a list of queries.
+    
+    Args:
+        queries: Candidate queries (e.g. PREDEFINED_QUERIES)
+        coverage_target: Share of historical unique URLs to keep
+            (defaults to NEWS_QUERY_PLAN_COVERAGE)
+        window_days: History considered (defaults to NEWS_QUERY_PLAN_WINDOW_DAYS)
+    
+    Returns:
+        dict with queries (the plan: selected queries plus untested ones),
+        selected (query, urls, marginal_urls, coverage after it),
+        dropped (query, urls, unique_urls only it found), untested
+        (queries without history), total_urls, covered_urls, coverage
+        and api_calls_per_run before/after
+    """
+    coverage_target = coverage_target if coverage_target is not None else settings.NEWS_QUERY_PLAN_COVERAGE
+    window_days = window_days or settings.NEWS_QUERY_PLAN_WINDOW_DAYS
+    
+    by_key = {query_key(query): query for query in dict.fromkeys(queries)}
+    since = datetime.utcnow() - timedelta(days=window_days)
+    
+    result = await db.execute(
+        select(NewsQueryHit.query_key, NewsQueryHit.url_hash)
+        .where(
+            NewsQueryHit.query_key.in_(list(by_key)),
+            NewsQueryHit.last_seen_at >= since,
+        )
+    )
+    coverage: dict[str, set[str]] = {}
+    for key, url_hash in result.all():
+        coverage.setdefault(key, set()).add(url_hash)
+    
+    # Queries that ran in the window without returning anything are tested too
+    result = await db.execute(
+        select(NewsQueryState.key)
+        .where(
+            NewsQueryState.key.in_(list(by_key)),
+            NewsQueryState.last_run_at >= since,
+        )
+    )
+    tested = set(result.scalars().all()) | set(coverage)
+    
+    universe = set().union(*coverage.values()) if coverage else set()
+    selected = greedy_cover(coverage, coverage_target)
+    selected_keys = {key for key, _ in selected}
+    
+    plan = []
+    covered = 0
+    for key, gain in selected:
+        covered += gain
+        plan.append({
+            "query": by_key[key],
+            "urls": len(coverage[key]),
+            "marginal_urls": gain,
+            "coverage": round(covered / len(universe), 3),
+        })
+    
+    # URLs no other query found: what dropping the query alone would cost
+    counts: dict[str, int] = {}
+    for urls in coverage.values():
+        for url_hash in urls:
+            counts[url_hash] = counts.get(url_hash, 0) + 1
+    dropped = sorted(
+        (
+            {
+                "query": by_key[key],
+                "urls": len(coverage.get(key, ())),
+                "unique_urls": sum(1 for url_hash in coverage.get(key, ()) if counts[url_hash] == 1),
+            }
+            for key in tested - selected_keys
+        ),
+        key=lambda d: (-d["unique_urls"], -d["urls"], d["query"]),
+    )
+    untested = [query for key, query in by_key.items() if key not in tested]
+    
+    return {
+        "queries": [entry["query"] for entry in plan] + untested,
+        "selected": plan,
+        "dropped": dropped,
+        "untested": untested,
+        "total_urls": len(universe),
+        "covered_urls": covered,
+        "coverage": round(covered / len(universe), 3) if universe else None,
+        "coverage_target": coverage_target,
+        "window_days": window_days,
+        "api_calls_per_run": {"before": len(by_key), "after": len(plan) + len(untested)},
+    }
+
+
+async def plan_queries(db: AsyncSession, queries: List[str]) -> List[str]:
+    """
+    Queries to collect when NEWS_QUERY_PLAN_ENABLED.
+    
+    The optimized plan, plus dropped queries not run for
+    NEWS_QUERY_PLAN_EXPLORE_DAYS, so their yield is re-measured and the
+    plan follows changes in what each query finds. Falls back to all
+    queries when there is no history yet.
+    """
+    plan = await build_query_plan(db, queries)
+    if not plan["selected"]:
+        return list(queries)
+    
+    keep = set(plan["queries"])
+    explore_before = datetime.utcnow() - timedelta(days=settings.NEWS_QUERY_PLAN_EXPLORE_DAYS)
+    dropped_keys = [query_key(entry["query"]) for entry in plan["dropped"]]
+    if dropped_keys:
+        result = await db.execute(
+            select(NewsQueryState.key)
+            .where(
+                NewsQueryState.key.in_(dropped_keys),
+                NewsQueryState.last_run_at < explore_before,
+            )
+        )
+        explore = set(result.scalars().all())
+        keep |= {entry["query"] for entry in plan["dropped"] if query_key(entry["query"]) in explore}
+    
+    logger.info(
+        "Using optimized query plan",
+        queries=len(queries),
+        planned=len(keep),
+        coverage=plan["coverage"],
+    )
+    return [query for query in queries if query in keep]
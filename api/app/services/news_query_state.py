@@ -0,0 +1,194 @@
+"""Per-query state for incremental news collection"""
+import hashlib
+from datetime import datetime, date, timedelta
+from typing import Iterable, List, Optional
+import structlog
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import NewsQueryHit, NewsQueryState
+from app.services.news_dedup import hash_url
+from app.services.search_cache import normalize_query
+
+logger = structlog.get_logger()
+
+
+def query_key(query: str) -> str:
+    """sha256 of the normalized query; the news_query_state primary key"""
+    return hashlib.sha256(normalize_query(query).encode()).hexdigest()
+
+
+async def load_query_states(db: AsyncSession, queries: Iterable[str]) -> dict[str, NewsQueryState]:
+    """
+    Stored state of the given queries, keyed by query_key.
+    
+    The states are detached from the session, so later commits and
+    rollbacks on it do not expire them.
+    """
+    keys = list({query_key(query) for query in queries})
+    if not keys:
+        return {}
+    
+    result = await db.execute(select(NewsQueryState).where(NewsQueryState.key.in_(keys)))
+    states = {state.key: state for state in result.scalars().all()}
+    for state in states.values():
+        db.expunge(state)
+    return states
+
+
+def is_due(state: Optional[NewsQueryState], now: Optional[datetime] = None) -> bool:
+    """Whether a query's refresh interval has passed (never-run queries are due)"""
+    if state is None or state.next_run_at is None:
+        return True
+    return state.next_run_at <= (now or datetime.utcnow())
+
+
+def freshness_since(state: Optional[NewsQueryState]) -> Optional[date]:
+    """
+    Oldest publication date worth asking for: the newest item seen so far,
+    minus NEWS_QUERY_OVERLAP_DAYS for articles indexed late.
+    """
+    if state is None or state.newest_published_date is None:
+        return None
+    return state.newest_published_date - timedelta(days=settings.NEWS_QUERY_OVERLAP_DAYS)
+
+
+def next_refresh_interval(state: Optional[NewsQueryState], new_items: int) -> int:
+    """
+    Seconds until the query is due again.
+    
+    Productive queries use NEWS_QUERY_REFRESH_INTERVAL; every run without
+    new items doubles the interval, up to NEWS_QUERY_MAX_REFRESH_INTERVAL.
+    """
+    base = settings.NEWS_QUERY_REFRESH_INTERVAL
+    if new_items or state is None:
+        return base
+    return min(max(state.refresh_interval, base) * 2, settings.NEWS_QUERY_MAX_REFRESH_INTERVAL)
+
+
+def newest_published_date(results: List[dict]) -> Optional[date]:
+    """Newest published_date among parsed search results"""
+    newest = None
+    for item in results:
+        value = item.get("published_date")
+        try:
+            if isinstance(value, str):
+                value = date.fromisoformat(value[:10])
+        except ValueError:
+            continue
+        if isinstance(value, date) and value <= date.today() and (newest is None or value > newest):
+            newest = value
+    return newest
+
+
+async def record_query_run(
+    db: AsyncSession,
+    query: str,
+    state: Optional[NewsQueryState],
+    results: List[dict],
+    new_items: int,
+    error: Optional[str] = None,
+    api_called: bool = True,
+):
+    """
+    Upsert the state of a query after a run, in its own commit.
+    
+    Counters are incremented in SQL so overlapping collections do not lose
+    runs. A failed run is counted in failed_runs and leaves the query due
+    with its refresh interval and last-run yield unchanged, so an outage
+    does not back queries off. Results served from the search cache
+    (api_called=False) do not count as API calls. The URLs the run
+    returned are recorded in news_query_hits for the query plan optimizer.
+    """
+    now = datetime.utcnow()
+    interval = state.refresh_interval if error and state else next_refresh_interval(state, new_items)
+    values = {
+        "key": query_key(query),
+        "query": query,
+        "last_run_at": now,
+        "next_run_at": None if error else now + timedelta(seconds=interval),
+        "refresh_interval": interval,
+        "newest_published_date": newest_published_date(results),
+        "runs": 0 if error else 1,
+        "failed_runs": 1 if error else 0,
+        "api_calls": int(api_called),
+        "results_found": len(results),
+        "new_items": new_items,
+        "last_results": len(results),
+        "last_new_items": new_items,
+        "last_error": error,
+        "updated_at": now,
+    }
+    
+    statement = pg_insert(NewsQueryState).values(**values)
+    excluded = statement.excluded
+    set_ = {
+        "query": excluded.query,
+        "last_run_at": excluded.last_run_at,
+        "newest_published_date": func.greatest(
+            NewsQueryState.newest_published_date, excluded.newest_published_date
+        ),
+        "runs": NewsQueryState.runs + excluded.runs,
+        "failed_runs": NewsQueryState.failed_runs + excluded.failed_runs,
+        "api_calls": NewsQueryState.api_calls + excluded.api_calls,
+        "results_found": NewsQueryState.results_found + excluded.results_found,
+        "new_items": NewsQueryState.new_items + excluded.new_items,
+        "last_error": excluded.last_error,
+        "updated_at": excluded.updated_at,
+    }
+    if not error:
+        set_["next_run_at"] = excluded.next_run_at
+        set_["refresh_interval"] = excluded.refresh_interval
+        set_["last_results"] = excluded.last_results
+        set_["last_new_items"] = excluded.last_new_items
+    
+    # Every URL returned, new or already stored
+    url_hashes = sorted({hash_url(item["source_url"]) for item in results if item.get("source_url")})
+    
+    try:
+        await db.execute(statement.on_conflict_do_update(index_elements=[NewsQueryState.key], set_=set_))
+        if url_hashes:
+            hits = pg_insert(NewsQueryHit).values([
+                {
+                    "query_key": values["key"],
+                    "url_hash": url_hash,
+                    "hits": 1,
+                    "first_seen_at": now,
+                    "last_seen_at": now,
+                }
+                for url_hash in url_hashes
+            ])
+            await db.execute(hits.on_conflict_do_update(
+                index_elements=[NewsQueryHit.query_key, NewsQueryHit.url_hash],
+                set_={
+                    "hits": NewsQueryHit.hits + 1,
+                    "last_seen_at": hits.excluded.last_seen_at,
+                },
+            ))
+        await db.commit()
+    except Exception as e:
+        logger.warning("Failed to record query state", query=query, error=str(e))
+        await db.rollback()
+
+
+def query_stats(state: NewsQueryState, now: Optional[datetime] = None) -> dict:
+    """Efficiency summary of a query for the query-stats endpoint"""
+    return {
+        "query": state.query,
+        "runs": state.runs,
+        "failed_runs": state.failed_runs,
+        "api_calls": state.api_calls,
+        "results_found": state.results_found,
+        "new_items": state.new_items,
+        "new_items_per_call": round(state.new_items / state.api_calls, 2) if state.api_calls else None,
+        "last_run_at": state.last_run_at.isoformat() if state.last_run_at else None,
+        "last_results": state.last_results,
+        "last_new_items": state.last_new_items,
+        "last_error": state.last_error,
+        "newest_published_date": state.newest_published_date.isoformat() if state.newest_published_date else None,
+        "refresh_interval": state.refresh_interval,
+        "next_run_at": state.next_run_at.isoformat() if state.next_run_at else None,
+        "due": is_due(state, now),
+    }
@@ -8,20 +8,38 @@ Enhanced with:
 - Peru market news sources configuration
 - Competitor detection
 - Category classification
-- Deduplication via unique_id (MD5 hash of URL)
+- Deduplication via unique_id (MD5 hash of the canonical URL)
+- Story clustering of syndicated articles (MinHash of title + summary)
 """
 import json
 import hashlib
+import uuid
+from functools import lru_cache
 from typing import Optional, List
 from datetime import datetime, date
 import structlog
 import httpx
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, bindparam, any_, String
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
 
 from app.config import settings
 from app.models import NewsItem
 from app.models.news_item import NewsSource
+from app.services.keyword_matcher import KeywordMatcher
+from app.services.news_collector import NewsCollector
+from app.services.news_dedup import (
+    assign_story_clusters,
+    canonicalize_url,
+    fingerprint_text,
+    hash_url,
+    minhash,
+    minhash_bands,
+)
+from app.services.http_clients import http_clients
+from app.services.rate_limiter import provider_limiter
+from app.services.count_cache import count_cache
+from app.services.search_cache import search_cache
 
 # Import news sources configuration
 try:
@@ -46,6 +64,89 @@ except ImportError:
 
 logger = structlog.get_logger()
 
+# Results requested per Parallel AI search (increased for more coverage)
+PARALLEL_MAX_RESULTS = 15
+
+
+# Used when news_config is unavailable
+FALLBACK_COMPETITOR_KEYWORDS = {
+    "indriver": ["indriver", "in driver", "indrive"],
+    "uber": ["uber"],
+    "didi": ["didi", "99"],
+    "cabify": ["cabify"],
+    "yango": ["yango"],
+    "beat": ["beat"],
+    "rappi": ["rappi"],
+    "bolt": ["bolt"],
+}
+
+COMPETITOR_KEYWORDS = (
+    {competitor.slug: [alias.lower() for alias in competitor.aliases] for competitor in COMPETITORS}
+    if COMPETITORS else FALLBACK_COMPETITOR_KEYWORDS
+)
+
+TOPIC_KEYWORDS = {
+    "pricing": ["precio", "tarifa", "comisión", "costo", "price", "fare"],
+    "safety": ["seguridad", "safety", "sos", "emergencia", "robo", "asalto"],
+    "regulation": ["regulación", "ley", "gobierno", "municipal", "regulation", "MTC", "ATU"],
+    "expansion": ["expansión", "nuevo mercado", "lanzamiento", "expansion"],
+    "drivers": ["conductor", "driver", "chofer", "ganancias"],
+    "promo": ["promoción", "descuento", "oferta", "promo", "discount", "cupón"],
+    "technology": ["app", "aplicación", "tecnología", "actualización", "feature", "función"],
+    "labor": ["paro", "huelga", "protesta", "strike"],
+}
+
+# Priority order for categories
+CATEGORY_PATTERNS = [
+    ("Product Feature", ["nueva función", "actualización", "nueva versión", "lanzamiento", "feature"]),
+    ("Promo & Incentives", ["promoción", "descuento", "cupón", "bono", "sorteo", "gratis"]),
+    ("Commercial Terms", ["comisión", "tarifa", "precio", "ganancias", "pago"]),
+    ("Safety", ["robo", "asalto", "accidente", "seguridad", "crimen"]),
+    ("Regulation", ["regulación", "ley", "MTC", "ATU", "multa", "permiso"]),
+    ("Labor", ["paro", "huelga", "protesta", "manifestación"]),
+]
+
+POSITIVE_WORDS = ["éxito", "crecimiento", "mejora", "positivo", "success", "growth", "lanza", "nueva"]
+NEGATIVE_WORDS = ["problema", "queja", "huelga", "protesta", "issue", "problem", "strike", "robo", "asalto"]
+
+# One matcher for every news detector, labels namespaced by detector
+NEWS_MATCHER = KeywordMatcher({
+    **{("competitor", slug): keywords for slug, keywords in COMPETITOR_KEYWORDS.items()},
+    **{("topic", topic): keywords for topic, keywords in TOPIC_KEYWORDS.items()},
+    **{("category", name): keywords for name, keywords in CATEGORY_PATTERNS},
+    ("sentiment", "positive"): POSITIVE_WORDS,
+    ("sentiment", "negative"): NEGATIVE_WORDS,
+})
+
+
+@lru_cache(maxsize=256)
+def analyze_text(text: str) -> tuple:
+    """
+    Competitors, topics, category and sentiment of a text from one scan.
+    
+    Memoized, so the per-field _detect_* helpers called on the same text
+    share a single scan.
+    """
+    found = NEWS_MATCHER.find(text)
+    
+    competitors = tuple(slug for slug in COMPETITOR_KEYWORDS if ("competitor", slug) in found)
+    topics = tuple(topic for topic in TOPIC_KEYWORDS if ("topic", topic) in found)
+    category = next(
+        (name for name, _ in CATEGORY_PATTERNS if ("category", name) in found),
+        "General",
+    )
+    
+    pos_count = len(found.get(("sentiment", "positive"), ()))
+    neg_count = len(found.get(("sentiment", "negative"), ()))
+    if pos_count > neg_count:
+        sentiment = "positive"
+    elif neg_count > pos_count:
+        sentiment = "negative"
+    else:
+        sentiment = "neutral"
+    
+    return competitors, topics or ("general",), category, sentiment
+
 
 class NewsScraperService:
     """
@@ -81,38 +182,126 @@ class NewsScraperService:
             List of news items found
         """
         
-        logger.info("Searching news with Parallel AI", query=query, competitors=competitors)
+        try:
+            results, _ = await self.fetch(query, competitors, language, use_peru_sources)
+        except Exception:
+            # Logged by the search; nothing to save
+            results = []
+        return await self.save_results(query, results)
+    
+    async def fetch(
+        self,
+        query: str,
+        competitors: Optional[List[str]] = None,
+        language: str = "es",
+        use_peru_sources: bool = True,
+        since: Optional[date] = None,
+    ) -> tuple[List[dict], bool]:
+        """
+        Run the Parallel AI search for a query without touching the database.
+        
+        Safe to call concurrently; results are saved with save_results().
+        Search API errors are raised, not returned as an empty result.
+        
+        Args:
+            since: Only ask for news published on or after this date
+        
+        Returns:
+            (results, whether the search API was called; False when the
+            results came from the search cache)
+        """
+        logger.info("Searching news with Parallel AI", query=query, competitors=competitors, since=since)
         
         # Enhance query with context
-        enhanced_query = self._enhance_query(query, competitors, language, use_peru_sources)
+        enhanced_query = self._enhance_query(query, competitors, language, use_peru_sources, since)
         
         # Search using Parallel AI
-        if self.api_key:
-            results = await self._search_parallel(enhanced_query)
-        else:
+        if not self.api_key:
             logger.warning("Parallel AI API key not configured, returning empty results")
-            return []
+            return [], False
+        
+        return await self._search_parallel(enhanced_query)
+    
+    async def save_results(self, query: str, results: List[dict]) -> List[dict]:
+        """
+        Save fetched results to the database (with deduplication).
+        
+        Uses the service's session, so calls must not overlap.
         
-        # Save results to database (with deduplication)
-        saved_items = []
+        Returns:
+            Newly saved news items
+        """
+        # One row per URL hash; items without a URL are always saved
+        rows = {}
         for item in results:
-            news_item = await self._save_news_item(query, item)
-            if news_item:
-                saved_items.append({
-                    "id": str(news_item.id),
-                    "unique_id": self._generate_unique_id(item.get("source_url")),
-                    "title": news_item.title,
-                    "summary": news_item.summary,
-                    "source_url": news_item.source_url,
-                    "source_name": news_item.source_name,
-                    "published_date": news_item.published_date.isoformat() if news_item.published_date else None,
-                    "competitors_mentioned": news_item.competitors_mentioned,
-                    "topics": news_item.topics,
-                    "sentiment": news_item.sentiment,
-                    "relevance_score": news_item.relevance_score,
-                })
-        
-        return saved_items
+            row = self._news_item_row(query, item)
+            rows.setdefault(row["url_hash"] or row["id"], row)
+        
+        if not rows:
+            return []
+        
+        try:
+            # Skip URLs already stored, with one lookup for the whole batch
+            hashes = [row["url_hash"] for row in rows.values() if row["url_hash"]]
+            existing = set()
+            if hashes:
+                result = await self.db.execute(
+                    select(NewsItem.url_hash).where(
+                        NewsItem.url_hash == any_(bindparam("hashes", hashes, type_=ARRAY(String)))
+                    )
+                )
+                existing = set(result.scalars().all())
+            
+            new_rows = [row for row in rows.values() if row["url_hash"] not in existing]
+            inserted = set()
+            if new_rows:
+                # Syndicated copies of a story share a cluster
+                await assign_story_clusters(self.db, new_rows)
+                
+                # ON CONFLICT covers URLs saved concurrently since the lookup
+                result = await self.db.execute(
+                    pg_insert(NewsItem)
+                    .values(new_rows)
+                    .on_conflict_do_nothing(index_elements=[NewsItem.url_hash])
+                    .returning(NewsItem.id)
+                )
+                inserted = set(result.scalars().all())
+            
+            await self.db.commit()
+            if inserted:
+                count_cache.invalidate(NewsItem.__tablename__)
+        except Exception as e:
+            logger.error("Failed to save news items", error=str(e))
+            await self.db.rollback()
+            return []
+        
+        logger.info(
+            "Saved news items",
+            query=query,
+            received=len(results),
+            saved=len(inserted),
+            skipped=len(results) - len(inserted),
+        )
+        
+        return [
+            {
+                "id": str(row["id"]),
+                "unique_id": self._generate_unique_id(row["source_url"]),
+                "title": row["title"],
+                "summary": row["summary"],
+                "source_url": row["source_url"],
+                "canonical_url": row["canonical_url"],
+                "source_name": row["source_name"],
+                "published_date": row["published_date"].isoformat() if row["published_date"] else None,
+                "competitors_mentioned": row["competitors_mentioned"],
+                "topics": row["topics"],
+                "sentiment": row["sentiment"],
+                "relevance_score": row["relevance_score"],
+                "story_cluster_id": str(row["story_cluster_id"]),
+            }
+            for row in new_rows
+            if row["id"] in inserted
+        ]
     
     async def search_competitor_news(
         self,
@@ -174,24 +363,22 @@ class NewsScraperService:
             "items": []
         }
         
-        # Generate queries
+        # Generate queries and run them through the concurrent collector
         queries = generate_search_queries()
+        collection = await NewsCollector(self).collect(queries, use_peru_sources=True)
         
-        for query in queries:
-            try:
-                items = await self.search(query, use_peru_sources=True)
-                results["items"].extend(items)
-                results["total_items"] += len(items)
-                
-                # Categorize results
-                for item in items:
-                    for comp in item.get("competitors_mentioned", []):
-                        results["by_competitor"][comp] = results["by_competitor"].get(comp, 0) + 1
-                    for topic in item.get("topics", []):
-                        results["by_category"][topic] = results["by_category"].get(topic, 0) + 1
-                        
-            except Exception as e:
-                logger.error(f"Error in market scan for query '{query}': {e}")
+        results["items"] = collection["results"]
+        results["total_items"] = len(collection["results"])
+        
+        # Categorize results
+        for item in collection["results"]:
+            for comp in item.get("competitors_mentioned") or []:
+                results["by_competitor"][comp] = results["by_competitor"].get(comp, 0) + 1
+            for topic in item.get("topics") or []:
+                results["by_category"][topic] = results["by_category"].get(topic, 0) + 1
+        
+        for error in collection["errors"]:
+            logger.error(f"Error in market scan for query '{error['query']}': {error['error']}")
         
         logger.info(f"Market scan completed: {results['total_items']} items found")
         return results
@@ -200,26 +387,15 @@ class NewsScraperService:
         """Generate MD5 hash of URL for deduplication"""
         if not url:
             return hashlib.md5(str(datetime.utcnow()).encode()).hexdigest()
-        # Normalize URL (remove trailing slashes, lowercase)
-        normalized = url.lower().rstrip("/")
-        return hashlib.md5(normalized.encode()).hexdigest()
-    
-    async def _check_duplicate(self, source_url: str) -> bool:
-        """Check if news item already exists by URL"""
-        if not source_url:
-            return False
-        
-        result = await self.db.execute(
-            select(NewsItem).where(NewsItem.source_url == source_url)
-        )
-        return result.scalar_one_or_none() is not None
+        return hash_url(url)
     
     def _enhance_query(
         self, 
         query: str, 
         competitors: Optional[List[str]], 
         language: str,
-        use_peru_sources: bool = True
+        use_peru_sources: bool = True,
+        since: Optional[date] = None,
     ) -> str:
         """Enhance query with context for better results"""
         parts = [query]
@@ -235,6 +411,10 @@ class NewsScraperService:
         year = datetime.now().year
         parts.append(f"últimas noticias {year}")
         
+        # Parallel AI has no date filter; the objective carries the freshness constraint
+        if since:
+            parts.append(f"publicadas desde el {since.isoformat()}")
+        
         # Add site filter for Peru sources
         if use_peru_sources and PERU_NEWS_SOURCES:
             site_filter = build_site_filter(PERU_NEWS_SOURCES[:5])
@@ -242,11 +422,32 @@ class NewsScraperService:
         
         return " ".join(parts)
     
-    async def _search_parallel(self, query: str) -> List[dict]:
+    async def _search_parallel(self, query: str) -> tuple[List[dict], bool]:
+        """
+        Search using Parallel AI, reusing recent results for the same query.
+        
+        Returns:
+            (results, whether this call reached the API rather than the
+            cache or another caller's in-flight search)
+        """
+        api_called = False
+        
+        async def fetch() -> List[dict]:
+            nonlocal api_called
+            api_called = True
+            return await self._search_parallel_uncached(query)
+        
+        results = await search_cache.get_or_fetch("parallel", query, PARALLEL_MAX_RESULTS, fetch)
+        return results, api_called
+    
+    async def _search_parallel_uncached(self, query: str) -> List[dict]:
         """
         Search using Parallel AI v1beta Search API.
         
         API Docs: https://docs.parallel.ai/search/search-quickstart
+        
+        Errors are logged and re-raised, so a failed search is not mistaken
+        for one that found nothing.
         """
         
         try:
@@ -256,7 +457,9 @@ class NewsScraperService:
             # Build the objective with context
             objective = f"{query}. Focus on Peru market, ride-hailing apps, taxi services."
             
-            async with httpx.AsyncClient() as client:
+            client = http_clients.get("parallel")
+            
+            async def post_search() -> httpx.Response:
                 response = await client.post(
                     f"{self.base_url}/search",
                     headers={
@@ -267,36 +470,38 @@ class NewsScraperService:
                     json={
                         "objective": objective,
                         "search_queries": search_queries,
-                        "max_results": 15,  # Increased for more coverage
+                        "max_results": PARALLEL_MAX_RESULTS,
                         "excerpts": {
                             "max_chars_per_result": 3000
                         }
                     },
-                    timeout=60.0,
                 )
-                
                 response.raise_for_status()
-                data = response.json()
-                
-                # Parse Parallel AI response
-                results = self._parse_parallel_response(data)
-                
-                logger.info("Parallel AI search completed", 
-                           results_count=len(results),
-                           search_id=data.get("search_id"))
-                return results
-                
+                return response
+            
+            # Shared per-provider budget; 429/5xx responses are retried with backoff
+            response = await provider_limiter("parallel").call(post_search)
+            data = response.json()
+            
+            # Parse Parallel AI response
+            results = self._parse_parallel_response(data)
+            
+            logger.info("Parallel AI search completed", 
+                       results_count=len(results),
+                       search_id=data.get("search_id"))
+            return results
+            
         except httpx.HTTPStatusError as e:
             logger.error("Parallel AI API error", 
                         status_code=e.response.status_code,
                         response=e.response.text[:200])
-            return []
+            raise
         except httpx.HTTPError as e:
             logger.error("Parallel AI HTTP error", error=str(e))
-            return []
+            raise
         except Exception as e:
             logger.error("News search failed", error=str(e))
-            return []
+            raise
     
     def _generate_search_queries(self, objective: str) -> List[str]:
         """Generate multiple search queries from objective for better coverage"""
@@ -355,17 +560,12 @@ class NewsScraperService:
             # Extract domain as source name
             source_name = self._extract_domain(url)
             
-            # Detect competitors mentioned
-            competitors_mentioned = self._detect_competitors(full_text)
-            
-            # Detect topics/categories
-            topics = self._detect_topics(full_text)
-            
-            # Detect category
-            category = self._detect_category(full_text)
-            
-            # Basic sentiment detection
-            sentiment = self._detect_sentiment(full_text)
+            # Detect competitors, topics, category and sentiment in one pass
+            analysis = self._analyze_text(full_text)
+            competitors_mentioned = analysis["competitors"]
+            topics = analysis["topics"]
+            category = analysis["category"]
+            sentiment = analysis["sentiment"]
             
             # Create summary from first excerpt
             summary = excerpts[0][:500] if excerpts else title
@@ -397,140 +597,66 @@ class NewsScraperService:
         except:
             return ""
     
+    def _analyze_text(self, text: str) -> dict:
+        """Run all keyword detectors over the text in a single scan"""
+        competitors, topics, category, sentiment = analyze_text(text)
+        return {
+            "competitors": list(competitors),
+            "topics": list(topics),
+            "category": category,
+            "sentiment": sentiment,
+        }
+    
     def _detect_competitors(self, text: str) -> List[str]:
         """Detect which competitors are mentioned in the text"""
-        text_lower = text.lower()
-        detected = []
-        
-        for competitor in COMPETITORS:
-            # Check all aliases
-            for alias in competitor.aliases:
-                if alias.lower() in text_lower:
-                    detected.append(competitor.slug)
-                    break
-        
-        # Fallback to original keywords if COMPETITORS not loaded
-        if not COMPETITORS:
-            competitor_keywords = {
-                "indriver": ["indriver", "in driver", "indrive"],
-                "uber": ["uber"],
-                "didi": ["didi", "99"],
-                "cabify": ["cabify"],
-                "yango": ["yango"],
-                "beat": ["beat"],
-                "rappi": ["rappi"],
-                "bolt": ["bolt"],
-            }
-            
-            for comp, keywords in competitor_keywords.items():
-                if any(kw in text_lower for kw in keywords):
-                    detected.append(comp)
-        
-        return list(set(detected))
+        return self._analyze_text(text)["competitors"]
     
     def _detect_topics(self, text: str) -> List[str]:
         """Detect topics mentioned in the text"""
-        text_lower = text.lower()
-        topics = []
-        
-        topic_keywords = {
-            "pricing": ["precio", "tarifa", "comisión", "costo", "price", "fare"],
-            "safety": ["seguridad", "safety", "sos", "emergencia", "robo", "asalto"],
-            "regulation": ["regulación", "ley", "gobierno", "municipal", "regulation", "MTC", "ATU"],
-            "expansion": ["expansión", "nuevo mercado", "lanzamiento", "expansion"],
-            "drivers": ["conductor", "driver", "chofer", "ganancias"],
-            "promo": ["promoción", "descuento", "oferta", "promo", "discount", "cupón"],
-            "technology": ["app", "aplicación", "tecnología", "actualización", "feature", "función"],
-            "labor": ["paro", "huelga", "protesta", "strike"],
-        }
-        
-        for topic, keywords in topic_keywords.items():
-            if any(kw in text_lower for kw in keywords):
-                topics.append(topic)
-        
-        return topics if topics else ["general"]
+        return self._analyze_text(text)["topics"]
     
     def _detect_category(self, text: str) -> str:
         """Detect news category based on content"""
-        text_lower = text.lower()
-        
-        # Priority order for categories
-        category_patterns = [
-            ("Product Feature", ["nueva función", "actualización", "nueva versión", "lanzamiento", "feature"]),
-            ("Promo & Incentives", ["promoción", "descuento", "cupón", "bono", "sorteo", "gratis"]),
-            ("Commercial Terms", ["comisión", "tarifa", "precio", "ganancias", "pago"]),
-            ("Safety", ["robo", "asalto", "accidente", "seguridad", "crimen"]),
-            ("Regulation", ["regulación", "ley", "MTC", "ATU", "multa", "permiso"]),
-            ("Labor", ["paro", "huelga", "protesta", "manifestación"]),
-        ]
-        
-        for category, keywords in category_patterns:
-            if any(kw in text_lower for kw in keywords):
-                return category
-        
-        return "General"
+        return self._analyze_text(text)["category"]
     
     def _detect_sentiment(self, text: str) -> str:
         """Basic sentiment detection"""
-        text_lower = text.lower()
-        
-        positive_words = ["éxito", "crecimiento", "mejora", "positivo", "success", "growth", "lanza", "nueva"]
-        negative_words = ["problema", "queja", "huelga", "protesta", "issue", "problem", "strike", "robo", "asalto"]
-        
-        pos_count = sum(1 for word in positive_words if word in text_lower)
-        neg_count = sum(1 for word in negative_words if word in text_lower)
-        
-        if pos_count > neg_count:
-            return "positive"
-        elif neg_count > pos_count:
-            return "negative"
-        return "neutral"
+        return self._analyze_text(text)["sentiment"]
     
-    async def _save_news_item(self, query: str, item: dict) -> Optional[NewsItem]:
-        """Save a news item to database with deduplication"""
-        
-        # Check for duplicate
-        if await self._check_duplicate(item.get("source_url")):
-            logger.debug("Skipping duplicate news item", url=item.get("source_url"))
-            return None
-        
-        try:
-            # Parse date
-            pub_date = None
-            if item.get("published_date"):
-                try:
-                    if isinstance(item["published_date"], str):
-                        pub_date = date.fromisoformat(item["published_date"][:10])
-                    elif isinstance(item["published_date"], date):
-                        pub_date = item["published_date"]
-                except ValueError:
-                    pass
-            
-            news_item = NewsItem(
-                search_query=query,
-                title=item.get("title", "Untitled")[:500],
-                summary=item.get("summary"),
-                source_url=item.get("source_url"),
-                source_name=item.get("source_name"),
-                source_type=NewsSource.PARALLEL,
-                published_date=pub_date,
-                competitors_mentioned=item.get("competitors_mentioned"),
-                topics=item.get("topics"),
-                sentiment=item.get("sentiment"),
-                relevance_score=float(item.get("relevance_score", 0.5)),
-                raw_response=item,
-                is_processed=True,
-                is_relevant=True,
-            )
-            
-            self.db.add(news_item)
-            await self.db.commit()
-            await self.db.refresh(news_item)
-            
-            logger.info("Saved news item", title=news_item.title[:50], url=news_item.source_url)
-            return news_item
-            
-        except Exception as e:
-            logger.error("Failed to save news item", error=str(e))
-            await self.db.rollback()
-            return None
+    def _news_item_row(self, query: str, item: dict) -> dict:
+        """Build a news_items row from a parsed search result"""
+        # Parse date
+        pub_date = None
+        if item.get("published_date"):
+            try:
+                if isinstance(item["published_date"], str):
+                    pub_date = date.fromisoformat(item["published_date"][:10])
+                elif isinstance(item["published_date"], date):
+                    pub_date = item["published_date"]
+            except ValueError:
+                pass
+        
+        source_url = item.get("source_url") or None
+        title = (item.get("title") or "Untitled")[:500]
+        signature = minhash(fingerprint_text(title, item.get("summary")))
+        return {
+            "id": uuid.uuid4(),
+            "search_query": query,
+            "title": title,
+            "summary": item.get("summary"),
+            "source_url": source_url,
+            "canonical_url": canonicalize_url(source_url),
+            "url_hash": hash_url(source_url) if source_url else None,
+            "minhash": signature,
+            "minhash_bands": minhash_bands(signature) if signature is not None else None,
+            "source_name": item.get("source_name"),
+            "source_type": NewsSource.PARALLEL,
+            "published_date": pub_date,
+            "competitors_mentioned": item.get("competitors_mentioned"),
+            "topics": item.get("topics"),
+            "sentiment": item.get("sentiment"),
+            "relevance_score": float(item.get("relevance_score", 0.5)),
+            "raw_response": item,
+            "is_processed": True,
+            "is_relevant": True,
+        }
@@ -5,15 +5,21 @@ Multiple search API providers for news monitoring.
 Configure the provider based on available API keys.
 """
 
+import asyncio
 import json
 import hashlib
+import time
 from abc import ABC, abstractmethod
+from collections import deque
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, date
 import structlog
 import httpx
 
 from app.config import settings
+from app.services.http_clients import http_clients
+from app.services.rate_limiter import gemini_limiter, estimate_tokens
+from app.services.search_cache import search_cache
 
 logger = structlog.get_logger()
 
@@ -47,14 +53,39 @@ class SearchResult:
             "published_date": self.date,
             "relevance_score": self.score,
         }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "SearchResult":
+        """Inverse of to_dict()"""
+        return cls(
+            title=data.get("title", ""),
+            url=data.get("source_url", ""),
+            snippet=data.get("summary", ""),
+            source=data.get("source_name"),
+            date=data.get("published_date"),
+            score=data.get("relevance_score", 0.5),
+        )
+
+
+def days_since(since: date) -> int:
+    """Days from `since` through today, at least 1"""
+    return max(1, (date.today() - since).days + 1)
 
 
 class SearchProvider(ABC):
     """Base class for search providers"""
     
     @abstractmethod
-    async def search(self, query: str, max_results: int = 10) -> List[SearchResult]:
-        """Execute search and return results"""
+    async def search(self, query: str, max_results: int = 10, since: Optional[date] = None) -> List[SearchResult]:
+        """
+        Execute search and return results.
+        
+        `since` asks for news published on or after that date; providers
+        without a date filter approximate it or ignore it.
+        
+        API errors are logged and re-raised, so callers can tell a failed
+        search from one that found nothing.
+        """
         pass
     
     @property
@@ -89,60 +120,67 @@ class PerplexityProvider(SearchProvider):
     def is_configured(self) -> bool:
         return bool(self.api_key)
     
-    async def search(self, query: str, max_results: int = 10) -> List[SearchResult]:
+    async def search(self, query: str, max_results: int = 10, since: Optional[date] = None) -> List[SearchResult]:
         if not self.is_configured:
             logger.warning("Perplexity API key not configured")
             return []
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": [
-                            {
-                                "role": "system",
-                                "content": "You are a news research assistant. Search for the latest news and return factual information with sources."
-                            },
-                            {
-                                "role": "user", 
-                                "content": f"Search for: {query}\n\nReturn news articles with URLs and dates."
-                            }
-                        ],
-                        "max_tokens": 1500,
+            payload = {
+                "model": self.model,
+                "messages": [
+                    {
+                        "role": "system",
+                        "content": "You are a news research assistant. Search for the latest news and return factual information with sources."
                     },
-                    timeout=60.0,
+                    {
+                        "role": "user", 
+                        "content": f"Search for: {query}\n\nReturn news articles with URLs and dates."
+                    }
+                ],
+                "max_tokens": 1500,
+            }
+            if since:
+                # Smallest recency window that covers `since`
+                days = days_since(since)
+                payload["search_recency_filter"] = (
+                    "day" if days <= 1 else "week" if days <= 7 else "month" if days <= 31 else "year"
                 )
-                
-                response.raise_for_status()
-                data = response.json()
-                
-                # Parse response - Perplexity returns text with citations
-                content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
-                citations = data.get("citations", [])
-                
-                results = []
-                for i, citation in enumerate(citations[:max_results]):
-                    results.append(SearchResult(
-                        title=citation.get("title", f"Result {i+1}"),
-                        url=citation.get("url", ""),
-                        snippet=citation.get("snippet", content[:200] if i == 0 else ""),
-                        source=citation.get("source"),
-                        date=citation.get("date"),
-                        score=1.0 - (i * 0.1)  # Decrease score by position
-                    ))
-                
-                logger.info(f"Perplexity search completed", results_count=len(results))
-                return results
-                
+            
+            client = http_clients.get("perplexity")
+            response = await client.post(
+                f"{self.base_url}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                },
+                json=payload,
+            )
+            
+            response.raise_for_status()
+            data = response.json()
+            
+            # Parse response - Perplexity returns text with citations
+            content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
+            citations = data.get("citations", [])
+            
+            results = []
+            for i, citation in enumerate(citations[:max_results]):
+                results.append(SearchResult(
+                    title=citation.get("title", f"Result {i+1}"),
+                    url=citation.get("url", ""),
+                    snippet=citation.get("snippet", content[:200] if i == 0 else ""),
+                    source=citation.get("source"),
+                    date=citation.get("date"),
+                    score=1.0 - (i * 0.1)  # Decrease score by position
+                ))
+            
+            logger.info(f"Perplexity search completed", results_count=len(results))
+            return results
+            
         except Exception as e:
             logger.error(f"Perplexity search error: {e}")
-            return []
+            raise
 
 
 class TavilyProvider(SearchProvider):
@@ -163,49 +201,54 @@ class TavilyProvider(SearchProvider):
     def is_configured(self) -> bool:
         return bool(self.api_key)
     
-    async def search(self, query: str, max_results: int = 10) -> List[SearchResult]:
+    async def search(self, query: str, max_results: int = 10, since: Optional[date] = None) -> List[SearchResult]:
         if not self.is_configured:
             logger.warning("Tavily API key not configured")
             return []
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/search",
-                    headers={
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "api_key": self.api_key,
-                        "query": query,
-                        "search_depth": "advanced",
-                        "include_domains": [],  # Can add Peru domains here
-                        "max_results": max_results,
-                        "include_raw_content": False,
-                    },
-                    timeout=60.0,
-                )
-                
-                response.raise_for_status()
-                data = response.json()
-                
-                results = []
-                for item in data.get("results", []):
-                    results.append(SearchResult(
-                        title=item.get("title", ""),
-                        url=item.get("url", ""),
-                        snippet=item.get("content", ""),
-                        source=item.get("domain"),
-                        date=item.get("published_date"),
-                        score=item.get("score", 0.5)
-                    ))
-                
-                logger.info(f"Tavily search completed", results_count=len(results))
-                return results
-                
+            payload = {
+                "api_key": self.api_key,
+                "query": query,
+                "search_depth": "advanced",
+                "include_domains": [],  # Can add Peru domains here
+                "max_results": max_results,
+                "include_raw_content": False,
+            }
+            if since:
+                # `days` only applies to the news topic
+                payload["topic"] = "news"
+                payload["days"] = days_since(since)
+            
+            client = http_clients.get("tavily")
+            response = await client.post(
+                f"{self.base_url}/search",
+                headers={
+                    "Content-Type": "application/json",
+                },
+                json=payload,
+            )
+            
+            response.raise_for_status()
+            data = response.json()
+            
+            results = []
+            for item in data.get("results", []):
+                results.append(SearchResult(
+                    title=item.get("title", ""),
+                    url=item.get("url", ""),
+                    snippet=item.get("content", ""),
+                    source=item.get("domain"),
+                    date=item.get("published_date"),
+                    score=item.get("score", 0.5)
+                ))
+            
+            logger.info(f"Tavily search completed", results_count=len(results))
+            return results
+            
         except Exception as e:
             logger.error(f"Tavily search error: {e}")
-            return []
+            raise
 
 
 class SerpAPIProvider(SearchProvider):
@@ -226,47 +269,50 @@ class SerpAPIProvider(SearchProvider):
     def is_configured(self) -> bool:
         return bool(self.api_key)
     
-    async def search(self, query: str, max_results: int = 10) -> List[SearchResult]:
+    async def search(self, query: str, max_results: int = 10, since: Optional[date] = None) -> List[SearchResult]:
         if not self.is_configured:
             logger.warning("SerpAPI key not configured")
             return []
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/search.json",
-                    params={
-                        "api_key": self.api_key,
-                        "q": query,
-                        "engine": "google",
-                        "gl": "pe",  # Peru
-                        "hl": "es",  # Spanish
-                        "num": max_results,
-                        "tbm": "nws",  # News search
-                    },
-                    timeout=30.0,
-                )
-                
-                response.raise_for_status()
-                data = response.json()
-                
-                results = []
-                for item in data.get("news_results", []) or data.get("organic_results", []):
-                    results.append(SearchResult(
-                        title=item.get("title", ""),
-                        url=item.get("link", ""),
-                        snippet=item.get("snippet", ""),
-                        source=item.get("source", {}).get("name") if isinstance(item.get("source"), dict) else item.get("source"),
-                        date=item.get("date"),
-                        score=0.8 - (len(results) * 0.05)
-                    ))
-                
-                logger.info(f"SerpAPI search completed", results_count=len(results))
-                return results
-                
+            params = {
+                "api_key": self.api_key,
+                "q": query,
+                "engine": "google",
+                "gl": "pe",  # Peru
+                "hl": "es",  # Spanish
+                "num": max_results,
+                "tbm": "nws",  # News search
+            }
+            if since:
+                params["tbs"] = f"cdr:1,cd_min:{since:%m/%d/%Y}"  # Custom date range
+            
+            client = http_clients.get("serpapi")
+            response = await client.get(
+                f"{self.base_url}/search.json",
+                params=params,
+            )
+            
+            response.raise_for_status()
+            data = response.json()
+            
+            results = []
+            for item in data.get("news_results", []) or data.get("organic_results", []):
+                results.append(SearchResult(
+                    title=item.get("title", ""),
+                    url=item.get("link", ""),
+                    snippet=item.get("snippet", ""),
+                    source=item.get("source", {}).get("name") if isinstance(item.get("source"), dict) else item.get("source"),
+                    date=item.get("date"),
+                    score=0.8 - (len(results) * 0.05)
+                ))
+            
+            logger.info(f"SerpAPI search completed", results_count=len(results))
+            return results
+            
         except Exception as e:
             logger.error(f"SerpAPI search error: {e}")
-            return []
+            raise
 
 
 class GeminiSearchProvider(SearchProvider):
@@ -287,7 +333,7 @@ class GeminiSearchProvider(SearchProvider):
     def is_configured(self) -> bool:
         return bool(self.api_key)
     
-    async def search(self, query: str, max_results: int = 10) -> List[SearchResult]:
+    async def search(self, query: str, max_results: int = 10, since: Optional[date] = None) -> List[SearchResult]:
         if not self.is_configured:
             logger.warning("Google API key not configured")
             return []
@@ -320,8 +366,13 @@ Return results as a JSON array with this structure:
 ]
 
 Focus on Peru market, Spanish language sources. Return up to {max_results} results."""
-
-            response = await model.generate_content_async(prompt)
+            if since:
+                prompt += f"\nOnly include articles published on or after {since.isoformat()}."
+            
+            response = await gemini_limiter.call(
+                lambda: model.generate_content_async(prompt),
+                tokens=estimate_tokens(prompt) + 200 * max_results,
+            )
             
             # Parse JSON from response
             text = response.text.strip()
@@ -350,7 +401,7 @@ Focus on Peru market, Spanish language sources. Return up to {max_results} resul
             
         except Exception as e:
             logger.error(f"Gemini search error: {e}")
-            return []
+            raise
 
 
 class ParallelAIProvider(SearchProvider):
@@ -372,7 +423,7 @@ class ParallelAIProvider(SearchProvider):
     def is_configured(self) -> bool:
         return bool(self.api_key)
     
-    async def search(self, query: str, max_results: int = 10) -> List[SearchResult]:
+    async def search(self, query: str, max_results: int = 10, since: Optional[date] = None) -> List[SearchResult]:
         if not self.is_configured:
             logger.warning("Parallel AI API key not configured")
             return []
@@ -381,52 +432,56 @@ class ParallelAIProvider(SearchProvider):
             # Generate search queries from objective
             search_queries = self._generate_search_queries(query)
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/search",
-                    headers={
-                        "Content-Type": "application/json",
-                        "x-api-key": self.api_key,
-                        "parallel-beta": self.beta_header,
-                    },
-                    json={
-                        "objective": query,
-                        "search_queries": search_queries,
-                        "max_results": max_results,
-                        "excerpts": {
-                            "max_chars_per_result": 5000
-                        }
-                    },
-                    timeout=60.0,
-                )
-                
-                response.raise_for_status()
-                data = response.json()
-                
-                results = []
-                for item in data.get("results", []):
-                    # Combine excerpts into summary
-                    excerpts = item.get("excerpts", [])
-                    summary = excerpts[0][:500] if excerpts else ""
-                    
-                    results.append(SearchResult(
-                        title=item.get("title", ""),
-                        url=item.get("url", ""),
-                        snippet=summary,
-                        source=self._extract_domain(item.get("url", "")),
-                        date=item.get("publish_date"),
-                        score=0.9 - (len(results) * 0.05)  # High confidence for Parallel
-                    ))
-                
-                logger.info(f"Parallel AI search completed", results_count=len(results))
-                return results
+            # No date filter in the Search API; the objective carries the constraint
+            objective = query
+            if since:
+                objective += f". Only articles published on or after {since.isoformat()}."
+            
+            client = http_clients.get("parallel")
+            response = await client.post(
+                f"{self.base_url}/search",
+                headers={
+                    "Content-Type": "application/json",
+                    "x-api-key": self.api_key,
+                    "parallel-beta": self.beta_header,
+                },
+                json={
+                    "objective": objective,
+                    "search_queries": search_queries,
+                    "max_results": max_results,
+                    "excerpts": {
+                        "max_chars_per_result": 5000
+                    }
+                },
+            )
+            
+            response.raise_for_status()
+            data = response.json()
+            
+            results = []
+            for item in data.get("results", []):
+                # Combine excerpts into summary
+                excerpts = item.get("excerpts", [])
+                summary = excerpts[0][:500] if excerpts else ""
                 
+                results.append(SearchResult(
+                    title=item.get("title", ""),
+                    url=item.get("url", ""),
+                    snippet=summary,
+                    source=self._extract_domain(item.get("url", "")),
+                    date=item.get("publish_date"),
+                    score=0.9 - (len(results) * 0.05)  # High confidence for Parallel
+                ))
+            
+            logger.info(f"Parallel AI search completed", results_count=len(results))
+            return results
+            
         except httpx.HTTPStatusError as e:
             logger.error(f"Parallel AI API error: {e.response.status_code} - {e.response.text[:200]}")
-            return []
+            raise
         except Exception as e:
             logger.error(f"Parallel AI search error: {e}")
-            return []
+            raise
     
     def _generate_search_queries(self, objective: str) -> List[str]:
         """Generate multiple search queries from a single objective"""
@@ -454,11 +509,145 @@ class ParallelAIProvider(SearchProvider):
             return ""
 
 
+class ProviderStats:
+    """
+    Health of one search provider.
+    
+    Tracks exponentially weighted averages (SEARCH_EWMA_ALPHA) of latency,
+    error rate and result yield, plus recent latencies for hedging. Only
+    errors (exceptions) count as failures; an empty result is a healthy
+    call that lowers the yield.
+    
+    A circuit breaker opens after SEARCH_BREAKER_THRESHOLD consecutive
+    errors; the provider is skipped until SEARCH_BREAKER_COOLDOWN has
+    passed, then a single trial call is allowed (half-open) which either
+    closes the breaker or opens it again.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, name: str, window: int = 100):
+        self.name = name
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.calls = 0
+        self.errors = 0
+        self.empty = 0
+        self.wins = 0
+        
+        # Neutral priors, so providers without history keep their static order
+        self.ewma_latency = settings.SEARCH_HEDGE_DELAY
+        self.ewma_failure = 0.0
+        self.ewma_yield = 5.0
+        
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+    
+    def allow(self) -> bool:
+        """Whether the breaker lets a call through"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < settings.SEARCH_BREAKER_COOLDOWN:
+                return False
+            self.state = self.HALF_OPEN
+        
+        return not (self.state == self.HALF_OPEN and self._trial_in_flight)
+    
+    def begin(self):
+        """A call is starting; in half-open state it is the single trial"""
+        if self.state == self.HALF_OPEN:
+            self._trial_in_flight = True
+    
+    def record(self, latency: float, result_count: int, failed: bool = False):
+        """A call finished with `result_count` results, or with an error"""
+        alpha = settings.SEARCH_EWMA_ALPHA
+        
+        self.latencies.append(latency)
+        self.calls += 1
+        self.errors += failed
+        self.ewma_latency += alpha * (latency - self.ewma_latency)
+        self.ewma_failure += alpha * (float(failed) - self.ewma_failure)
+        if not failed:
+            self.empty += not result_count
+            self.ewma_yield += alpha * (result_count - self.ewma_yield)
+        self._trial_in_flight = False
+        
+        if not failed:
+            self.consecutive_failures = 0
+            self.state = self.CLOSED
+            return
+        
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= settings.SEARCH_BREAKER_THRESHOLD:
+            if self.state != self.OPEN:
+                logger.warning(
+                    "Search provider circuit opened",
+                    provider=self.name,
+                    failures=self.consecutive_failures,
+                )
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+    
+    def cancelled(self):
+        """A call was abandoned (lost a race); release the half-open trial"""
+        self._trial_in_flight = False
+    
+    def score(self) -> float:
+        """Expected results per second of latency; higher is better"""
+        return (1.0 - self.ewma_failure) * self.ewma_yield / max(self.ewma_latency, 0.1)
+    
+    def latency_percentile(self, q: float) -> Optional[float]:
+        """Latency quantile in seconds, or None without enough history"""
+        if len(self.latencies) < settings.SEARCH_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    
+    def to_dict(self) -> dict:
+        p50 = self.latency_percentile(0.5)
+        p90 = self.latency_percentile(0.9)
+        cooldown_left = None
+        if self.state == self.OPEN:
+            elapsed = time.monotonic() - self.opened_at
+            cooldown_left = round(max(0.0, settings.SEARCH_BREAKER_COOLDOWN - elapsed), 1)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "empty": self.empty,
+            "wins": self.wins,
+            "latency_p50": round(p50, 2) if p50 is not None else None,
+            "latency_p90": round(p90, 2) if p90 is not None else None,
+            "ewma_latency": round(self.ewma_latency, 2),
+            "error_rate": round(self.ewma_failure, 3),
+            "yield": round(self.ewma_yield, 1),
+            "score": round(self.score(), 3),
+            "circuit": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "cooldown_remaining": cooldown_left,
+        }
+
+
 class MultiSearchProvider:
     """
-    Multi-provider search - tries multiple providers in order
+    Multi-provider search with selectable strategies:
+    
+    - sequential: try providers one after another (default)
+    - race: run the top SEARCH_RACE_FANOUT providers at once, return the
+      first non-empty result and cancel the rest
+    - hedge: start the first provider and add the next one whenever the
+      running one is slower than its SEARCH_HEDGE_PERCENTILE latency or
+      comes back empty; first non-empty result wins
+    - merge: run the top SEARCH_RACE_FANOUT providers at once and merge
+      whatever arrives within SEARCH_MERGE_DEADLINE
+    
+    A provider that errors or comes back empty is followed by the next
+    one, so "good" means non-empty.
     """
     
+    STRATEGIES = ("sequential", "race", "hedge", "merge")
+    
     def __init__(self):
         # Initialize all providers - Parallel AI first as primary
         self.providers: List[SearchProvider] = [
@@ -468,16 +657,43 @@ class MultiSearchProvider:
             SerpAPIProvider(),
             GeminiSearchProvider(),  # Fallback
         ]
+        self.stats = {p.name: ProviderStats(p.name) for p in self.providers}
     
     def get_available_providers(self) -> List[SearchProvider]:
         """Get list of configured providers"""
         return [p for p in self.providers if p.is_configured]
     
+    def _ranked(self, providers: List[SearchProvider]) -> List[SearchProvider]:
+        if not settings.SEARCH_ADAPTIVE_ORDER:
+            return list(providers)
+        # sorted() is stable, so equal scores keep the static order
+        return sorted(providers, key=lambda p: self.stats[p.name].score(), reverse=True)
+    
+    def get_ordered_providers(self) -> List[SearchProvider]:
+        """
+        Configured providers best-first, skipping open circuits.
+        
+        With SEARCH_ADAPTIVE_ORDER off the static order is kept. If every
+        circuit is open, all providers are returned rather than none.
+        """
+        available = self._ranked(self.get_available_providers())
+        allowed = [p for p in available if self.stats[p.name].allow()]
+        skipped = [p.name for p in available if p not in allowed]
+        if skipped:
+            logger.info("Skipping search providers with open circuit", providers=skipped)
+        if not allowed:
+            logger.warning("All search provider circuits open, trying all providers")
+            return available
+        return allowed
+    
     async def search(
         self, 
         query: str, 
         max_results: int = 10,
-        preferred_provider: Optional[str] = None
+        preferred_provider: Optional[str] = None,
+        strategy: Optional[str] = None,
+        use_cache: bool = True,
+        since: Optional[date] = None,
     ) -> List[SearchResult]:
         """
         Search using available providers.
@@ -486,11 +702,45 @@ class MultiSearchProvider:
             query: Search query
             max_results: Max results to return
             preferred_provider: Optional provider name to use first
+            strategy: sequential, race, hedge or merge
+                (defaults to SEARCH_STRATEGY)
+            use_cache: Serve recent identical searches from the search cache
+            since: Only ask for news published on or after this date
         
         Returns:
             List of search results
         """
-        available = self.get_available_providers()
+        strategy = (strategy or settings.SEARCH_STRATEGY).lower()
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown search strategy: {strategy}")
+        
+        if not use_cache:
+            return await self._search(query, max_results, preferred_provider, strategy, since)
+        
+        async def fetch() -> List[dict]:
+            results = await self._search(query, max_results, preferred_provider, strategy, since)
+            return [result.to_dict() for result in results]
+        
+        cache_provider = f"multi:{strategy}:{(preferred_provider or 'auto').lower()}"
+        if since:
+            cache_provider += f":since={since.isoformat()}"
+        cached = await search_cache.get_or_fetch(
+            cache_provider,
+            query,
+            max_results,
+            fetch,
+        )
+        return [SearchResult.from_dict(item) for item in cached]
+    
+    async def _search(
+        self,
+        query: str,
+        max_results: int,
+        preferred_provider: Optional[str],
+        strategy: str,
+        since: Optional[date] = None,
+    ) -> List[SearchResult]:
+        available = self.get_ordered_providers()
         
         if not available:
             logger.error("No search providers configured")
@@ -503,33 +753,178 @@ class MultiSearchProvider:
                 key=lambda p: 0 if p.name.lower() == preferred_provider.lower() else 1
             )
         
-        # Try each provider until one succeeds
-        for provider in available:
-            logger.info(f"Trying search provider: {provider.name}")
-            results = await provider.search(query, max_results)
-            if results:
-                logger.info(f"Search successful with {provider.name}", count=len(results))
-                return results
+        if strategy == "merge":
+            return await self._merge(available, query, max_results, since)
+        
+        fanout = 1
+        if strategy == "race":
+            fanout = max(1, settings.SEARCH_RACE_FANOUT)
+        
+        provider, results = await self._first_good(
+            available, query, max_results, fanout=fanout, hedge=strategy == "hedge", since=since
+        )
+        if provider:
+            self.stats[provider.name].wins += 1
+            logger.info(
+                f"Search successful with {provider.name}",
+                count=len(results),
+                strategy=strategy,
+            )
+            return results
         
-        logger.warning("All search providers failed")
+        logger.warning("All search providers failed", strategy=strategy)
         return []
     
+    async def _timed_search(
+        self,
+        provider: SearchProvider,
+        query: str,
+        max_results: int,
+        since: Optional[date] = None,
+    ) -> List[SearchResult]:
+        logger.info(f"Trying search provider: {provider.name}")
+        self.stats[provider.name].begin()
+        started = time.monotonic()
+        failed = False
+        try:
+            results = await provider.search(query, max_results, since=since)
+        except asyncio.CancelledError:
+            self.stats[provider.name].cancelled()
+            raise
+        except Exception:
+            # Providers log their own errors
+            failed = True
+            results = []
+        self.stats[provider.name].record(time.monotonic() - started, len(results), failed=failed)
+        return results
+    
+    def _hedge_delay(self, provider: SearchProvider) -> float:
+        """Seconds to wait on a provider before starting the next one"""
+        delay = self.stats[provider.name].latency_percentile(settings.SEARCH_HEDGE_PERCENTILE)
+        return settings.SEARCH_HEDGE_DELAY if delay is None else delay
+    
+    async def _first_good(
+        self,
+        providers: List[SearchProvider],
+        query: str,
+        max_results: int,
+        fanout: int = 1,
+        hedge: bool = False,
+        since: Optional[date] = None,
+    ) -> tuple[Optional[SearchProvider], List[SearchResult]]:
+        """
+        Run providers until one returns results.
+        
+        Keeps `fanout` providers in flight and starts the next one when a
+        provider comes back empty; with `hedge`, also when the most recently
+        started provider exceeds its hedge delay. Losers are cancelled.
+        """
+        queue = list(providers)
+        running: dict[asyncio.Task, SearchProvider] = {}
+        hedge_at: Optional[float] = None
+        
+        def launch():
+            nonlocal hedge_at
+            provider = queue.pop(0)
+            task = asyncio.create_task(self._timed_search(provider, query, max_results, since))
+            running[task] = provider
+            hedge_at = time.monotonic() + self._hedge_delay(provider) if hedge else None
+        
+        try:
+            while queue and len(running) < fanout:
+                launch()
+            
+            while running:
+                timeout = None
+                if hedge_at is not None and queue:
+                    timeout = max(0.0, hedge_at - time.monotonic())
+                
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.info("Hedging slow search provider", next_provider=queue[0].name)
+                    launch()
+                    continue
+                
+                for task in done:
+                    provider = running.pop(task)
+                    results = task.result()
+                    if results:
+                        return provider, results
+                
+                while queue and len(running) < fanout:
+                    launch()
+            
+            return None, []
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+    
+    async def _merge(
+        self,
+        providers: List[SearchProvider],
+        query: str,
+        max_results: int,
+        since: Optional[date] = None,
+    ) -> List[SearchResult]:
+        """Combine results of the top providers returned within the deadline"""
+        selected = providers[:max(1, settings.SEARCH_RACE_FANOUT)]
+        tasks = {
+            asyncio.create_task(self._timed_search(provider, query, max_results, since)): provider
+            for provider in selected
+        }
+        done, pending = await asyncio.wait(tasks, timeout=settings.SEARCH_MERGE_DEADLINE)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            logger.warning(
+                "Search providers missed merge deadline",
+                providers=[tasks[task].name for task in pending],
+            )
+        
+        # Deduplicate by URL, keeping the highest score
+        merged: dict[str, SearchResult] = {}
+        contributors = []
+        for task in done:
+            results = task.result()
+            if results:
+                contributors.append(tasks[task].name)
+                self.stats[tasks[task].name].wins += 1
+            for result in results:
+                existing = merged.get(result.unique_id)
+                if existing is None or result.score > existing.score:
+                    merged[result.unique_id] = result
+        
+        logger.info("Merged search results", providers=contributors, count=len(merged))
+        return sorted(merged.values(), key=lambda r: r.score, reverse=True)[:max_results]
+    
     def get_status(self) -> dict:
         """Get status of all providers"""
         return {
             "providers": [
                 {
                     "name": p.name,
-                    "configured": p.is_configured
+                    "configured": p.is_configured,
+                    **self.stats[p.name].to_dict(),
                 }
                 for p in self.providers
             ],
-            "available_count": len(self.get_available_providers())
+            "available_count": len(self.get_available_providers()),
+            "strategy": settings.SEARCH_STRATEGY,
+            "adaptive_order": settings.SEARCH_ADAPTIVE_ORDER,
+            "order": [p.name for p in self._ranked(self.get_available_providers())],
         }
 
 
+_search_provider: Optional[MultiSearchProvider] = None
+
+
 # Convenience function
 def get_search_provider() -> MultiSearchProvider:
-    """Get configured search provider"""
-    return MultiSearchProvider()
-
+    """Get the shared search provider (keeps latency history across calls)"""
+    global _search_provider
+    if _search_provider is None:
+        _search_provider = MultiSearchProvider()
+    return _search_provider
@@ -0,0 +1,281 @@
+"""Shared rate limiting and adaptive concurrency for external API calls"""
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+import structlog
+
+from app.config import settings
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+# HTTP status codes that mean "slow down" rather than "your request is wrong"
+THROTTLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# google.api_core exception class names for the same conditions
+THROTTLE_EXCEPTION_NAMES = {
+    "ResourceExhausted",
+    "TooManyRequests",
+    "ServiceUnavailable",
+    "InternalServerError",
+    "BadGateway",
+    "GatewayTimeout",
+    "DeadlineExceeded",
+}
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Rough token count for budgeting (~4 characters per token)"""
+    return len(text or "") // 4 + 1
+
+
+def is_throttle_error(error: BaseException) -> bool:
+    """Whether an exception signals rate limiting or server overload"""
+    if type(error).__name__ in THROTTLE_EXCEPTION_NAMES:
+        return True
+    
+    code = getattr(error, "code", None)
+    if code is None:
+        response = getattr(error, "response", None)
+        code = getattr(response, "status_code", None)
+    try:
+        return int(code) in THROTTLE_STATUS_CODES
+    except (TypeError, ValueError):
+        return False
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at capacity per minute"""
+    
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+    
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+
+class AdaptiveRateLimiter:
+    """
+    Request/token rate limiter with AIMD concurrency control.
+    
+    Every call first takes a slot from the concurrency window, then waits
+    until both the requests-per-minute and tokens-per-minute buckets can
+    cover it. A throttling error (429/5xx) halves the window and the call
+    is retried with jittered exponential backoff; each success grows the
+    window by roughly one slot per window's worth of calls, up to
+    max_concurrency.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        rpm: int,
+        tpm: int = 0,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+    ):
+        self.name = name
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.max_retries = max_retries
+        self.backoff = backoff
+        
+        self.concurrency = float(self.max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._bucket_lock: Optional[asyncio.Lock] = None
+        
+        self._completed: deque[float] = deque()
+        self._last_decrease = 0.0
+        self.total_requests = 0
+        self.throttles = 0
+        self.retries = 0
+        self.failures = 0
+    
+    def _primitives(self) -> tuple[asyncio.Condition, asyncio.Lock]:
+        # Created lazily so the module-level limiter binds to the running loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+            self._bucket_lock = asyncio.Lock()
+        return self._condition, self._bucket_lock
+    
+    async def call(self, func: Callable[[], Awaitable[T]], tokens: int = 0) -> T:
+        """
+        Run `func` under the limiter, retrying throttled attempts.
+        
+        Args:
+            func: Zero-argument coroutine factory (called once per attempt)
+            tokens: Estimated tokens the call consumes (prompt + response)
+        
+        Raises:
+            The last exception if the call is not throttling-related or
+            retries are exhausted.
+        """
+        attempt = 0
+        while True:
+            await self._acquire(tokens)
+            try:
+                result = await func()
+            except Exception as e:
+                throttled = is_throttle_error(e)
+                await self._release(throttled=throttled)
+                if not throttled or attempt >= self.max_retries:
+                    self.failures += 1
+                    raise
+                
+                attempt += 1
+                self.retries += 1
+                delay = self.backoff * (2 ** (attempt - 1)) * (0.5 + random.random())
+                logger.warning(
+                    "Rate limited, backing off",
+                    limiter=self.name,
+                    attempt=attempt,
+                    delay=round(delay, 2),
+                    concurrency=int(self.concurrency),
+                    error=str(e),
+                )
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                await self._release(throttled=False, counted=False)
+                raise
+            
+            await self._release(throttled=False)
+            return result
+    
+    async def _acquire(self, tokens: int):
+        condition, bucket_lock = self._primitives()
+        
+        acquired = False
+        self.waiting += 1
+        try:
+            async with condition:
+                await condition.wait_for(lambda: self.in_flight < int(self.concurrency))
+                self.in_flight += 1
+                acquired = True
+            
+            # Serialize bucket checks so waiters are served in arrival order
+            async with bucket_lock:
+                while True:
+                    delay = self.requests.wait_time(1)
+                    if self.tokens and tokens:
+                        delay = max(delay, self.tokens.wait_time(tokens))
+                    if delay <= 0:
+                        break
+                    await asyncio.sleep(delay)
+                
+                self.requests.consume(1)
+                if self.tokens and tokens:
+                    self.tokens.consume(tokens)
+        except BaseException:
+            if acquired:
+                await self._release(throttled=False, counted=False)
+            raise
+        finally:
+            self.waiting -= 1
+        
+        self.total_requests += 1
+    
+    async def _release(self, throttled: bool, counted: bool = True):
+        condition, _ = self._primitives()
+        
+        async with condition:
+            if self.in_flight > 0:
+                self.in_flight -= 1
+            
+            if counted and throttled:
+                self.throttles += 1
+                # Calls failing together count as one congestion signal
+                now = time.monotonic()
+                if now - self._last_decrease >= self.backoff:
+                    self.concurrency = max(float(self.min_concurrency), self.concurrency / 2)
+                    self._last_decrease = now
+            elif counted:
+                self._completed.append(time.monotonic())
+                self.concurrency = min(
+                    float(self.max_concurrency),
+                    self.concurrency + 1.0 / max(self.concurrency, 1.0),
+                )
+            
+            condition.notify_all()
+    
+    def current_rate(self) -> int:
+        """Successful calls completed in the last 60 seconds"""
+        cutoff = time.monotonic() - 60
+        while self._completed and self._completed[0] < cutoff:
+            self._completed.popleft()
+        return len(self._completed)
+    
+    def get_stats(self) -> dict:
+        """Counters for monitoring"""
+        return {
+            "name": self.name,
+            "requests_per_minute_limit": int(self.requests.capacity),
+            "tokens_per_minute_limit": int(self.tokens.capacity) if self.tokens else None,
+            "current_rate_per_minute": self.current_rate(),
+            "concurrency_limit": int(self.concurrency),
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "total_requests": self.total_requests,
+            "throttles": self.throttles,
+            "retries": self.retries,
+            "failures": self.failures,
+        }
+
+
+# One limiter per API key: classifier, digest generator and Gemini search share the quota
+gemini_limiter = AdaptiveRateLimiter(
+    "gemini",
+    rpm=settings.GEMINI_RPM,
+    tpm=settings.GEMINI_TPM,
+    max_concurrency=settings.GEMINI_MAX_CONCURRENCY,
+    max_retries=settings.GEMINI_MAX_RETRIES,
+    backoff=settings.GEMINI_RETRY_BACKOFF,
+)
+
+_provider_limiters: dict[str, AdaptiveRateLimiter] = {}
+
+
+def provider_limiter(name: str) -> AdaptiveRateLimiter:
+    """Shared limiter for a search provider, created on first use"""
+    key = name.lower()
+    if key not in _provider_limiters:
+        _provider_limiters[key] = AdaptiveRateLimiter(
+            key,
+            rpm=settings.SEARCH_PROVIDER_RPM,
+            max_concurrency=settings.SEARCH_PROVIDER_CONCURRENCY,
+            max_retries=settings.SEARCH_PROVIDER_MAX_RETRIES,
+            backoff=settings.GEMINI_RETRY_BACKOFF,
+        )
+    return _provider_limiters[key]
+
+
+def get_provider_limiter_stats() -> dict:
+    """Stats of every provider limiter used so far"""
+    return {name: limiter.get_stats() for name, limiter in _provider_limiters.items()}
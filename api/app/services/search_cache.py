@@ -0,0 +1,217 @@
+"""Normalized-query cache for paid search API results"""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+import structlog
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.config import settings
+from app.db.session import async_session_maker
+from app.models import SearchCacheEntry
+from app.services.keyword_matcher import split_words
+
+logger = structlog.get_logger()
+
+# Expired rows are purged from the table once per this many stores
+PURGE_EVERY = 100
+
+
+def normalize_query(query: Optional[str]) -> str:
+    """Lower-case, drop punctuation and collapse whitespace"""
+    return " ".join(split_words(query or ""))
+
+
+class SearchCache:
+    """
+    TTL cache for search results with single-flight fetching.
+    
+    An in-process LRU sits in front of the optional search_cache table,
+    so repeated searches (UI searches, predefined queries, competitor
+    scans) within SEARCH_CACHE_TTL reuse the earlier results instead of
+    calling a paid API again, also across restarts. Concurrent lookups of
+    the same key share one fetch. Failed fetches raise to every waiting
+    caller and, like empty results, are never cached.
+    
+    Cache failures are logged and treated as misses; they never fail a
+    search.
+    """
+    
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        ttl: Optional[int] = None,
+        persist: Optional[bool] = None,
+    ):
+        self.max_size = max_size or settings.SEARCH_CACHE_SIZE
+        self.ttl = ttl or settings.SEARCH_CACHE_TTL
+        self.persist = settings.SEARCH_CACHE_PERSIST if persist is None else persist
+        self._entries: OrderedDict[str, tuple[float, list]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._stores_since_purge = 0
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+    
+    @staticmethod
+    def make_key(provider: str, query: str, max_results: int) -> str:
+        raw = "\x1f".join([provider, str(max_results), normalize_query(query)])
+        return hashlib.sha256(raw.encode()).hexdigest()
+    
+    async def get_or_fetch(
+        self,
+        provider: str,
+        query: str,
+        max_results: int,
+        fetch: Callable[[], Awaitable[list[dict]]],
+    ) -> list[dict]:
+        """
+        Cached results for a search, calling `fetch` on a miss.
+        
+        Args:
+            provider: Provider (or provider mode) the results come from
+            query: Raw query; normalized for the key
+            max_results: Part of the key, as it changes the result set
+            fetch: Zero-argument coroutine factory returning JSON-serializable dicts
+        """
+        if not settings.SEARCH_CACHE_ENABLED:
+            return await fetch()
+        
+        key = self.make_key(provider, query, max_results)
+        
+        if key not in self._inflight:
+            cached = await self._get(key)
+            if cached is not None:
+                return cached
+        
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_and_store(key, provider, query, max_results, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        
+        # Shielded so a cancelled caller (e.g. a lost race) does not cancel the shared fetch
+        results = await asyncio.shield(task)
+        return [dict(item) for item in results]
+    
+    async def _get(self, key: str) -> Optional[list[dict]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, results = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return [dict(item) for item in results]
+            del self._entries[key]
+        
+        if self.persist:
+            try:
+                async with async_session_maker() as db:
+                    result = await db.execute(
+                        select(SearchCacheEntry.results, SearchCacheEntry.expires_at)
+                        .where(
+                            SearchCacheEntry.key == key,
+                            SearchCacheEntry.expires_at > datetime.utcnow(),
+                        )
+                    )
+                    row = result.first()
+                if row:
+                    remaining = (row.expires_at - datetime.utcnow()).total_seconds()
+                    self._remember(key, row.results, time.time() + remaining)
+                    self.db_hits += 1
+                    return [dict(item) for item in row.results]
+            except Exception as e:
+                self.errors += 1
+                logger.warning("Search cache lookup failed", error=str(e))
+        
+        self.misses += 1
+        return None
+    
+    async def _fetch_and_store(
+        self,
+        key: str,
+        provider: str,
+        query: str,
+        max_results: int,
+        fetch: Callable[[], Awaitable[list[dict]]],
+    ) -> list[dict]:
+        results = await fetch()
+        if not results:
+            return results
+        
+        self._remember(key, results, time.time() + self.ttl)
+        
+        if self.persist:
+            await self._persist(key, provider, query, max_results, results)
+        
+        return results
+    
+    async def _persist(self, key: str, provider: str, query: str, max_results: int, results: list[dict]):
+        now = datetime.utcnow()
+        values = {
+            "key": key,
+            "provider": provider,
+            "query": normalize_query(query),
+            "max_results": max_results,
+            "results": results,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=self.ttl),
+        }
+        
+        try:
+            async with async_session_maker() as db:
+                statement = pg_insert(SearchCacheEntry).values(**values)
+                await db.execute(
+                    statement.on_conflict_do_update(
+                        index_elements=[SearchCacheEntry.key],
+                        set_={
+                            "results": statement.excluded.results,
+                            "created_at": statement.excluded.created_at,
+                            "expires_at": statement.excluded.expires_at,
+                        },
+                    )
+                )
+                
+                self._stores_since_purge += 1
+                if self._stores_since_purge >= PURGE_EVERY:
+                    await db.execute(delete(SearchCacheEntry).where(SearchCacheEntry.expires_at <= now))
+                    self._stores_since_purge = 0
+                
+                await db.commit()
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Search cache store failed", error=str(e))
+    
+    def _remember(self, key: str, results: list, expires_at: float):
+        self._entries[key] = (expires_at, [dict(item) for item in results])
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def get_stats(self) -> dict:
+        """Hit/miss counters for monitoring"""
+        lookups = self.memory_hits + self.db_hits + self.misses
+        return {
+            "enabled": settings.SEARCH_CACHE_ENABLED,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "persist": self.persist,
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "hit_rate": round((self.memory_hits + self.db_hits) / lookups, 3) if lookups else None,
+        }
+
+
+# Shared by MultiSearchProvider and NewsScraperService
+search_cache = SearchCache()
@@ -5,16 +5,20 @@ from decimal import Decimal
 from typing import Optional
 import structlog
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
+from app.config import settings
 from app.models import (
     Competitor, DriverTariff, RiderTariff, Promo, Release, Review, CollectionLog
 )
 from app.models.collection_log import SourceType, CollectionStatus
-from app.models.release import Platform, Significance
+from app.models.release import Platform, Significance, ClassificationStatus
 from app.models.promo import DiscountType, TargetAudience
 from app.models.review import UserRole, Sentiment
 from app.services.classifier import ClassifierService
+from app.services.count_cache import count_cache
+from app.services.review_rollup import ReviewRollupDeltas
 
 logger = structlog.get_logger()
 
@@ -33,6 +37,7 @@ class WebhookProcessor:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.classifier = ClassifierService()
+        self.rollup = ReviewRollupDeltas()
     
     async def process(self, payload) -> dict:
         """Process webhook payload and store data"""
@@ -74,14 +79,20 @@ class WebhookProcessor:
             
         except Exception as e:
             logger.error("Processing failed", task_name=task_name, error=str(e))
+            # Nothing of a failed payload is kept, so a retry does not insert its rows twice
+            await self.db.rollback()
+            self.rollup = ReviewRollupDeltas()
             log.status = CollectionStatus.FAILED
             log.error_message = str(e)
             log.completed_at = datetime.utcnow()
         
         self.db.add(log)
+        # Rollup counts commit together with the reviews they count
+        await self.rollup.apply(self.db)
         await self.db.commit()
+        count_cache.invalidate(CollectionLog.__tablename__, Release.__tablename__, Review.__tablename__)
         
-        return {"processed": log.items_collected, "status": log.status.value}
+        return {"processed": log.items_collected, "status": log.status.value, "error": log.error_message}
     
     def _detect_source_type(self, task_name: str) -> SourceType:
         """Detect source type from task name"""
@@ -187,6 +198,7 @@ class WebhookProcessor:
         
         platform = Platform.IOS if "appstore" in task_name else Platform.ANDROID
         processed = 0
+        pending_reviews = []
         
         for item in data_list:
             # Process release info if present
@@ -197,9 +209,15 @@ class WebhookProcessor:
             # Process reviews if present
             reviews = item.get("reviews", [])
             if isinstance(reviews, list):
-                for review_data in reviews:
-                    await self._process_review(competitor, platform, review_data)
-                    processed += 1
+                if settings.WEBHOOK_BULK_INSERT:
+                    pending_reviews.extend(reviews)
+                else:
+                    for review_data in reviews:
+                        await self._process_review(competitor, platform, review_data)
+                processed += len(reviews)
+        
+        if pending_reviews:
+            await self._process_reviews_bulk(competitor, platform, pending_reviews)
         
         return processed
     
@@ -220,10 +238,7 @@ class WebhookProcessor:
         if existing.scalar_one_or_none():
             return  # Already have this version
         
-        # Classify release notes
         release_notes = data.get("release_notes", "")
-        classification = await self.classifier.classify_release(release_notes)
-        
         release = Release(
             competitor_id=competitor.id,
             platform=platform,
@@ -232,9 +247,16 @@ class WebhookProcessor:
             release_notes=release_notes,
             rating=self._parse_decimal(data.get("rating")),
             rating_count=self._parse_int(data.get("rating_count")),
-            significance=Significance(classification.get("significance", "minor")),
-            summary_ru=classification.get("summary_ru"),
         )
+        
+        if settings.DEFERRED_CLASSIFICATION:
+            # Classified later by the background worker
+            release.classification_status = ClassificationStatus.PENDING
+        else:
+            classification = await self.classifier.classify_release(release_notes)
+            release.significance = Significance(classification.get("significance", "minor"))
+            release.summary_ru = classification.get("summary_ru")
+        
         self.db.add(release)
     
     async def _process_review(self, competitor: Competitor, platform: Platform, data: dict):
@@ -253,11 +275,8 @@ class WebhookProcessor:
         if existing.scalar_one_or_none():
             return  # Already have this review
         
-        # Classify review
         text = data.get("text", "")
         rating = self._parse_int(data.get("rating")) or 3
-        classification = await self.classifier.classify_review(text, rating)
-        
         review = Review(
             external_id=external_id,
             competitor_id=competitor.id,
@@ -267,11 +286,121 @@ class WebhookProcessor:
             text=text,
             review_date=self._parse_date(data.get("date")),
             app_version=data.get("app_version"),
-            role=UserRole(classification.get("role", "unknown")),
-            sentiment=Sentiment(classification.get("sentiment", "neutral")),
-            key_topics=str(classification.get("key_topics", [])),
+            role=UserRole.UNKNOWN,
+            collected_at=datetime.utcnow(),
         )
+        
+        if settings.DEFERRED_CLASSIFICATION:
+            # Classified later by the background worker
+            review.classification_status = ClassificationStatus.PENDING
+        else:
+            classification = await self.classifier.classify_review(text, rating)
+            review.role = UserRole(classification.get("role", "unknown"))
+            review.sentiment = Sentiment(classification.get("sentiment", "neutral"))
+            review.key_topics = str(classification.get("key_topics", []))
+        
         self.db.add(review)
+        self.rollup.add(
+            review.competitor_id, platform, review.collected_at, review.role, review.sentiment, rating
+        )
+    
+    async def _process_reviews_bulk(self, competitor: Competitor, platform: Platform, reviews: list) -> int:
+        """
+        Insert a payload's reviews with chunked INSERT ... ON CONFLICT DO NOTHING.
+        
+        Only rows that were actually inserted are classified, so re-delivered
+        payloads cost one statement per chunk instead of one SELECT per review.
+        
+        Returns:
+            Number of newly inserted reviews
+        """
+        rows = {}
+        for data in reviews:
+            if not isinstance(data, dict):
+                continue
+            external_id = data.get("review_id") or data.get("id")
+            if not external_id:
+                continue
+            
+            # Make external_id unique per platform; first occurrence wins
+            external_id = f"{platform.value}_{external_id}"
+            if external_id in rows:
+                continue
+            
+            rows[external_id] = {
+                "external_id": external_id,
+                "competitor_id": competitor.id,
+                "platform": platform,
+                "author": data.get("author"),
+                "rating": self._parse_int(data.get("rating")) or 3,
+                "text": data.get("text", ""),
+                "review_date": self._parse_date(data.get("date")),
+                "app_version": data.get("app_version"),
+                "classification_status": (
+                    ClassificationStatus.PENDING if settings.DEFERRED_CLASSIFICATION
+                    else ClassificationStatus.DONE
+                ),
+            }
+        
+        if not rows:
+            return 0
+        
+        inserted = {}
+        stored = {}
+        values = list(rows.values())
+        chunk_size = settings.WEBHOOK_INSERT_CHUNK_SIZE
+        for start in range(0, len(values), chunk_size):
+            result = await self.db.execute(
+                pg_insert(Review)
+                .values(values[start:start + chunk_size])
+                .on_conflict_do_nothing(index_elements=[Review.external_id])
+                .returning(Review.id, Review.external_id, Review.collected_at, Review.role, Review.sentiment)
+            )
+            for row in result.all():
+                inserted[row.external_id] = row.id
+                stored[row.id] = row
+                self.rollup.add(
+                    competitor.id, platform, row.collected_at, row.role, row.sentiment, rows[row.external_id]["rating"]
+                )
+        
+        logger.info(
+            "Reviews bulk inserted",
+            received=len(rows),
+            inserted=len(inserted),
+            skipped=len(rows) - len(inserted),
+        )
+        
+        if not inserted or settings.DEFERRED_CLASSIFICATION:
+            return len(inserted)
+        
+        # Classify only the new rows, then write the results back by primary key
+        classifications = await self.classifier.batch_classify_reviews([
+            {
+                "external_id": external_id,
+                "text": rows[external_id]["text"],
+                "rating": rows[external_id]["rating"],
+            }
+            for external_id in inserted
+        ])
+        
+        updates = []
+        for classification in classifications:
+            updates.append({
+                "id": inserted[classification["external_id"]],
+                "role": UserRole(classification.get("role", "unknown")),
+                "sentiment": Sentiment(classification.get("sentiment", "neutral")),
+                "key_topics": str(classification.get("key_topics", [])),
+            })
+        
+        await self.db.execute(update(Review), updates)
+        for values in updates:
+            row = stored[values["id"]]
+            self.rollup.move(
+                competitor.id, platform, row.collected_at, rows[row.external_id]["rating"],
+                old=(row.role, row.sentiment),
+                new=(values["role"], values["sentiment"]),
+            )
+        return len(inserted)
     
     def _parse_decimal(self, value) -> Optional[Decimal]:
         """Parse a value to Decimal, extracting numbers from strings"""
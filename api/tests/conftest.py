@@ -0,0 +1,26 @@
+"""Shared fixtures"""
+import pytest
+
+
+class Clock:
+    """Stand-in for the time module: monotonic() returns `now`, which tests advance"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clocked_module():
+    """Module whose `time` the clock fixture replaces; test modules override this"""
+    pytest.fail("override the clocked_module fixture to use clock")
+
+
+@pytest.fixture
+def clock(clocked_module, monkeypatch) -> Clock:
+    # Only the module under test sees the fake clock: the event loop keeps real time
+    clock = Clock()
+    monkeypatch.setattr(clocked_module, "time", clock)
+    return clock
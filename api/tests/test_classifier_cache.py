@@ -0,0 +1,58 @@
+"""Cached results in the batched review classification path"""
+import asyncio
+
+from app.services import classifier as classifier_module
+from app.services.classification_cache import ClassificationCache
+from app.services.classifier import REVIEW_PROMPT_VERSION, ClassifierService
+
+VALID = {"role": "driver", "categories": ["pricing"], "sentiment": "negative", "key_topics": ["fees"]}
+FRESH = {"role": "rider", "categories": ["other"], "sentiment": "neutral", "key_topics": []}
+
+
+class FakeCache:
+    """Serves canned entries and keeps what is stored"""
+    
+    make_key = staticmethod(ClassificationCache.make_key)
+    
+    def __init__(self, entries: dict):
+        self.entries = entries
+        self.stored = []
+    
+    async def get_many(self, keys):
+        return {key: self.entries[key] for key in keys if key in self.entries}
+    
+    async def set_many(self, items, kind, prompt_version, model):
+        self.stored.extend(items)
+
+
+async def test_invalid_cached_entries_are_classified_again(monkeypatch):
+    reviews = [
+        {"external_id": "valid", "text": "Subió la comisión", "rating": 1},
+        {"external_id": "stale", "text": "Buen viaje", "rating": 3},
+    ]
+    service = ClassifierService()
+    keys = [
+        ClassificationCache.make_key(
+            "review", REVIEW_PROMPT_VERSION, classifier_module.settings.GEMINI_MODEL,
+            review["text"], review["rating"],
+        )
+        for review in reviews
+    ]
+    # Cached before validation existed: an unknown sentiment label
+    cache = FakeCache({keys[0]: VALID, keys[1]: {**FRESH, "sentiment": "mixed"}})
+    monkeypatch.setattr(classifier_module, "classification_cache", cache)
+    
+    prompted = []
+    
+    async def classify_batch(reviews, batch, semaphore):
+        prompted.extend(item_id for _, item_id in batch)
+        return {item_id: FRESH for _, item_id in batch}
+    
+    monkeypatch.setattr(service, "_classify_review_batch", classify_batch)
+    results = [None, None]
+    
+    await service._classify_reviews_batched(reviews, results, asyncio.Semaphore(1))
+    
+    assert results == [VALID, FRESH]
+    assert prompted == ["stale"]
+    assert cache.stored == [(keys[1], FRESH)]
@@ -0,0 +1,25 @@
+"""Planner estimates of the list totals"""
+from datetime import datetime
+
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from app.models import NewsItem
+from app.services.count_cache import ExplainJson
+
+SEARCH = "%uber'; DROP TABLE news_items; --%"
+
+
+def test_explain_keeps_filter_values_as_parameters():
+    count_query = select(func.count(NewsItem.id)).where(
+        NewsItem.title.ilike(SEARCH),
+        NewsItem.collected_at >= datetime(2025, 3, 1),
+    )
+    rows = count_query.with_only_columns(literal_column("1"), maintain_column_froms=True)
+    
+    compiled = ExplainJson(rows).compile(dialect=asyncpg.dialect())
+    
+    assert str(compiled).startswith("EXPLAIN (FORMAT JSON) SELECT 1")
+    assert "DROP TABLE" not in str(compiled)
+    assert "$1" in str(compiled) and "$2" in str(compiled)
+    assert list(compiled.params.values()) == [SEARCH, datetime(2025, 3, 1)]
@@ -0,0 +1,51 @@
+"""Single-pass keyword matcher of the rule-based detectors"""
+from app.services.keyword_matcher import KeywordMatcher
+
+TABLE = {
+    "product": ["nueva", "nueva función"],
+    "topic": ["función", "promo", "promoción", "app"],
+    "regulation": ["ley", "99", "MTC"],
+    "rider": ["me cobr"],
+}
+
+
+def test_finds_overlapping_and_prefix_keywords_in_one_scan():
+    found = KeywordMatcher(TABLE).find("La Nueva Función: promoción en la app")
+    
+    assert found == {
+        "product": {"nueva", "nueva función"},
+        "topic": {"función", "promo", "promoción", "app"},
+    }
+
+
+def test_keywords_match_at_word_starts_only():
+    matcher = KeywordMatcher(TABLE)
+    
+    assert matcher.labels("Me cobraron de más") == {"rider"}
+    assert matcher.labels("Leyes aprobadas, 99 minutos") == {"regulation"}
+    # Inside other words: rappi, oakley, 1999
+    assert matcher.labels("Rappi y Oakley en 1999") == set()
+
+
+def test_substring_mode_keeps_the_old_semantics():
+    matcher = KeywordMatcher(TABLE, word_start=False)
+    text = "Rappi y Oakley en 1999"
+    
+    assert matcher.find(text) == {"topic": {"app"}, "regulation": {"ley", "99"}}
+    for label, keywords in TABLE.items():
+        assert (label in matcher.labels(text)) == any(kw in text.lower() for kw in keywords)
+
+
+def test_keyword_shared_by_labels_is_reported_for_each():
+    matcher = KeywordMatcher({("topic", "pricing"): ["comisión"], ("category", "terms"): ["comisión"]})
+    
+    assert matcher.labels("Subieron la comisión") == {("topic", "pricing"), ("category", "terms")}
+
+
+def test_upper_case_keywords_and_empty_input():
+    matcher = KeywordMatcher(TABLE)
+    
+    assert matcher.find("Multa del MTC") == {}
+    assert matcher.find("") == {}
+    assert matcher.find(None) == {}
+    assert KeywordMatcher({}).find("nueva") == {}
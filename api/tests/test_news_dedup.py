@@ -0,0 +1,82 @@
+"""URL canonicalization and MinHash story clustering helpers"""
+import pytest
+
+from app.services.news_dedup import (
+    MINHASH_BANDS,
+    MINHASH_PERMUTATIONS,
+    canonicalize_url,
+    hash_url,
+    minhash,
+    minhash_bands,
+    similarity,
+)
+
+STORY = "Uber lanza nuevas tarifas para conductores en Lima este lunes"
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.example.pe/noticias/uber-tarifas/",
+    "http://m.example.pe/noticias/uber-tarifas?utm_source=x&fbclid=abc",
+    "https://amp.example.pe/noticias/uber-tarifas/amp",
+    "https://EXAMPLE.pe:443/noticias/uber-tarifas#comentarios",
+])
+def test_variants_share_canonical_url(url):
+    assert canonicalize_url(url) == "https://example.pe/noticias/uber-tarifas"
+    assert hash_url(url) == hash_url("https://example.pe/noticias/uber-tarifas")
+
+
+def test_canonical_url_keeps_content_parameters_sorted():
+    assert canonicalize_url("https://example.pe/buscar?q=uber&page=2&utm_medium=social") == (
+        "https://example.pe/buscar?page=2&q=uber"
+    )
+
+
+def test_canonical_url_edge_cases():
+    assert canonicalize_url(None) is None
+    assert canonicalize_url("  ") is None
+    assert canonicalize_url("/relative/path/") == "/relative/path"
+    # Only a subdomain prefix is dropped, not the registered domain
+    assert canonicalize_url("https://m.pe/a") == "https://m.pe/a"
+    assert canonicalize_url("https://example.pe/story.amp.html") == "https://example.pe/story.html"
+    assert canonicalize_url("https://example.pe:8080/a") == "https://example.pe:8080/a"
+
+
+def test_minhash_signature_shape_and_stability():
+    signature = minhash(STORY)
+    
+    assert len(signature) == MINHASH_PERMUTATIONS
+    assert all(-(1 << 31) <= value < 1 << 31 for value in signature)
+    # Stored signatures must stay comparable across processes and releases
+    assert minhash(STORY) == signature
+    assert len(minhash_bands(signature)) == MINHASH_BANDS
+
+
+def test_minhash_ignores_case_accents_and_order():
+    assert minhash(STORY.upper()) == minhash(STORY)
+    assert minhash("Perú: " + STORY) == minhash("Peru: " + STORY)
+    assert minhash(" ".join(reversed(STORY.split()))) == minhash(STORY)
+
+
+def test_minhash_skips_short_texts():
+    assert minhash(None) is None
+    assert minhash("") is None
+    # Words of up to two letters do not count
+    assert minhash("Uber en la de Lima y el taxi") is None
+
+
+def test_similarity_estimates_word_overlap():
+    same_story = minhash(STORY + " según la empresa")
+    unrelated = minhash("Banco central mantiene la tasa de referencia por tercer mes consecutivo")
+    
+    assert similarity(minhash(STORY), minhash(STORY)) == 1.0
+    assert similarity(minhash(STORY), same_story) > 0.5
+    assert similarity(minhash(STORY), unrelated) < 0.3
+
+
+def test_similar_texts_share_a_band():
+    bands = set(minhash_bands(minhash(STORY)))
+    
+    assert bands & set(minhash_bands(minhash(STORY + " según la empresa")))
+    assert not bands & set(minhash_bands(minhash(
+        "Banco central mantiene la tasa de referencia por tercer mes consecutivo"
+    )))
@@ -0,0 +1,55 @@
+"""Greedy set cover behind the optimized news query plan"""
+import random
+
+from app.services.news_query_optimizer import greedy_cover
+
+
+def test_takes_largest_marginal_gain_first():
+    coverage = {
+        "a": {"1", "2", "3", "4"},
+        "b": {"1", "2", "3"},
+        "c": {"5", "6"},
+        "d": {"4", "5"},
+    }
+    
+    assert greedy_cover(coverage, 1.0) == [("a", 4), ("c", 2)]
+
+
+def test_stops_at_target():
+    coverage = {"a": {str(i) for i in range(8)}, "b": {"8"}, "c": {"9"}}
+    
+    assert greedy_cover(coverage, 0.8) == [("a", 8)]
+    assert greedy_cover(coverage, 0.9) == [("a", 8), ("b", 1)]
+
+
+def test_skips_queries_without_results():
+    assert greedy_cover({"a": set(), "b": {"1"}}, 1.0) == [("b", 1)]
+    assert greedy_cover({"a": set()}, 1.0) == []
+    assert greedy_cover({}, 1.0) == []
+
+
+def test_ties_broken_by_key():
+    assert greedy_cover({"b": {"1"}, "a": {"2"}}, 0.5) == [("a", 1)]
+
+
+def test_every_pick_is_the_best_marginal_gain():
+    rng = random.Random(7)
+    for _ in range(200):
+        urls = [str(i) for i in range(rng.randint(1, 40))]
+        coverage = {
+            f"q{k}": set(rng.sample(urls, rng.randint(0, len(urls))))
+            for k in range(rng.randint(1, 12))
+        }
+        universe = set().union(*coverage.values())
+        target = rng.choice([0.5, 0.9, 0.95, 1.0])
+        
+        covered: set[str] = set()
+        for key, gain in greedy_cover(coverage, target):
+            # Lazily rechecked gains still pick what a full rescan would
+            assert len(covered) < target * len(universe)
+            assert gain == len(coverage[key] - covered)
+            assert gain == max(len(urls - covered) for urls in coverage.values())
+            assert gain > 0
+            covered |= coverage[key]
+        
+        assert len(covered) >= target * len(universe)
@@ -0,0 +1,117 @@
+"""Keyset cursors of the list endpoints"""
+import uuid
+from datetime import date, datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.api.pagination import decode_cursor, encode_cursor, fetch_page, nulls_last_date
+from app.models import Review
+
+ROW_ID = uuid.UUID("7d9f1c1e-8f4e-4b8e-9a53-0c4f1f3c2a10")
+
+
+@pytest.mark.parametrize("values", [
+    [date(2025, 1, 31), ROW_ID],
+    [datetime(2025, 1, 31, 23, 59, 59, 123456), ROW_ID],
+    [date.min, ROW_ID],  # NULL review dates sort as -infinity
+    [None, 42, "text"],
+])
+def test_cursor_round_trip(values):
+    cursor = encode_cursor(values)
+    
+    assert decode_cursor(cursor, len(values)) == values
+    # URL-safe without padding, so it needs no quoting in a query string
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    encode_cursor([ROW_ID])[:-3],
+    "e30",  # {}
+    "NQ",  # 5
+    encode_cursor([{"u": "not-a-uuid"}, 1]),
+    encode_cursor([{"d": "2025-13-01"}, ROW_ID]),
+])
+def test_malformed_cursor_is_a_bad_request(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, 2)
+    
+    assert error.value.status_code == 400
+
+
+def test_cursor_of_another_sort_order_is_rejected():
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(encode_cursor([date(2025, 1, 31), ROW_ID]), 3)
+    
+    assert error.value.status_code == 400
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+    
+    def unique(self):
+        return self
+    
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Returns canned rows and keeps the statement executed"""
+    
+    def __init__(self, rows):
+        self.rows = rows
+        self.statement = None
+    
+    async def execute(self, statement):
+        self.statement = statement
+        return FakeResult(self.rows)
+
+
+def compiled(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect())).replace("\n", " ")
+
+
+ORDER = [nulls_last_date(Review.review_date), Review.id]
+
+
+async def test_next_cursor_continues_after_the_last_row():
+    rows = [
+        ("review-1", date(2025, 1, 3), uuid.uuid4()),
+        ("review-2", date(2025, 1, 2), ROW_ID),
+        ("review-3", date(2025, 1, 1), uuid.uuid4()),  # one extra row: there is a next page
+    ]
+    db = FakeSession(rows)
+    
+    items, next_cursor = await fetch_page(db, select(Review), ORDER, limit=2)
+    
+    assert items == ["review-1", "review-2"]
+    assert decode_cursor(next_cursor, 2) == [date(2025, 1, 2), ROW_ID]
+    sql = compiled(db.statement)
+    assert "ORDER BY coalesce(reviews.review_date, '-infinity'::date) DESC, reviews.id DESC" in sql
+    assert "LIMIT" in sql and "OFFSET" not in sql
+
+
+async def test_cursor_becomes_a_row_comparison():
+    db = FakeSession([("review-4", date(2025, 1, 1), uuid.uuid4())])
+    cursor = encode_cursor([date(2025, 1, 2), ROW_ID])
+    
+    items, next_cursor = await fetch_page(db, select(Review), ORDER, limit=2, cursor=cursor, offset=40)
+    
+    assert items == ["review-4"]
+    assert next_cursor is None
+    sql = compiled(db.statement)
+    assert "(coalesce(reviews.review_date, '-infinity'::date), reviews.id) < (" in sql
+    assert "OFFSET" not in sql
+    assert list(db.statement.compile(dialect=postgresql.dialect()).params.values())[:2] == [date(2025, 1, 2), ROW_ID]
+
+
+async def test_last_page_has_no_cursor():
+    db = FakeSession([])
+    
+    assert await fetch_page(db, select(Review), ORDER, limit=20, offset=40) == ([], None)
+    assert "OFFSET" in compiled(db.statement)
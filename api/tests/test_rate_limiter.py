@@ -0,0 +1,184 @@
+"""Token buckets and AIMD concurrency of the shared API rate limiter"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import rate_limiter
+from app.services.rate_limiter import AdaptiveRateLimiter, TokenBucket, is_throttle_error
+
+
+@pytest.fixture
+def clocked_module():
+    return rate_limiter
+
+
+class ThrottledError(Exception):
+    code = 429
+
+
+def test_bucket_starts_full_and_refills_at_rate(clock):
+    bucket = TokenBucket(60)  # one token per second
+    
+    assert bucket.wait_time(60) == 0.0
+    bucket.consume(60)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    
+    clock.now += 0.5
+    assert bucket.wait_time(1) == pytest.approx(0.5)
+    clock.now += 0.5
+    assert bucket.wait_time(1) == 0.0
+
+
+def test_bucket_refill_is_capped_at_capacity(clock):
+    bucket = TokenBucket(60)
+    bucket.consume(10)
+    
+    clock.now += 3600
+    bucket.consume(0)
+    assert bucket.tokens == 60
+
+
+def test_bucket_clamps_requests_above_capacity(clock):
+    # A call larger than a minute's budget waits for a full bucket instead of forever
+    bucket = TokenBucket(100)
+    
+    assert bucket.wait_time(1000) == 0.0
+    bucket.consume(1000)
+    assert bucket.tokens == 0
+    assert bucket.wait_time(1000) == pytest.approx(60.0)
+
+
+@pytest.mark.parametrize("error, throttled", [
+    (ThrottledError(), True),
+    (SimpleNamespace(code=503), True),
+    (SimpleNamespace(response=SimpleNamespace(status_code=502)), True),
+    (type("ResourceExhausted", (Exception,), {})(), True),
+    (SimpleNamespace(code=400), False),
+    (SimpleNamespace(code="not-a-status"), False),
+    (ValueError("bad request"), False),
+])
+def test_is_throttle_error(error, throttled):
+    assert is_throttle_error(error) is throttled
+
+
+async def test_in_flight_calls_stay_within_the_window(clock):
+    limiter = AdaptiveRateLimiter("test", rpm=6000, max_concurrency=3)
+    peak = 0
+    
+    async def work():
+        nonlocal peak
+        peak = max(peak, limiter.in_flight)
+        await asyncio.sleep(0.01)
+        return limiter.in_flight
+    
+    results = await asyncio.gather(*(limiter.call(work) for _ in range(10)))
+    
+    assert peak == 3
+    assert max(results) <= 3
+    assert limiter.in_flight == 0
+    assert limiter.total_requests == 10
+    assert limiter.requests.tokens == 5990
+
+
+async def test_throttle_halves_window_and_retries(clock):
+    limiter = AdaptiveRateLimiter("test", rpm=6000, max_concurrency=8, backoff=0)
+    attempts = 0
+    
+    async def flaky():
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise ThrottledError()
+        return "ok"
+    
+    assert await limiter.call(flaky) == "ok"
+    
+    assert attempts == 2
+    assert limiter.throttles == 1
+    assert limiter.retries == 1
+    # Halved to 4, then additive increase of 1/window for the success
+    assert limiter.concurrency == pytest.approx(4.25)
+
+
+async def test_window_grows_back_to_max_and_not_below_min(clock):
+    limiter = AdaptiveRateLimiter("test", rpm=6000, max_concurrency=4, min_concurrency=2, backoff=1.0)
+    
+    for _ in range(3):
+        clock.now += 1
+        await limiter._release(throttled=True)
+    assert limiter.concurrency == 2
+    
+    for _ in range(20):
+        await limiter._release(throttled=False)
+    assert limiter.concurrency == 4
+
+
+async def test_simultaneous_throttles_count_as_one_signal(clock):
+    limiter = AdaptiveRateLimiter("test", rpm=6000, max_concurrency=8, backoff=1.0)
+    
+    for _ in range(3):
+        await limiter._release(throttled=True)
+    
+    assert limiter.throttles == 3
+    assert limiter.concurrency == 4
+
+
+async def test_other_errors_are_not_retried():
+    limiter = AdaptiveRateLimiter("test", rpm=6000, backoff=0)
+    attempts = 0
+    
+    async def broken():
+        nonlocal attempts
+        attempts += 1
+        raise ValueError("bad request")
+    
+    with pytest.raises(ValueError):
+        await limiter.call(broken)
+    
+    assert attempts == 1
+    assert limiter.failures == 1
+    assert limiter.concurrency == limiter.max_concurrency
+    assert limiter.in_flight == 0
+
+
+async def test_retries_are_bounded():
+    limiter = AdaptiveRateLimiter("test", rpm=6000, max_retries=2, backoff=0)
+    attempts = 0
+    
+    async def throttled():
+        nonlocal attempts
+        attempts += 1
+        raise ThrottledError()
+    
+    with pytest.raises(ThrottledError):
+        await limiter.call(throttled)
+    
+    assert attempts == 3
+    assert limiter.failures == 1
+
+
+async def test_cancelled_call_frees_its_slot():
+    limiter = AdaptiveRateLimiter("test", rpm=6000, max_concurrency=1)
+    task = asyncio.create_task(limiter.call(lambda: asyncio.sleep(60)))
+    await asyncio.sleep(0.01)
+    assert limiter.in_flight == 1
+    
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    
+    assert limiter.in_flight == 0
+    assert await limiter.call(lambda: asyncio.sleep(0, result="next")) == "next"
+
+
+async def test_token_budget_is_charged(clock):
+    limiter = AdaptiveRateLimiter("test", rpm=6000, tpm=1000)
+    
+    async def work():
+        return None
+    
+    await limiter.call(work, tokens=300)
+    
+    assert limiter.tokens.tokens == 700
+    assert limiter.tokens.wait_time(800) == pytest.approx(6.0)
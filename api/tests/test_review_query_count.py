@@ -0,0 +1,152 @@
+"""
+Statements issued by /reviews/stats and /reviews/trends
+
+Both endpoints read the review rollup plus the partial days from reviews
+in one grouped query. The recording-session tests run everywhere and
+count the queries the endpoints send. The database tests also count the
+SQL statements on PostgreSQL: they need a disposable database in
+TEST_DATABASE_URL (postgresql+asyncpg://...), whose tables are created
+from the models and dropped afterwards.
+"""
+import os
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api.routes.reviews import get_review_stats, get_review_trends
+from app.db.base import Base
+from app.models import Competitor, Review
+from app.models.release import Platform
+from app.models.review import Sentiment, UserRole
+from app.services.review_rollup import rebuild_review_rollup
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+needs_database = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+
+class RecordingSession:
+    """
+    Session double that answers every query with the same rows and keeps
+    the statements, so a query per row (N+1) shows up without a database
+    """
+    
+    def __init__(self, rows: list):
+        self.rows = rows
+        self.statements = []
+    
+    async def execute(self, statement, *args, **kwargs):
+        self.statements.append(statement)
+        return Result(self.rows)
+    
+    async def scalar(self, statement, *args, **kwargs):
+        self.statements.append(statement)
+        return None
+
+
+class Result(list):
+    def all(self):
+        return list(self)
+
+
+async def test_review_stats_sends_one_query():
+    rows = [
+        SimpleNamespace(name=name, id=uuid.uuid4(), total=10, rating_sum=30, positive=4, neutral=3, negative=3)
+        for name in ("Uber", "DiDi", "inDrive")
+    ]
+    db = RecordingSession(rows)
+    
+    stats = await get_review_stats(competitor_id=None, days=30, db=db, user={})
+    
+    assert len(db.statements) == 1
+    assert stats["total"] == 30
+    assert len(stats["by_competitor"]) == 3
+
+
+async def test_review_trends_sends_one_query():
+    rows = [
+        SimpleNamespace(name=name, current_negative=6, prev_negative=4)
+        for name in ("Uber", "DiDi", "inDrive")
+    ]
+    db = RecordingSession(rows)
+    
+    trends = await get_review_trends(days=7, db=db, user={})
+    
+    assert len(db.statements) == 1
+    assert [trend["sentiment_change"] for trend in trends["trends"]] == [50.0, 50.0, 50.0]
+
+
+@pytest.fixture
+async def engine():
+    engine = create_async_engine(TEST_DATABASE_URL)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+@pytest.fixture
+async def db(engine):
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        competitor = Competitor(name="Uber", slug="uber", is_active=True)
+        session.add(competitor)
+        await session.flush()
+        
+        now = datetime.utcnow()
+        # Today and ten days ago are partial days of the ranges, three days ago a whole rollup day
+        for i, (age, sentiment) in enumerate([
+            (timedelta(hours=1), Sentiment.NEGATIVE),
+            (timedelta(days=3), Sentiment.NEGATIVE),
+            (timedelta(days=3), Sentiment.POSITIVE),
+            (timedelta(days=10), Sentiment.NEGATIVE),
+        ]):
+            session.add(Review(
+                external_id=f"review-{i}",
+                competitor_id=competitor.id,
+                platform=Platform.ANDROID,
+                rating=1 if sentiment == Sentiment.NEGATIVE else 5,
+                role=UserRole.RIDER,
+                sentiment=sentiment,
+                collected_at=now - age,
+            ))
+        await session.commit()
+        await rebuild_review_rollup(session)
+        yield session
+
+
+@pytest.fixture
+def statements(engine):
+    """SQL statements sent to the database while the test runs"""
+    sent = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        sent.append(statement)
+    
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield sent
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+@needs_database
+async def test_review_stats_is_one_query(db, statements):
+    stats = await get_review_stats(competitor_id=None, days=30, db=db, user={})
+    
+    assert len(statements) == 1
+    assert stats["total"] == 4
+    assert stats["by_sentiment"] == {"positive": 1, "neutral": 0, "negative": 3}
+    assert stats["by_competitor"][0]["avg_rating"] == 2.0
+
+
+@needs_database
+async def test_review_trends_is_one_query(db, statements):
+    trends = await get_review_trends(days=7, db=db, user={})
+    
+    assert len(statements) == 1
+    # Two negative reviews this week against one the week before
+    assert trends["trends"] == [{"competitor": "Uber", "sentiment_change": 100.0, "top_categories": []}]
@@ -0,0 +1,124 @@
+"""
+Review counts from the daily rollup plus the partial days of a range
+
+review_counts() is checked against counting the reviews directly, on an
+in-memory SQLite database: the statement only uses portable SQL.
+"""
+import random
+import uuid
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
+
+from app.models import Review, ReviewDailyRollup
+from app.models.release import Platform
+from app.models.review import Sentiment, UserRole
+from app.services.review_rollup import ReviewRollupDeltas, review_counts
+
+START = datetime(2025, 3, 1)
+
+
+@pytest.fixture(scope="module")
+def db():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        # Tables only: the models' indexes are PostgreSQL expressions
+        for model in (Review, ReviewDailyRollup):
+            conn.execute(CreateTable(model.__table__))
+    
+    rng = random.Random(11)
+    competitors = [uuid.uuid4(), uuid.uuid4()]
+    reviews = [
+        Review(
+            id=uuid.uuid4(),
+            external_id=f"review-{i}",
+            competitor_id=rng.choice(competitors),
+            platform=rng.choice(list(Platform)),
+            rating=rng.randint(1, 5),
+            role=rng.choice(list(UserRole)),
+            sentiment=rng.choice([*Sentiment, None]),
+            collected_at=START + timedelta(seconds=rng.randrange(6 * 86400)),
+        )
+        for i in range(600)
+    ]
+    # Midnight exactly belongs to the day it starts
+    reviews[0].collected_at = START + timedelta(days=2)
+    
+    deltas = ReviewRollupDeltas()
+    for review in reviews:
+        deltas.add(review.competitor_id, review.platform, review.collected_at, review.role, review.sentiment, review.rating)
+    rollup = [
+        ReviewDailyRollup(
+            id=i,
+            competitor_id=competitor_id,
+            platform=platform,
+            day=day,
+            role=role,
+            sentiment=sentiment,
+            reviews=count,
+            rating_sum=rating_sum,
+        )
+        for i, ((competitor_id, platform, day, role, sentiment), (count, rating_sum))
+        in enumerate(deltas._deltas.items(), 1)
+    ]
+    
+    with Session(engine) as session:
+        session.add_all(reviews + rollup)
+        session.commit()
+        yield session
+
+
+def counted(db: Session, start: datetime, end=None) -> Counter:
+    counts = review_counts(start, end)
+    rows = db.execute(
+        select(counts.c.sentiment, func.sum(counts.c.reviews), func.sum(counts.c.rating_sum))
+        .group_by(counts.c.sentiment)
+    )
+    return Counter({sentiment: (int(reviews), int(rating_sum)) for sentiment, reviews, rating_sum in rows})
+
+
+def scanned(db: Session, start: datetime, end=None) -> Counter:
+    query = (
+        select(Review.sentiment, func.count(Review.id), func.sum(Review.rating))
+        .where(Review.collected_at >= start)
+        .group_by(Review.sentiment)
+    )
+    if end is not None:
+        query = query.where(Review.collected_at < end)
+    return Counter({sentiment: (int(reviews), int(rating_sum)) for sentiment, reviews, rating_sum in db.execute(query)})
+
+
+@pytest.mark.parametrize("start, end", [
+    (START, None),  # whole days only
+    (START + timedelta(hours=13, minutes=5), None),  # partial first day
+    (START + timedelta(days=2), None),  # starts exactly at midnight
+    (START + timedelta(hours=6), START + timedelta(days=3, hours=18)),  # partial days at both ends
+    (START + timedelta(days=1), START + timedelta(days=4)),  # midnight to midnight
+    (START + timedelta(days=1, hours=2), START + timedelta(days=1, hours=20)),  # within one day
+    (START + timedelta(days=1, hours=2), START + timedelta(days=2)),  # end at the next midnight
+    (START + timedelta(days=1, hours=20), START + timedelta(days=2, hours=1)),  # across one midnight
+    (START + timedelta(days=3), START + timedelta(days=3)),  # empty range
+])
+def test_counts_match_a_scan_of_reviews(db, start, end):
+    assert counted(db, start, end) == scanned(db, start, end)
+
+
+def test_random_ranges_match_a_scan_of_reviews(db):
+    rng = random.Random(5)
+    for _ in range(100):
+        start = START + timedelta(minutes=rng.randrange(-600, 7 * 1440))
+        end = rng.choice([None, start + timedelta(minutes=rng.randrange(0, 4 * 1440))])
+        
+        assert counted(db, start, end) == scanned(db, start, end)
+
+
+def test_whole_days_do_not_read_reviews():
+    counts = review_counts(datetime.combine(START.date(), time.min), START + timedelta(days=3))
+    raw = counts.element.selects[1]
+    
+    # No partial day: the reviews branch matches nothing
+    assert str(raw.whereclause.compile(compile_kwargs={"literal_binds": True})) == "false"
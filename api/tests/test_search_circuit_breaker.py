@@ -0,0 +1,126 @@
+"""Circuit breaker and health averages of the search providers"""
+import pytest
+
+from app.config import settings
+from app.services import news_search_providers
+from app.services.news_search_providers import ProviderStats
+
+
+@pytest.fixture
+def clocked_module():
+    return news_search_providers
+
+
+@pytest.fixture(autouse=True)
+def breaker_settings(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_BREAKER_THRESHOLD", 3)
+    monkeypatch.setattr(settings, "SEARCH_BREAKER_COOLDOWN", 120.0)
+
+
+def fail(stats: ProviderStats, times: int = 1):
+    for _ in range(times):
+        stats.begin()
+        stats.record(1.0, 0, failed=True)
+
+
+def test_opens_after_consecutive_errors(clock):
+    stats = ProviderStats("tavily")
+    
+    fail(stats, 2)
+    assert stats.state == ProviderStats.CLOSED
+    assert stats.allow()
+    
+    fail(stats)
+    assert stats.state == ProviderStats.OPEN
+    assert not stats.allow()
+    assert stats.to_dict()["cooldown_remaining"] == 120.0
+
+
+def test_success_resets_the_error_streak(clock):
+    stats = ProviderStats("tavily")
+    
+    fail(stats, 2)
+    stats.record(1.0, 5)
+    fail(stats, 2)
+    
+    assert stats.state == ProviderStats.CLOSED
+    assert stats.consecutive_failures == 2
+
+
+def test_empty_results_are_not_failures(clock):
+    stats = ProviderStats("tavily")
+    
+    for _ in range(10):
+        stats.record(1.0, 0)
+    
+    assert stats.state == ProviderStats.CLOSED
+    assert stats.errors == 0
+    assert stats.empty == 10
+    assert stats.ewma_failure == 0.0
+    assert stats.ewma_yield < 1.0
+
+
+def test_errors_do_not_count_as_empty_results(clock):
+    stats = ProviderStats("tavily")
+    yield_before = stats.ewma_yield
+    
+    fail(stats)
+    
+    assert stats.errors == 1
+    assert stats.empty == 0
+    assert stats.ewma_yield == yield_before
+    assert stats.ewma_failure == pytest.approx(settings.SEARCH_EWMA_ALPHA)
+
+
+def test_half_open_allows_a_single_trial(clock):
+    stats = ProviderStats("tavily")
+    fail(stats, 3)
+    
+    clock.now += 119
+    assert not stats.allow()
+    clock.now += 1
+    assert stats.allow()
+    assert stats.state == ProviderStats.HALF_OPEN
+    
+    stats.begin()
+    assert not stats.allow()
+    
+    stats.record(2.0, 4)
+    assert stats.state == ProviderStats.CLOSED
+    assert stats.allow()
+
+
+def test_failed_trial_reopens(clock):
+    stats = ProviderStats("tavily")
+    fail(stats, 3)
+    clock.now += 120
+    assert stats.allow()
+    
+    fail(stats)
+    
+    assert stats.state == ProviderStats.OPEN
+    assert stats.opened_at == clock.now
+    assert not stats.allow()
+
+
+def test_cancelled_trial_frees_the_slot(clock):
+    stats = ProviderStats("tavily")
+    fail(stats, 3)
+    clock.now += 120
+    assert stats.allow()
+    stats.begin()
+    
+    stats.cancelled()
+    
+    assert stats.state == ProviderStats.HALF_OPEN
+    assert stats.allow()
+
+
+def test_score_prefers_fast_productive_providers(clock):
+    fast, slow, failing = ProviderStats("fast"), ProviderStats("slow"), ProviderStats("failing")
+    for _ in range(10):
+        fast.record(1.0, 8)
+        slow.record(8.0, 8)
+        failing.record(1.0, 0, failed=True)
+    
+    assert fast.score() > slow.score() > failing.score()
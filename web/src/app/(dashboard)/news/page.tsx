@@ -45,6 +45,14 @@ interface NewsItem {
     collected_at: string
 }
 
+interface CollectionJob {
+    job_id: string
+    status: 'pending' | 'running' | 'done' | 'failed'
+    queries_total: number
+    queries_done: number
+    new_items: number
+}
+
 interface NewsResponse {
     items: NewsItem[]
     total: number
@@ -55,6 +63,9 @@ interface NewsResponse {
 // Use local API proxy to avoid CORS issues
 const API_URL = ''
 
+// Failed reconnects of the progress stream before the job status is checked instead
+const MAX_STREAM_RETRIES = 3
+
 const competitorColors: Record<string, string> = {
     uber: 'bg-black text-white',
     didi: 'bg-orange-500 text-white',
@@ -130,9 +141,10 @@ export default function NewsPage() {
     const handleCollectNews = async () => {
         setCollecting(true)
         setError(null)
-        setCollectStatus('Сбор данных... Это может занять 1-2 минуты')
+        setCollectStatus('Запуск сбора данных...')
         
         try {
+            // Collection runs as a background job; progress arrives over SSE
             const response = await fetch(`${API_URL}/api/news/collect`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
@@ -140,18 +152,94 @@ export default function NewsPage() {
             
             if (!response.ok) throw new Error('Collection failed')
             
-            const data = await response.json()
-            setCollectStatus(`Найдено ${data.unique_items} новых материалов`)
+            const job: CollectionJob = await response.json()
+            followCollection(job.job_id)
+        } catch (err) {
+            setError('Ошибка сбора данных')
+            setCollectStatus(null)
+            setCollecting(false)
+            console.error(err)
+        }
+    }
+
+    const followCollection = (jobId: string) => {
+        const events = new EventSource(`${API_URL}/api/news/collect/${jobId}/events`)
+        let newItems = 0
+        let finished = false
+        let retries = 0
+        
+        const finish = async (status: string | null) => {
+            if (finished) return
+            finished = true
+            events.close()
+            setCollecting(false)
+            setCollectStatus(status)
             
             // Refresh the news list after collection
             await fetchNews()
             
             setTimeout(() => setCollectStatus(null), 5000)
-        } catch (err) {
+        }
+        
+        events.addEventListener('started', (event) => {
+            const data = JSON.parse((event as MessageEvent).data)
+            setCollectStatus(
+                data.queries_total > 0
+                    ? `Сбор данных... 0 из ${data.queries_total} запросов`
+                    : 'Все запросы уже актуальны'
+            )
+        })
+        
+        events.addEventListener('query', (event) => {
+            const data = JSON.parse((event as MessageEvent).data)
+            newItems += data.new_items
+            setCollectStatus(
+                `Сбор данных... ${data.queries_done} из ${data.queries_total} запросов, новых материалов: ${newItems}`
+            )
+        })
+        
+        events.addEventListener('done', () => {
+            finish(`Найдено ${newItems} новых материалов`)
+        })
+        
+        events.addEventListener('failed', () => {
             setError('Ошибка сбора данных')
-            console.error(err)
-        } finally {
-            setCollecting(false)
+            finish(null)
+        })
+        
+        events.addEventListener('open', () => {
+            retries = 0
+        })
+        
+        // The browser reconnects a dropped stream on its own, but gives up
+        // on an error response such as the 404 of a job lost in an API
+        // restart (jobs live in memory). Stop following the stream then, or
+        // after MAX_STREAM_RETRIES failed reconnects, and settle on the
+        // job's status instead of spinning forever.
+        events.onerror = async () => {
+            if (finished) return
+            retries += 1
+            if (events.readyState !== EventSource.CLOSED && retries <= MAX_STREAM_RETRIES) return
+            events.close()
+            
+            try {
+                const response = await fetch(`${API_URL}/api/news/collect/${jobId}`)
+                if (response.ok) {
+                    const job: CollectionJob = await response.json()
+                    if (job.status === 'done') {
+                        finish(`Найдено ${job.new_items} новых материалов`)
+                        return
+                    }
+                    if (job.status === 'pending' || job.status === 'running') {
+                        finish('Сбор продолжается в фоне, обновите страницу позже')
+                        return
+                    }
+                }
+            } catch (err) {
+                console.error(err)
+            }
+            setError('Ошибка сбора данных')
+            finish(null)
         }
     }
 
@@ -0,0 +1,36 @@
+const API_URL = 'https://yango-intel-test.onrender.com'
+
+export const dynamic = 'force-dynamic'
+
+// Passes the backend Server-Sent Events stream through without buffering
+export async function GET(request: Request, { params }: { params: { jobId: string } }) {
+    const headers: Record<string, string> = { Accept: 'text/event-stream' }
+    const lastEventId = request.headers.get('last-event-id')
+    if (lastEventId) {
+        headers['Last-Event-ID'] = lastEventId
+    }
+    
+    try {
+        const response = await fetch(`${API_URL}/api/news/collect/${params.jobId}/events`, {
+            headers,
+            cache: 'no-store',
+            signal: request.signal,
+        })
+        
+        if (!response.ok || !response.body) {
+            return new Response(await response.text(), { status: response.status })
+        }
+        
+        return new Response(response.body, {
+            headers: {
+                'Content-Type': 'text/event-stream',
+                'Cache-Control': 'no-cache, no-transform',
+                Connection: 'keep-alive',
+                'X-Accel-Buffering': 'no',
+            },
+        })
+    } catch (error) {
+        console.error('API proxy error:', error)
+        return new Response('Failed to stream collection progress', { status: 500 })
+    }
+}
@@ -0,0 +1,20 @@
+import { NextResponse } from 'next/server'
+
+const API_URL = 'https://yango-intel-test.onrender.com'
+
+export const dynamic = 'force-dynamic'
+
+export async function GET(_request: Request, { params }: { params: { jobId: string } }) {
+    try {
+        const response = await fetch(`${API_URL}/api/news/collect/${params.jobId}`, {
+            headers: { 'Content-Type': 'application/json' },
+            cache: 'no-store',
+        })
+        
+        const data = await response.json()
+        return NextResponse.json(data, { status: response.status })
+    } catch (error) {
+        console.error('API proxy error:', error)
+        return NextResponse.json({ error: 'Failed to fetch collection status' }, { status: 500 })
+    }
+}
@@ -2,18 +2,24 @@ import { NextRequest, NextResponse } from 'next/server'
 
 const API_URL = 'https://yango-intel-test.onrender.com'
 
-export async function POST() {
+// Starts a background collection job; returns its id without waiting for results
+export async function POST(request: NextRequest) {
+    const params = new URLSearchParams()
+    
+    request.nextUrl.searchParams.forEach((value, key) => {
+        params.append(key, value)
+    })
+    
     try {
-        const response = await fetch(`${API_URL}/api/news/collect`, {
+        const response = await fetch(`${API_URL}/api/news/collect?${params}`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
         })
         
         const data = await response.json()
-        return NextResponse.json(data)
+        return NextResponse.json(data, { status: response.status })
     } catch (error) {
         console.error('API proxy error:', error)
         return NextResponse.json({ error: 'Collection failed' }, { status: 500 })
     }
 }
-
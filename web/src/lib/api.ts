@@ -8,6 +8,8 @@ import type {
     ReviewList,
     ReviewFilters,
     ReviewStats,
+    ReviewTimeseries,
+    ReviewTimeseriesFilters,
     Digest,
     DigestList,
     CollectionStatus,
@@ -151,6 +153,18 @@ class ApiClient {
         }>(`/api/reviews/trends?days=${days}`)
     }
 
+    async getReviewTimeseries(filters?: ReviewTimeseriesFilters): Promise<ReviewTimeseries> {
+        const params = new URLSearchParams()
+        if (filters?.bucket) params.set('bucket', filters.bucket)
+        if (filters?.days) params.set('days', filters.days.toString())
+        if (filters?.competitor_id) params.set('competitor_id', filters.competitor_id)
+        if (filters?.platform) params.set('platform', filters.platform)
+        if (filters?.role) params.set('role', filters.role)
+
+        const query = params.toString() ? `?${params.toString()}` : ''
+        return this.fetch<ReviewTimeseries>(`/api/reviews/timeseries${query}`)
+    }
+
     // Digest
     async generateDigest(period: 'week' | 'month', endDate: string): Promise<Digest> {
         return this.fetch<Digest>('/api/digest/generate', {
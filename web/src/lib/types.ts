@@ -179,6 +179,42 @@ export interface ReviewStats {
     }>
 }
 
+export type ReviewBucket = 'day' | 'week' | 'month'
+
+export interface ReviewTimeseriesFilters {
+    bucket?: ReviewBucket
+    days?: number
+    competitor_id?: string
+    platform?: 'ios' | 'android'
+    role?: 'driver' | 'rider'
+}
+
+export interface ReviewTimeseriesPoint {
+    bucket: string
+    reviews: number
+    avg_rating: number | null
+    positive: number
+    neutral: number
+    negative: number
+    sentiment_share: {
+        positive: number
+        neutral: number
+        negative: number
+    } | null
+}
+
+export interface ReviewTimeseries {
+    bucket: ReviewBucket
+    start: string
+    end: string
+    buckets: string[]
+    series: Array<{
+        competitor: string
+        competitor_id: string
+        points: ReviewTimeseriesPoint[]
+    }>
+}
+
 // Digest
 export interface Digest {
     id: string